@@ -8,82 +8,644 @@ import numpy as np
 from dash.dash_table.Format import Format, Scheme, Group
 import dash_bootstrap_components as dbc
 import time
+import threading
 from datetime import datetime
 import base64
+import json
+import hashlib
 import os
 import re
+import socket
+import sqlite3
+import contextlib
 from dotenv import load_dotenv
 import gspread
+import requests
 from oauth2client.service_account import ServiceAccountCredentials
 from io import BytesIO
+import openpyxl
+import pyarrow as pa
+import pyarrow.feather as feather
 import random
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+from collections import OrderedDict
+import itertools
+import uuid
+from flask import jsonify
+try:
+    import fcntl
+except ImportError:
+    # Windows: o diário de ações fica protegido apenas entre threads
+    fcntl = None
 
 load_dotenv()
 
-# Variáveis de cache global
-CACHE_PROJETOS = None
-CACHE_CODENAUTAS = None
-CACHE_ACOES = None
-LAST_CACHE_UPDATE = None
-CACHE_DURATION = 60 * 10  # 10 minutos em segundos
+# Modo de carga inicial: "background" serve os backups locais e aquece o Google
+# Sheets em segundo plano; "blocking" espera o Google Sheets antes de servir
+STARTUP_LOAD_MODE = os.getenv('STARTUP_LOAD_MODE', 'background')
+# Duração (segundos) de cada fase da inicialização, exposta em /metrics
+STARTUP_TIMINGS = {}
+_STARTUP_INICIO = time.perf_counter()
+
+
+def record_startup_phase(fase, inicio):
+    """Registra a duração de uma fase da inicialização"""
+    STARTUP_TIMINGS[fase] = round(time.perf_counter() - inicio, 3)
 
 # Nome do arquivo que deve estar na mesma pasta do script
 EXCEL_FILE_PATH = 'Revisão Projetos - Geral.xlsx'
 
 # Funções para salvar e carregar dados localmente como fallback
 
+# Versão do formato dos snapshots locais (arquivos com outra versão são ignorados)
+LOCAL_SNAPSHOT_FORMAT_VERSION = '1'
+LOCAL_DATE_COLUMNS = ['Data de Cadastro', 'Data Limite', 'Data de Conclusão']
+
+
+def local_snapshot_path(name):
+    return f"{name}_snapshot.arrow"
+
+
+def _arrow_safe(df):
+    """Prepara um DataFrame para o formato Arrow (colunas únicas, colunas mistas como texto)"""
+    if df.columns.duplicated().any():
+        # Os stores do Dash também mantêm apenas a primeira coluna de cada nome
+        df = df.loc[:, ~df.columns.duplicated()]
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Colunas da planilha com números e textos misturados
+                df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def save_local_snapshot(df, name, processado=False):
+    """Grava o DataFrame em um snapshot Arrow IPC (Feather v2) tipado, sem compressão para permitir memory-map"""
+    table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update({
+        b'snapshot_format_version': LOCAL_SNAPSHOT_FORMAT_VERSION.encode(),
+        b'dataset': name.encode('utf-8'),
+        b'processado': b'1' if processado else b'0',
+        b'gerado_em': datetime.now().isoformat(timespec='seconds').encode(),
+    })
+    table = table.replace_schema_metadata(metadata)
+    # Gravar em um arquivo temporário e trocar, para nunca deixar um snapshot pela metade
+    temporario = local_snapshot_path(name) + '.tmp'
+    feather.write_feather(table, temporario, compression='uncompressed')
+    os.replace(temporario, local_snapshot_path(name))
+
+
+def dataframe_to_arrow_bytes(df):
+    """Serializa um DataFrame em um stream Arrow IPC (mesmos tipos do snapshot local)"""
+    table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def dataframe_from_arrow_bytes(payload):
+    """Lê um DataFrame gravado por dataframe_to_arrow_bytes"""
+    return pa.ipc.open_stream(payload).read_all().to_pandas()
+
+
+def load_local_snapshot(name):
+    """Lê o snapshot Arrow local; retorna (DataFrame, processado) ou None se não existir ou for de outra versão"""
+    path = local_snapshot_path(name)
+    if not os.path.exists(path):
+        return None
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    metadata = table.schema.metadata or {}
+    if metadata.get(b'snapshot_format_version', b'').decode() != LOCAL_SNAPSHOT_FORMAT_VERSION:
+        print(f"Snapshot local {path} em formato antigo, ignorando")
+        return None
+    return table.to_pandas(), metadata.get(b'processado') == b'1'
+
+
+def save_data_to_local(df, name, processado=False, journal_mark=None):
+    """Salva um DataFrame como snapshot tipado local, com uma exportação CSV para consulta.
 
-def save_data_to_local(df, name):
-    """Salva um DataFrame como arquivo CSV local"""
+    Para as ações, journal_mark (de ACOES_JOURNAL.mark(), tomado antes de ler
+    os dados) limita as alterações do diário consideradas incluídas no snapshot.
+    """
+    if os.getenv('SHEETS_BACKEND') in ('local', 'xlsx'):
+        # Planilha local (sintética) ou arquivo exportado: não sobrescrever os backups reais
+        return False
     try:
+        save_local_snapshot(df, name, processado)
         filename = f"{name}_backup.csv"
         df.to_csv(filename, index=False)
-        print(f"Dados de {name} salvos localmente em {filename}")
+        if name == "acoes":
+            # O snapshot já contém as alterações registradas no diário até a marca
+            ACOES_JOURNAL.reset(journal_mark)
+        print(f"Dados de {name} salvos localmente em {local_snapshot_path(name)} e {filename}")
         return True
     except Exception as e:
         print(f"Erro ao salvar dados localmente: {e}")
         return False
 
 
-def load_data_from_local(name):
-    """Carrega um DataFrame de um arquivo CSV local"""
+def load_data_from_local(name, with_flag=False, journal=True):
+    """Carrega um DataFrame do snapshot local (ou do CSV, se não houver snapshot).
+
+    Para as ações, aplica as alterações do diário local (journal=False lê só o snapshot).
+    Com with_flag=True retorna (DataFrame, processado).
+    """
+    df, processado = None, False
     try:
-        filename = f"{name}_backup.csv"
-        if os.path.exists(filename):
-            df = pd.read_csv(filename)
-            print(f"Dados de {name} carregados localmente de {filename}")
-
-            # Converter colunas de data se for o arquivo de ações
-            if name == "acoes":
-                date_cols = ['Data de Cadastro',
-                             'Data Limite', 'Data de Conclusão']
-                for col in date_cols:
-                    if col in df.columns:
-                        df[col] = pd.to_datetime(df[col], errors='coerce')
-
-            return df
-        else:
-            print(f"Arquivo local {filename} não encontrado")
-            return None
+        snapshot = load_local_snapshot(name)
+        if snapshot is not None:
+            df, processado = snapshot
+            print(f"Dados de {name} carregados do snapshot local {local_snapshot_path(name)}")
     except Exception as e:
-        print(f"Erro ao carregar dados localmente: {e}")
+        print(f"Erro ao ler o snapshot local de {name}, usando o CSV: {e}")
+
+    if df is None:
+        try:
+            filename = f"{name}_backup.csv"
+            if os.path.exists(filename):
+                df = pd.read_csv(filename)
+                print(f"Dados de {name} carregados localmente de {filename}")
+
+                # Converter colunas de data se for o arquivo de ações
+                if name == "acoes":
+                    for col in LOCAL_DATE_COLUMNS:
+                        if col in df.columns:
+                            df[col] = pd.to_datetime(df[col], errors='coerce')
+            else:
+                print(f"Arquivo local {filename} não encontrado")
+        except Exception as e:
+            print(f"Erro ao carregar dados localmente: {e}")
+
+    if name == "acoes" and journal and ACOES_JOURNAL.pending():
+        df = ACOES_JOURNAL.apply(df)
+        # As linhas vindas do diário ainda não foram processadas
+        processado = False
+
+    return (df, processado) if with_flag else df
+
+# Diário local das alterações de ações (append-only)
+
+# Arquivo com uma linha JSON por ação incluída ou editada desde o último snapshot local
+ACOES_JOURNAL_PATH = 'acoes_journal.jsonl'
+# Número de alterações no diário a partir do qual elas são consolidadas no snapshot
+ACOES_JOURNAL_COMPACT_EVERY = 200
+
+
+def _journal_value(valor):
+    """Converte um valor do DataFrame para JSON (datas em YYYY-MM-DD, vazios como null)"""
+    if valor is None or (not isinstance(valor, (str, list, dict)) and pd.isna(valor)):
         return None
+    if hasattr(valor, 'strftime'):
+        return valor.strftime('%Y-%m-%d')
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def _acao_key(valor):
+    """Normaliza o 'ID da Ação' para comparação (5, 5.0 e "5" são a mesma ação)"""
+    try:
+        return str(int(float(valor)))
+    except (TypeError, ValueError):
+        return str(valor)
+
+
+def upsert_acoes_rows(df_acoes, df_novos):
+    """Aplica as linhas de df_novos sobre df_acoes pelo 'ID da Ação', mantendo a ordem das linhas.
+
+    Ações existentes são alteradas na própria linha; as demais vão para o
+    final, uma vez só mesmo que apareçam repetidas.
+    """
+    tem_base = df_acoes is not None and not df_acoes.empty and 'ID da Ação' in df_acoes.columns
+    df = df_acoes.copy() if tem_base else pd.DataFrame()
+    posicoes = {}
+    if tem_base:
+        for pos, acao_id in enumerate(df['ID da Ação']):
+            posicoes.setdefault(_acao_key(acao_id), pos)
+
+    inclusoes = {}
+    for registro in df_novos.to_dict('records'):
+        chave = _acao_key(registro.get('ID da Ação'))
+        if chave in posicoes:
+            pos = posicoes[chave]
+            for col, valor in registro.items():
+                if col not in df.columns:
+                    df[col] = None
+                df.iat[pos, df.columns.get_loc(col)] = valor
+        else:
+            inclusoes[chave] = registro
+    if inclusoes:
+        df_inclusoes = pd.DataFrame(list(inclusoes.values()))
+        df = pd.concat([df, df_inclusoes], ignore_index=True) if tem_base else df_inclusoes
+    return df
+
+
+class LocalAcoesJournal:
+    """Registra cada ação incluída ou editada como uma linha no final de um arquivo JSONL.
+
+    Salvar uma ação custa uma linha no disco, em vez de regravar o snapshot
+    e o CSV inteiros. O diário é aplicado sobre o snapshot sempre que as
+    ações são lidas do backup local e, a cada ACOES_JOURNAL_COMPACT_EVERY
+    alterações (ou ao iniciar o servidor), consolidado em um novo snapshot.
+    Uma linha incompleta no final (queda durante a gravação) é descartada.
+
+    O arquivo é compartilhado pelos workers: gravações, leituras e limpezas
+    seguram um lock de arquivo (fcntl), e a limpeza remove apenas as linhas
+    já consolidadas, preservando as acrescentadas por outros workers.
+    """
+
+    def __init__(self, path, compact_every=ACOES_JOURNAL_COMPACT_EVERY):
+        self.path = path
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._stats = {'records': 0, 'compactions': 0, 'recovered': 0,
+                       'torn_lines': 0, 'last_compaction_at': None}
+        self._entries = len(self._read())
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Exclusão entre threads e, onde houver fcntl, entre processos"""
+        with self._lock:
+            if fcntl is None or self._lock_depth:
+                # Já com o lock de arquivo nesta thread (chamadas aninhadas)
+                yield
+                return
+            with open(f"{self.path}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_lines(self):
+        """Lê as linhas completas do diário, cortando uma linha final incompleta"""
+        with self._locked():
+            if not os.path.exists(self.path):
+                return [], []
+            registros, linhas = [], []
+            valido = 0
+            with open(self.path, 'rb') as f:
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        break
+                    if not linha.endswith(b'\n'):
+                        # Linha completa mas sem quebra: tratar como a última gravada
+                        break
+                    registros.append(registro)
+                    linhas.append(linha)
+                    valido += len(linha)
+            if valido < os.path.getsize(self.path):
+                print(f"⚠️ Diário {self.path} com gravação incompleta no final, descartando-a")
+                self._stats['torn_lines'] += 1
+                with open(self.path, 'r+b') as f:
+                    f.truncate(valido)
+            return registros, linhas
+
+    def _read(self):
+        """Lê as alterações registradas"""
+        return self._read_lines()[0]
+
+    def mark(self):
+        """Marca as alterações registradas até agora, para reset() remover só elas"""
+        return self._read_lines()[1]
+
+    def record(self, acao):
+        """Acrescenta uma ação (nova ou editada) ao diário, com fsync; retorna True se gravou"""
+        if os.getenv('SHEETS_BACKEND') in ('local', 'xlsx'):
+            # Planilha local (sintética) ou arquivo exportado: não alterar os backups reais
+            return False
+        registro = {col: _journal_value(valor) for col, valor in acao.items()
+                    if col not in ACOES_CALCULATED_COLUMNS}
+        try:
+            with self._locked():
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._entries += 1
+                self._stats['records'] += 1
+                if self._entries >= self.compact_every:
+                    self.compact()
+            return True
+        except Exception as e:
+            print(f"Erro ao registrar a ação no diário local: {e}")
+            return False
+
+    def apply(self, df_acoes):
+        """Aplica as alterações do diário sobre as ações lidas do backup (mantendo a ordem das linhas)"""
+        registros = self._read()
+        if not registros:
+            return df_acoes
+        df_novos = pd.DataFrame(registros)
+        for col in LOCAL_DATE_COLUMNS:
+            if col in df_novos.columns:
+                df_novos[col] = pd.to_datetime(df_novos[col], errors='coerce')
+
+        return upsert_acoes_rows(df_acoes, df_novos)
+
+    def compact(self):
+        """Consolida o diário em um novo snapshot local e o esvazia; retorna quantas alterações foram aplicadas"""
+        with self._locked():
+            registros, linhas = self._read_lines()
+            if not registros:
+                return 0
+            df = self.apply(load_data_from_local("acoes", journal=False))
+            # As linhas do diário ainda não passaram por process_acoes; ao gravar
+            # o snapshot, save_data_to_local remove do diário as linhas aplicadas
+            if not save_data_to_local(df, "acoes", processado=False, journal_mark=linhas):
+                return 0
+            self._stats['compactions'] += 1
+            self._stats['last_compaction_at'] = time.time()
+            print(f"Diário de ações consolidado no snapshot local ({len(registros)} alterações)")
+            return len(registros)
+
+    def recover(self):
+        """Ao iniciar: consolida no snapshot as alterações que ficaram no diário"""
+        with self._lock:
+            aplicadas = self.compact()
+            self._stats['recovered'] += aplicadas
+        if aplicadas:
+            print(f"✅ {aplicadas} alteração(ões) de ações recuperadas do diário local")
+        return aplicadas
+
+    def reset(self, mark=None):
+        """Remove do diário as alterações já contidas no snapshot local.
+
+        Com mark=None esvazia o diário; com uma marca de mark(), remove só as
+        linhas marcadas e mantém as gravadas depois (inclusive por outros workers).
+        """
+        with self._locked():
+            if not os.path.exists(self.path):
+                self._entries = 0
+                return
+            restantes = []
+            if mark is not None:
+                consolidadas = {}
+                for linha in mark:
+                    consolidadas[linha] = consolidadas.get(linha, 0) + 1
+                for linha in self._read_lines()[1]:
+                    if consolidadas.get(linha):
+                        consolidadas[linha] -= 1
+                    else:
+                        restantes.append(linha)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.writelines(restantes)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._entries = len(restantes)
+
+    def pending(self):
+        # Outros workers também acrescentam alterações: contar no arquivo
+        with self._lock:
+            self._entries = len(self._read())
+            return self._entries
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = self._entries
+        stats['path'] = self.path
+        return stats
+
+
+ACOES_JOURNAL = LocalAcoesJournal(ACOES_JOURNAL_PATH)
+
+
+# Cache em memória dos conjuntos de dados
+
+# Tempo padrão de validade de cada conjunto de dados
+CACHE_DURATION = 60 * 10  # 10 minutos em segundos
+
+
+class DatasetCache:
+    """Cache por conjunto de dados (projetos, codenautas, ações...), seguro entre threads.
+
+    Cada conjunto tem o próprio horário de atualização, TTL, versão da
+    planilha e tamanho, de modo que carregar um deles não renova a validade
+    dos outros.
+    """
+
+    def __init__(self, default_ttl=CACHE_DURATION):
+        self.default_ttl = default_ttl
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._stats = {}
+
+    def _count(self, name, key):
+        stats = self._stats.setdefault(
+            name, {'hits': 0, 'misses': 0, 'stale_hits': 0, 'sets': 0, 'invalidations': 0})
+        stats[key] += 1
+
+    def _is_fresh(self, entry):
+        return time.time() - entry['updated_at'] < entry['ttl']
+
+    def get(self, name):
+        """Retorna o valor se ainda estiver dentro do TTL; caso contrário None"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and self._is_fresh(entry):
+                self._count(name, 'hits')
+                return entry['value']
+            self._count(name, 'misses')
+            return None
+
+    def get_stale(self, name):
+        """Retorna o valor guardado mesmo com o TTL vencido (usado como fallback em erros)"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            self._count(name, 'stale_hits')
+            return entry['value']
+
+    def peek(self, name):
+        """Retorna o valor guardado sem contar acerto ou erro"""
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry['value'] if entry is not None else None
+
+    def is_current(self, name, version):
+        """Indica se o valor guardado foi obtido na versão informada da planilha"""
+        with self._lock:
+            entry = self._entries.get(name)
+            return version is not None and entry is not None and entry['version'] == version
+
+    def set(self, name, value, version=None, ttl=None):
+        with self._lock:
+            self._entries[name] = {
+                'value': value,
+                'updated_at': time.time(),
+                'ttl': self.default_ttl if ttl is None else ttl,
+                'version': version,
+                'rows': len(value) if hasattr(value, '__len__') else None,
+            }
+            self._count(name, 'sets')
+
+    def touch(self, name, version=None):
+        """Renova a validade de um valor que continua atual (planilha sem alterações)"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            entry['updated_at'] = time.time()
+            if version is not None:
+                entry['version'] = version
+
+    def update(self, name, func):
+        """Substitui o valor por func(valor_atual) de forma atômica, mantendo versão e horário"""
+        with self._lock:
+            entry = self._entries.get(name)
+            novo = func(entry['value'] if entry is not None else None)
+            if entry is None:
+                self.set(name, novo)
+            else:
+                entry['value'] = novo
+                entry['rows'] = len(novo) if hasattr(novo, '__len__') else None
+            return novo
+
+    def invalidate(self, name=None):
+        """Descarta um conjunto de dados (ou todos)"""
+        with self._lock:
+            nomes = list(self._entries) if name is None else [name]
+            for nome in nomes:
+                if self._entries.pop(nome, None) is not None:
+                    self._count(nome, 'invalidations')
+
+    def age(self, name):
+        """Idade em segundos do valor guardado (None se não houver)"""
+        with self._lock:
+            entry = self._entries.get(name)
+            return time.time() - entry['updated_at'] if entry is not None else None
+
+    def get_stats(self):
+        with self._lock:
+            agora = time.time()
+            stats = {}
+            for name in set(self._entries) | set(self._stats):
+                info = dict(self._stats.get(name, {}))
+                entry = self._entries.get(name)
+                if entry is not None:
+                    info.update({
+                        'age_seconds': round(agora - entry['updated_at'], 1),
+                        'ttl': entry['ttl'],
+                        'fresh': self._is_fresh(entry),
+                        'version': entry['version'],
+                        'rows': entry['rows'],
+                    })
+                stats[name] = info
+        return stats
+
+
+DATASET_CACHE = DatasetCache(CACHE_DURATION)
+
+# Coalescência de requisições simultâneas ao Google Sheets
+
+
+class SingleFlight:
+    """Garante uma única execução em andamento por chave.
+
+    Quem chama do(chave, func) enquanto outra thread já executa a mesma
+    chave aguarda essa execução e recebe o mesmo resultado (ou a mesma
+    exceção), em vez de repetir o download. Com force=True a chamada só
+    aproveita outra execução forçada: uma comum em andamento pode ter
+    começado antes do que motivou a recarga, então ela é aguardada e a
+    função roda de novo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {}
+
+    def do(self, key, func, force=False):
+        with self._lock:
+            stats = self._stats.setdefault(
+                key, {'calls': 0, 'executions': 0, 'shared': 0})
+            stats['calls'] += 1
+        while True:
+            with self._lock:
+                chamada = self._in_flight.get(key)
+                lider = chamada is None
+                anterior = None
+                if lider:
+                    chamada = {'done': threading.Event(), 'force': force,
+                               'result': None, 'error': None}
+                    self._in_flight[key] = chamada
+                    stats['executions'] += 1
+                elif force and not chamada['force']:
+                    anterior = chamada
+                else:
+                    stats['shared'] += 1
+            if anterior is None:
+                break
+            anterior['done'].wait()
+
+        if not lider:
+            chamada['done'].wait()
+            if chamada['error'] is not None:
+                raise chamada['error']
+            return chamada['result']
+
+        try:
+            chamada['result'] = func()
+            return chamada['result']
+        except Exception as e:
+            chamada['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            chamada['done'].set()
+
+    def get_stats(self):
+        with self._lock:
+            stats = {key: dict(valores) for key, valores in self._stats.items()}
+            em_andamento = list(self._in_flight)
+        return {
+            'keys': stats,
+            'in_flight': em_andamento,
+            'fetches_saved': sum(valores['shared'] for valores in stats.values()),
+        }
+
+
+SHEETS_SINGLE_FLIGHT = SingleFlight()
 
 # Função auxiliar para retry com backoff exponencial
 
 
 def retry_with_backoff(func, max_retries=3, initial_delay=1):
     retries = 0
+    reconectado = False
     while retries < max_retries:
         try:
             return func()
         except Exception as e:
+            if not reconectado and SHEETS_SESSION.handle_error(e):
+                # Token revogado/expirado: tentar uma vez com uma sessão nova
+                reconectado = True
+                continue
             if "429" in str(e):  # Erro de quota excedida
                 wait_time = initial_delay * \
                     (2 ** retries) + random.uniform(0, 1)
                 print(
-                    f"Quota excedida. Aguardando {wait_time:.2f} segundos antes de tentar novamente...")
-                time.sleep(wait_time)
+                    f"Quota excedida. Pausando as chamadas ao Google Sheets por {wait_time:.2f} segundos...")
+                # A espera acontece no limitador, que segura todas as chamadas
+                # (não só esta) até a pausa terminar
+                SHEETS_RATE_LIMITER.pause(wait_time)
                 retries += 1
             else:
                 # Para outros erros, apenas repassar a exceção
@@ -92,62 +654,972 @@ def retry_with_backoff(func, max_retries=3, initial_delay=1):
     # Se chegou aqui, todas as tentativas falharam
     raise Exception(f"Falha após {max_retries} tentativas")
 
-# Configuração do Google Sheets
+# Arquivos SQLite compartilhados pelos workers
 
 
-def connect_google_sheets():
+def _sqlite_conn(local, path):
+    """Conexão com `path` guardada em `local` (threading.local): uma por thread e por processo, já que o gunicorn faz fork"""
+    conn = getattr(local, 'conn', None)
+    if conn is None or local.pid != os.getpid():
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        local.conn = conn
+        local.pid = os.getpid()
+    return conn
+
+
+@contextlib.contextmanager
+def _sqlite_tx(conn, begin='BEGIN IMMEDIATE'):
+    """Transação explícita (por padrão BEGIN IMMEDIATE, que serializa os workers): COMMIT ao sair, ROLLBACK em caso de erro"""
+    conn.execute(begin)
     try:
-        # Definir escopo de acesso ao Google Drive e Sheets
-        scope = ['https://spreadsheets.google.com/feeds',
-                 'https://www.googleapis.com/auth/drive']
+        yield conn
+        conn.execute('COMMIT')
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+
+# Limitador de requisições para as quotas do Google Sheets
+
+# Quotas da API do Sheets por minuto (por usuário; a conta de serviço é um único usuário)
+SHEETS_READ_QUOTA_PER_MINUTE = int(os.getenv('SHEETS_READ_QUOTA_PER_MINUTE', 60))
+SHEETS_WRITE_QUOTA_PER_MINUTE = int(os.getenv('SHEETS_WRITE_QUOTA_PER_MINUTE', 60))
+# Arquivo SQLite com as fichas da quota, divididas entre todos os workers
+# (defina SHEETS_QUOTA_DB="" para que cada processo use a quota inteira)
+SHEETS_QUOTA_DB = os.getenv('SHEETS_QUOTA_DB', 'sheets_quota.sqlite3')
+
+# Prioridades: gravações disparadas por usuários passam na frente das leituras em segundo plano
+PRIORIDADE_INTERATIVA = 0
+PRIORIDADE_SEGUNDO_PLANO = 1
+# Espera máxima (segundos) por uma vaga na quota antes de descartar a chamada: o
+# usuário recebe o erro logo em vez de ficar com a tela travada
+SHEETS_MAX_WAIT = {PRIORIDADE_INTERATIVA: 5, PRIORIDADE_SEGUNDO_PLANO: 120}
+
+
+class SheetsRateLimitError(Exception):
+    """Chamada ao Google Sheets descartada porque a quota não liberaria vaga a tempo"""
+
+
+class SheetsRateLimiter:
+    """Token bucket por tipo de quota (leitura/escrita), compartilhado por todos os workers.
+
+    Cada chamada à API consome uma ficha; as fichas são repostas na taxa da
+    quota por minuto. Chamadas sem ficha aguardam em fila por prioridade e são
+    descartadas (SheetsRateLimitError) se a espera estimada passar do limite.
+    Com um arquivo SQLite as fichas ficam nele e a quota da conta de serviço
+    é dividida entre os workers; sem ele, cada processo usa a quota inteira.
+    """
+
+    def __init__(self, quotas_per_minute, path=None):
+        self.path = path
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._seq = itertools.count()
+        agora = time.monotonic()
+        self._buckets = {
+            tipo: {'capacity': float(quota), 'tokens': float(quota),
+                   'rate': quota / 60.0, 'updated': agora}
+            for tipo, quota in quotas_per_minute.items()
+        }
+        self._queues = {tipo: [] for tipo in quotas_per_minute}
+        self._paused_until = 0.0
+        self._suspensos = 0
+        self._shared_errors = 0
+        self._stats = {
+            tipo: {'granted': 0, 'waited': 0, 'shed': 0, 'quota_errors': 0,
+                   'wait_seconds_total': 0.0, 'wait_seconds_max': 0.0}
+            for tipo in quotas_per_minute
+        }
+        if path:
+            conn = self._connect()
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS fichas (tipo TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+
+    def _connect(self):
+        return _sqlite_conn(self._local, self.path)
+
+    def _update_shared(self, tipo, consumir=0.0, zerar=False):
+        """Repõe as fichas compartilhadas e consome `consumir` se houver; retorna (consumiu, fichas)"""
+        bucket = self._buckets[tipo]
+        conn = self._connect()
+        with _sqlite_tx(conn):
+            row = conn.execute('SELECT tokens, updated FROM fichas WHERE tipo = ?', (tipo,)).fetchone()
+            agora = time.time()
+            if row is None:
+                fichas = bucket['capacity']
+            else:
+                fichas = min(bucket['capacity'],
+                             row[0] + max(0.0, agora - row[1]) * bucket['rate'])
+            if zerar:
+                fichas = min(fichas, 0.0)
+            consumiu = consumir > 0 and fichas >= consumir
+            if consumiu:
+                fichas -= consumir
+            conn.execute('INSERT OR REPLACE INTO fichas (tipo, tokens, updated) VALUES (?, ?, ?)',
+                         (tipo, fichas, agora))
+        return consumiu, fichas
+
+    def _take(self, tipo, agora, consumir=True):
+        """Consome uma ficha se houver (chamar com self._cond); retorna (consumiu, fichas restantes)"""
+        bucket = self._buckets[tipo]
+        if self.path:
+            try:
+                consumiu, bucket['tokens'] = self._update_shared(tipo, 1.0 if consumir else 0.0)
+                return consumiu, bucket['tokens']
+            except sqlite3.Error as e:
+                # Arquivo indisponível: seguir com a quota deste processo
+                self._shared_errors += 1
+                print(f"⚠️ Erro ao consultar a quota compartilhada, usando a do processo: {e}")
+        self._refill(bucket, agora)
+        consumiu = consumir and bucket['tokens'] >= 1
+        if consumiu:
+            bucket['tokens'] -= 1
+        return consumiu, bucket['tokens']
+
+    @contextlib.contextmanager
+    def priority(self, prioridade):
+        """Define a prioridade das chamadas feitas pela thread atual dentro do bloco"""
+        anterior = getattr(self._local, 'prioridade', None)
+        self._local.prioridade = prioridade
+        try:
+            yield
+        finally:
+            self._local.prioridade = anterior
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """Libera as chamadas de todas as threads sem consumir fichas dentro do bloco.
+
+        Usado nos benchmarks com a planilha local, que medem o carregamento e
+        não a espera pela quota.
+        """
+        with self._cond:
+            self._suspensos += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._suspensos -= 1
+
+    def current_priority(self):
+        prioridade = getattr(self._local, 'prioridade', None)
+        return PRIORIDADE_SEGUNDO_PLANO if prioridade is None else prioridade
+
+    def _refill(self, bucket, agora):
+        bucket['tokens'] = min(bucket['capacity'],
+                               bucket['tokens'] + (agora - bucket['updated']) * bucket['rate'])
+        bucket['updated'] = agora
+
+    def acquire(self, tipo, prioridade=None):
+        """Aguarda uma ficha da quota `tipo`; levanta SheetsRateLimitError se a espera for longa demais"""
+        if self._suspensos:
+            return
+        if prioridade is None:
+            prioridade = self.current_priority()
+        max_espera = SHEETS_MAX_WAIT.get(prioridade, SHEETS_MAX_WAIT[PRIORIDADE_SEGUNDO_PLANO])
+        bucket = self._buckets[tipo]
+        fila = self._queues[tipo]
+        ticket = (prioridade, next(self._seq))
+        with self._cond:
+            inicio = time.monotonic()
+            heapq.heappush(fila, ticket)
+            try:
+                while True:
+                    agora = time.monotonic()
+                    pausa = max(0.0, self._paused_until - agora)
+                    vez = fila[0] == ticket and pausa == 0
+                    consumiu, fichas = self._take(tipo, agora, consumir=vez)
+                    if consumiu:
+                        break
+                    # Tempo estimado até chegar a vez desta chamada
+                    a_frente = sum(1 for outro in fila if outro < ticket)
+                    espera = pausa + max(0.0, (a_frente + 1 - fichas) / bucket['rate'])
+                    if agora + espera - inicio > max_espera:
+                        self._stats[tipo]['shed'] += 1
+                        raise SheetsRateLimitError(
+                            f"Quota de {tipo} do Google Sheets esgotada: espera estimada de {espera:.0f}s")
+                    self._cond.wait(timeout=max(0.05, min(espera, 1.0)))
+            finally:
+                fila.remove(ticket)
+                heapq.heapify(fila)
+                self._cond.notify_all()
+
+            esperado = time.monotonic() - inicio
+            stats = self._stats[tipo]
+            stats['granted'] += 1
+            if esperado > 0.01:
+                stats['waited'] += 1
+                stats['wait_seconds_total'] += esperado
+                stats['wait_seconds_max'] = max(stats['wait_seconds_max'], esperado)
+
+    def on_quota_error(self, tipo):
+        """A API respondeu 429: esvaziar o balde para que as próximas chamadas esperem a reposição"""
+        with self._cond:
+            self._buckets[tipo]['tokens'] = min(self._buckets[tipo]['tokens'], 0.0)
+            self._stats[tipo]['quota_errors'] += 1
+            if self.path:
+                try:
+                    self._update_shared(tipo, zerar=True)
+                except sqlite3.Error as e:
+                    self._shared_errors += 1
+                    print(f"⚠️ Erro ao esvaziar a quota compartilhada: {e}")
+
+    def pause(self, segundos):
+        """Suspende todas as chamadas por alguns segundos (backoff após 429)"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + segundos)
+            self._cond.notify_all()
+
+    def get_stats(self):
+        with self._cond:
+            agora = time.monotonic()
+            stats = {}
+            for tipo, bucket in self._buckets.items():
+                _, fichas = self._take(tipo, agora, consumir=False)
+                info = dict(self._stats[tipo])
+                info.update({
+                    'quota_per_minute': bucket['capacity'],
+                    'tokens_available': round(fichas, 2),
+                    'queue_depth': len(self._queues[tipo]),
+                    'wait_seconds_avg': (info['wait_seconds_total'] / info['waited']) if info['waited'] else 0.0,
+                })
+                stats[tipo] = info
+            stats['paused_for_seconds'] = round(max(0.0, self._paused_until - agora), 2)
+            stats['shared'] = bool(self.path)
+            stats['shared_errors'] = self._shared_errors
+        return stats
+
+
+def create_sheets_rate_limiter():
+    """Cria o limitador com a quota compartilhada configurada (ou só do processo, se indisponível)"""
+    quotas = {'leitura': SHEETS_READ_QUOTA_PER_MINUTE, 'escrita': SHEETS_WRITE_QUOTA_PER_MINUTE}
+    if SHEETS_QUOTA_DB:
+        try:
+            return SheetsRateLimiter(quotas, SHEETS_QUOTA_DB)
+        except sqlite3.Error as e:
+            print(f"⚠️ Quota compartilhada indisponível, cada worker usará a quota inteira: {e}")
+    return SheetsRateLimiter(quotas)
+
+
+SHEETS_RATE_LIMITER = create_sheets_rate_limiter()
+
+
+class RateLimitedClient(gspread.Client):
+    """Cliente gspread que passa cada chamada à API do Sheets pelo limitador de quota"""
+
+    def request(self, method, endpoint, *args, **kwargs):
+        return guarded_sheets_request(
+            method, endpoint,
+            lambda: super(RateLimitedClient, self).request(method, endpoint, *args, **kwargs))
+
+
+# Circuit breaker do Google Sheets
+
+# Falhas consecutivas que abrem o circuito
+SHEETS_BREAKER_FAILURE_THRESHOLD = 3
+# Tempo (segundos) com o circuito aberto antes de testar a conexão; dobra a cada teste falho
+SHEETS_BREAKER_OPEN_SECONDS = 30
+SHEETS_BREAKER_MAX_OPEN_SECONDS = 5 * 60
+# Se o teste não informar o resultado nesse prazo, outra chamada pode testar
+SHEETS_BREAKER_PROBE_TIMEOUT = 60
+
+
+class SheetsUnavailableError(Exception):
+    """Chamada ao Google Sheets recusada porque o circuito está aberto"""
+
+
+class SheetsCircuitBreaker:
+    """Interrompe as chamadas ao Google Sheets após falhas seguidas.
+
+    Com o circuito aberto as chamadas falham na hora (e os carregadores usam
+    o cache ou os backups locais). Passado o tempo de espera, uma única chamada
+    é liberada como teste (meio aberto): se der certo o circuito fecha, senão
+    volta a abrir com espera maior.
+    """
+
+    FECHADO = 'fechado'
+    ABERTO = 'aberto'
+    MEIO_ABERTO = 'meio_aberto'
+
+    def __init__(self, failure_threshold=SHEETS_BREAKER_FAILURE_THRESHOLD,
+                 open_seconds=SHEETS_BREAKER_OPEN_SECONDS,
+                 max_open_seconds=SHEETS_BREAKER_MAX_OPEN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._lock = threading.Lock()
+        self._state = self.FECHADO
+        self._failures = 0
+        self._espera_atual = open_seconds
+        self._proximo_teste = 0.0
+        self._teste_thread = None
+        self._teste_inicio = 0.0
+        self._stats = {'opened': 0, 'rejected': 0, 'probes': 0,
+                       'last_error': None, 'opened_at': None}
+
+    def _abrir(self, agora):
+        self._state = self.ABERTO
+        self._proximo_teste = agora + self._espera_atual
+        self._teste_thread = None
+        self._stats['opened'] += 1
+        self._stats['opened_at'] = datetime.now().isoformat(timespec='seconds')
+        print(f"⚠️ Google Sheets indisponível: circuito aberto por {self._espera_atual:.0f}s")
+
+    def allow(self):
+        """Indica se a thread atual pode chamar o Google Sheets agora"""
+        with self._lock:
+            if self._state == self.FECHADO:
+                return True
+            agora = time.monotonic()
+            thread = threading.get_ident()
+            if self._state == self.MEIO_ABERTO:
+                if self._teste_thread == thread:
+                    return True
+                if agora - self._teste_inicio > SHEETS_BREAKER_PROBE_TIMEOUT:
+                    # O teste anterior não informou o resultado: liberar outro
+                    self._teste_thread = thread
+                    self._teste_inicio = agora
+                    self._stats['probes'] += 1
+                    return True
+            elif agora >= self._proximo_teste:
+                self._state = self.MEIO_ABERTO
+                self._teste_thread = thread
+                self._teste_inicio = agora
+                self._stats['probes'] += 1
+                print("Testando a conexão com o Google Sheets (circuito meio aberto)...")
+                return True
+            self._stats['rejected'] += 1
+            return False
 
-        # Caminho para o arquivo de credenciais
-        credentials_path = 'google_credentials.json'
+    def check(self):
+        """Como allow(), mas levanta SheetsUnavailableError quando a chamada é recusada"""
+        if not self.allow():
+            raise SheetsUnavailableError(
+                "Google Sheets indisponível (circuito aberto), usando dados em cache")
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.FECHADO:
+                print("✅ Conexão com o Google Sheets restabelecida: circuito fechado")
+            self._state = self.FECHADO
+            self._failures = 0
+            self._espera_atual = self.open_seconds
+            self._teste_thread = None
+
+    def release_probe(self):
+        """Devolve a vez de teste da thread atual sem resultado (a chamada nem chegou ao Google)"""
+        with self._lock:
+            if self._state == self.MEIO_ABERTO and self._teste_thread == threading.get_ident():
+                self._teste_thread = None
+                self._teste_inicio = 0.0
+
+    def record_failure(self, erro=None):
+        with self._lock:
+            self._stats['last_error'] = str(erro) if erro is not None else None
+            agora = time.monotonic()
+            if self._state == self.MEIO_ABERTO:
+                # Teste falhou: voltar a abrir com espera maior
+                self._espera_atual = min(self._espera_atual * 2, self.max_open_seconds)
+                self._abrir(agora)
+                return
+            self._failures += 1
+            if self._state == self.FECHADO and self._failures >= self.failure_threshold:
+                self._abrir(agora)
+
+    def is_open(self):
+        """Indica se o circuito está aberto e ainda não é hora de testar a conexão"""
+        with self._lock:
+            return self._state == self.ABERTO and time.monotonic() < self._proximo_teste
+
+    def get_status(self):
+        with self._lock:
+            status = dict(self._stats)
+            status.update({
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'retry_in_seconds': round(max(0.0, self._proximo_teste - time.monotonic()), 1)
+                if self._state == self.ABERTO else None,
+            })
+        return status
 
-        # Verificar se o arquivo de credenciais existe
-        if not os.path.exists(credentials_path):
-            print(
-                f"ERRO: Arquivo de credenciais não encontrado em {credentials_path}")
-            print("Por favor, verifique se você colocou o arquivo google-credentials.json no diretório 'credentials'")
-            return None
 
-        # Carregar credenciais do arquivo JSON
-        credentials = ServiceAccountCredentials.from_json_keyfile_name(
-            credentials_path, scope)
+SHEETS_CIRCUIT_BREAKER = SheetsCircuitBreaker()
 
-        # Autorizar o cliente gspread com as credenciais
-        client = gspread.authorize(credentials)
 
-        # Abrir a planilha pelo nome
+def is_sheets_outage(erro):
+    """Indica se o erro significa indisponibilidade do serviço (e não um erro da requisição)"""
+    if isinstance(erro, gspread.exceptions.APIError):
+        return erro.response.status_code >= 500
+    return isinstance(erro, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+# Configuração do Google Sheets
+GOOGLE_SHEETS_SCOPE = ['https://spreadsheets.google.com/feeds',
+                       'https://www.googleapis.com/auth/drive']
+GOOGLE_CREDENTIALS_PATH = 'google_credentials.json'
+SPREADSHEET_NAME = 'Revisão Projetos - Geral'
+
+
+class SheetsSessionManager:
+    """Mantém um único cliente gspread autorizado e a planilha aberta para todo o processo"""
+
+    # Renovar o token quando faltar menos que isso (em segundos) para expirar
+    TOKEN_REFRESH_MARGIN = 5 * 60
+
+    def __init__(self, credentials_path, spreadsheet_name, scope):
+        self.credentials_path = credentials_path
+        self.spreadsheet_name = spreadsheet_name
+        self.scope = scope
+        self._lock = threading.RLock()
+        self._client = None
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._metrics = {
+            'handshakes': 0,
+            'handshake_failures': 0,
+            'handshake_seconds_total': 0.0,
+            'last_handshake_seconds': None,
+            'last_handshake_at': None,
+            'token_refreshes': 0,
+            'invalid_grant_reconnects': 0,
+            'session_reuses': 0,
+        }
+
+    def _handshake(self):
+        """Lê as credenciais, autoriza o cliente e abre a planilha"""
+        inicio = time.perf_counter()
         try:
-            spreadsheet = client.open('Revisão Projetos - Geral')
+            # Verificar se o arquivo de credenciais existe
+            if not os.path.exists(self.credentials_path):
+                print(
+                    f"ERRO: Arquivo de credenciais não encontrado em {self.credentials_path}")
+                print("Por favor, verifique se você colocou o arquivo google-credentials.json no diretório 'credentials'")
+                return None
+
+            # Carregar credenciais do arquivo JSON
+            credentials = ServiceAccountCredentials.from_json_keyfile_name(
+                self.credentials_path, self.scope)
+
+            # Autorizar o cliente gspread com as credenciais
+            client = gspread.authorize(
+                credentials, client_factory=RateLimitedClient)
+
+            # Abrir a planilha pelo nome
+            try:
+                spreadsheet = client.open(self.spreadsheet_name)
+            except gspread.exceptions.SpreadsheetNotFound:
+                print(
+                    f"ERRO: Planilha '{self.spreadsheet_name}' não encontrada no Google Drive")
+                print(
+                    "Verifique se o nome da planilha está correto e se a conta de serviço tem acesso a ela")
+                return None
+
+            self._client = client
+            self._spreadsheet = spreadsheet
+            self._worksheets = {}
             return spreadsheet
-        except gspread.exceptions.SpreadsheetNotFound:
-            print(
-                "ERRO: Planilha 'Revisão Projetos - Geral' não encontrada no Google Drive")
-            print(
-                "Verifique se o nome da planilha está correto e se a conta de serviço tem acesso a ela")
+
+        except Exception as e:
+            print(f"ERRO ao conectar com Google Sheets: {e}")
+            if 'invalid_grant' in str(e).lower():
+                print("Possível problema com as credenciais ou token expirado.")
             return None
 
-    except Exception as e:
-        print(f"ERRO ao conectar com Google Sheets: {e}")
-        if 'invalid_grant' in str(e).lower():
-            print("Possível problema com as credenciais ou token expirado.")
-        return None
+        finally:
+            duracao = time.perf_counter() - inicio
+            self._metrics['handshakes'] += 1
+            self._metrics['handshake_seconds_total'] += duracao
+            self._metrics['last_handshake_seconds'] = duracao
+            self._metrics['last_handshake_at'] = datetime.now().isoformat(timespec='seconds')
+            if self._spreadsheet is None:
+                self._metrics['handshake_failures'] += 1
+                SHEETS_CIRCUIT_BREAKER.record_failure(
+                    "Falha ao conectar ao Google Sheets")
+
+    def _token_expiring(self):
+        """Indica se o token de acesso atual está vencido ou perto de vencer"""
+        auth = getattr(self._client, 'auth', None)
+        if auth is None:
+            return False
+        expiry = getattr(auth, 'expiry', None)
+        if not getattr(auth, 'token', None) or expiry is None:
+            return True
+        # google-auth guarda a expiração como datetime UTC sem fuso
+        restante = (expiry - datetime.utcnow()).total_seconds()
+        return restante < self.TOKEN_REFRESH_MARGIN
+
+    def _refresh_token(self):
+        """Renova o token do cliente atual, refazendo a conexão em caso de invalid_grant"""
+        try:
+            self._client.login()
+            self._metrics['token_refreshes'] += 1
+        except Exception as e:
+            print(f"Erro ao renovar token do Google Sheets: {e}")
+            if 'invalid_grant' in str(e).lower():
+                self._metrics['invalid_grant_reconnects'] += 1
+            self._client = None
+            self._spreadsheet = None
+            self._worksheets = {}
+
+    def get_spreadsheet(self):
+        """Retorna a planilha aberta, conectando ou renovando o token quando necessário"""
+        # Circuito aberto: não esperar por uma conexão que deve falhar
+        if not SHEETS_CIRCUIT_BREAKER.allow():
+            return None
+        with self._lock:
+            if self._spreadsheet is not None and self._token_expiring():
+                self._refresh_token()
+
+            if self._spreadsheet is None:
+                return self._handshake()
+
+            self._metrics['session_reuses'] += 1
+            return self._spreadsheet
+
+    def get_worksheet(self, title):
+        """Retorna a aba pelo título, reaproveitando o objeto já obtido nesta sessão"""
+        spreadsheet = self.get_spreadsheet()
+        if spreadsheet is None:
+            return None
+        with self._lock:
+            worksheet = self._worksheets.get(title)
+        if worksheet is None:
+            worksheet = spreadsheet.worksheet(title)
+            with self._lock:
+                self._worksheets[title] = worksheet
+        return worksheet
+
+    def invalidate(self):
+        """Descarta o cliente e a planilha em cache, forçando nova conexão na próxima chamada"""
+        with self._lock:
+            self._client = None
+            self._spreadsheet = None
+            self._worksheets = {}
+
+    def handle_error(self, error):
+        """Trata erros de API; retorna True se a sessão foi descartada por invalid_grant"""
+        if 'invalid_grant' not in str(error).lower():
+            return False
+        print("Token do Google Sheets inválido (invalid_grant). Reconectando...")
+        with self._lock:
+            self._metrics['invalid_grant_reconnects'] += 1
+            self._client = None
+            self._spreadsheet = None
+            self._worksheets = {}
+        return True
+
+    def get_metrics(self):
+        """Retorna uma cópia das métricas de conexão"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['connected'] = self._spreadsheet is not None
+        bem_sucedidos = metrics['handshakes'] - metrics['handshake_failures']
+        metrics['handshake_seconds_avg'] = (
+            metrics['handshake_seconds_total'] / metrics['handshakes'] if metrics['handshakes'] else None)
+        metrics['successful_handshakes'] = bem_sucedidos
+        return metrics
+
+
+# Planilha local que substitui o Google Sheets em testes de carga e benchmarks
+
+# Backend de dados: "google" (padrão), "local" (planilha simulada) ou "xlsx"
+# (leitura do arquivo EXCEL_FILE_PATH, sem recorrer ao Google Sheets; as gravações
+# continuam indo para o Google Sheets). Nos dois últimos os backups locais não são sobrescritos.
+SHEETS_BACKEND = os.getenv('SHEETS_BACKEND', 'google')
+# Latência simulada por chamada (ms), fração de chamadas respondidas com 429
+# e número de linhas por aba (ex.: "projetos=5000,acoes=20000")
+LOCAL_SHEETS_LATENCY_MS = float(os.getenv('LOCAL_SHEETS_LATENCY_MS', 0))
+LOCAL_SHEETS_429_RATE = float(os.getenv('LOCAL_SHEETS_429_RATE', 0))
+LOCAL_SHEETS_ROWS = os.getenv('LOCAL_SHEETS_ROWS', '')
+
+
+def guarded_sheets_request(method, endpoint, send):
+    """Executa uma chamada à API passando pelo circuit breaker e pelo limitador de quota"""
+    SHEETS_CIRCUIT_BREAKER.check()
+    registrado = False
+    try:
+        # Chamadas ao Drive (abrir planilha, modifiedTime) têm quota própria
+        tipo = None
+        if 'sheets.googleapis.com' in endpoint:
+            tipo = 'leitura' if method.lower() == 'get' else 'escrita'
+            SHEETS_RATE_LIMITER.acquire(tipo)
+        try:
+            response = send()
+        except Exception as e:
+            if is_sheets_outage(e):
+                SHEETS_CIRCUIT_BREAKER.record_failure(e)
+            else:
+                # O serviço respondeu (erro da requisição ou quota): está disponível
+                SHEETS_CIRCUIT_BREAKER.record_success()
+            registrado = True
+            if tipo is not None and isinstance(e, gspread.exceptions.APIError) and e.response.status_code == 429:
+                SHEETS_RATE_LIMITER.on_quota_error(tipo)
+            raise
+        SHEETS_CIRCUIT_BREAKER.record_success()
+        registrado = True
+        return response
+    finally:
+        if not registrado:
+            # A chamada não chegou ao Google (ex.: SheetsRateLimitError antes do
+            # envio): liberar a vez de teste do circuito meio aberto
+            SHEETS_CIRCUIT_BREAKER.release_probe()
+
+
+def parse_local_rows_config(texto):
+    """Converte "projetos=5000,acoes=20000" em {'projetos': 5000, 'acoes': 20000}"""
+    linhas = {}
+    for parte in filter(None, (p.strip() for p in texto.split(','))):
+        nome, _, quantidade = parte.partition('=')
+        linhas[nome.strip()] = int(quantidade)
+    return linhas
+
+
+class LocalSheetsClient:
+    """Simula o cliente HTTP do gspread: latência, respostas 429 e contagem de chamadas"""
+
+    def __init__(self, latency_ms=0.0, error_429_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.error_429_rate = error_429_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.metrics = {'requests': 0, 'injected_429': 0, 'by_method': {}}
+
+    def _send(self, method, endpoint):
+        with self._lock:
+            self.metrics['requests'] += 1
+            self.metrics['by_method'][method] = self.metrics['by_method'].get(method, 0) + 1
+            erro_429 = self._random.random() < self.error_429_rate
+            if erro_429:
+                self.metrics['injected_429'] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if erro_429:
+            response = requests.Response()
+            response.status_code = 429
+            response._content = json.dumps({'error': {
+                'code': 429, 'status': 'RESOURCE_EXHAUSTED',
+                'message': 'Quota exceeded (429 simulado pela planilha local)'}}).encode()
+            raise gspread.exceptions.APIError(response)
+
+    def request(self, method, endpoint, *args, **kwargs):
+        return guarded_sheets_request(method, endpoint, lambda: self._send(method, endpoint))
+
+
+class LocalWorksheet:
+    """Aba em memória com o subconjunto da API de gspread.Worksheet usado pelo app"""
+
+    def __init__(self, spreadsheet, title, values):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self._values = values
+
+    def _call(self, method, sufixo=''):
+        self.spreadsheet.client.request(
+            method, f"{LocalSpreadsheet.API_URL}/values/{self.title}{sufixo}")
+
+    def get_all_values(self):
+        self._call('get')
+        with self.spreadsheet._lock:
+            return [list(row) for row in self._values]
+
+    def get_all_records(self):
+        return records_from_values(self.get_all_values())
+
+    def row_values(self, row):
+        self._call('get')
+        with self.spreadsheet._lock:
+            valores = list(self._values[row - 1]) if row <= len(self._values) else []
+        while valores and valores[-1] == '':
+            valores.pop()
+        return valores
+
+    def _write(self, range_name, values):
+        # Aceita "A3", "A3:D4" ou "'Aba'!A3:D4"; escreve a partir da célula inicial
+        inicio = range_name.split('!')[-1].split(':')[0]
+        linha, coluna = gspread.utils.a1_to_rowcol(inicio)
+        for i, row in enumerate(values):
+            destino = linha - 1 + i
+            while len(self._values) <= destino:
+                self._values.append([])
+            atual = self._values[destino]
+            fim = coluna - 1 + len(row)
+            if len(atual) < fim:
+                atual.extend([''] * (fim - len(atual)))
+            atual[coluna - 1:fim] = ['' if v is None else str(v) for v in row]
+        self.spreadsheet._touch()
+
+    def update(self, range_name, values=None, **kwargs):
+        self._call('put', f"/{range_name}")
+        with self.spreadsheet._lock:
+            self._write(range_name, values or [])
+
+    def batch_update(self, data, **kwargs):
+        self._call('post', ':batchUpdate')
+        with self.spreadsheet._lock:
+            for item in data:
+                self._write(item['range'], item['values'])
+
+    def append_row(self, values, value_input_option='RAW', insert_data_option=None,
+                   table_range=None, **kwargs):
+        self._call('post', ':append')
+        with self.spreadsheet._lock:
+            self._values.append(['' if v is None else str(v) for v in values])
+            self.spreadsheet._touch()
+
+    def append_rows(self, values, value_input_option='RAW', insert_data_option=None,
+                    table_range=None, **kwargs):
+        self._call('post', ':append')
+        with self.spreadsheet._lock:
+            inicio = len(self._values) + 1
+            self._values.extend(['' if v is None else str(v) for v in row] for row in values)
+            self.spreadsheet._touch()
+        # Mesmo formato da resposta de values.append usado para conferir a posição
+        largura = max((len(row) for row in values), default=1)
+        fim = gspread.utils.rowcol_to_a1(inicio + max(len(values), 1) - 1, largura)
+        return {'updates': {'updatedRange': f"'{self.title}'!A{inicio}:{fim}"}}
+
+    def clear(self):
+        self._call('post', ':clear')
+        with self.spreadsheet._lock:
+            self._values = []
+            self.spreadsheet._touch()
+
+
+class LocalSpreadsheet:
+    """Planilha em memória com as abas Projetos, Codenautas e Ações.
+
+    As abas são preenchidas com os backups locais, repetidos até o número de
+    linhas configurado. Cada chamada passa pelo LocalSheetsClient, que aplica
+    latência e erros 429 simulados.
+    """
+
+    API_URL = 'https://sheets.googleapis.com/v4/spreadsheets/local'
+    DRIVE_URL = 'https://www.googleapis.com/drive/v3/files/local'
+
+    def __init__(self, title=SPREADSHEET_NAME, client=None, rows=None):
+        self.id = 'local'
+        self.title = title
+        self.client = client or LocalSheetsClient()
+        self._lock = threading.RLock()
+        self._modified = datetime.utcnow()
+        self.lastUpdateTime = None
+        self._worksheets = {
+            titulo: LocalWorksheet(self, titulo, self._seed_values(nome, (rows or {}).get(nome)))
+            for nome, titulo in SHEETS_TABS.items()
+        }
+
+    @staticmethod
+    def _seed_values(name, quantidade):
+        """Linhas da aba a partir do backup local, como texto (igual ao get_all_values)"""
+        df = load_data_from_local(name)
+        if df is None or df.empty:
+            return [ACOES_SHEET_COLUMNS] if name == 'acoes' else []
+        if name == 'acoes':
+            df = df.drop(columns=[c for c in ACOES_CALCULATED_COLUMNS if c in df.columns])
+        elif name == 'projetos':
+            # O backup pode estar processado: voltar às colunas da aba
+            df = projetos_sheet_frame(df)
+        df = df.loc[:, ~df.columns.duplicated()]
+        if quantidade:
+            df = pd.concat([df] * (quantidade // len(df) + 1), ignore_index=True).iloc[:quantidade]
+            if name == 'acoes' and 'ID da Ação' in df.columns:
+                df['ID da Ação'] = range(1, len(df) + 1)
+        header = [str(col) for col in df.columns]
+        colunas = [sheet_column_values(df[col], col in ACOES_DATE_COLUMNS) for col in df.columns]
+        rows = [[str(v) for v in row] for row in zip(*colunas)]
+        return [header] + rows
+
+    def _touch(self):
+        self._modified = datetime.utcnow()
+
+    def worksheet(self, title):
+        self.client.request('get', self.API_URL)
+        if title not in self._worksheets:
+            raise gspread.exceptions.WorksheetNotFound(title)
+        return self._worksheets[title]
+
+    def worksheets(self):
+        self.client.request('get', self.API_URL)
+        return list(self._worksheets.values())
+
+    def values_batch_get(self, ranges, params=None):
+        self.client.request('get', f"{self.API_URL}/values:batchGet")
+        value_ranges = []
+        with self._lock:
+            for intervalo in ranges:
+                titulo = intervalo.split('!')[0].strip("'")
+                values = [list(row) for row in self._worksheets[titulo]._values]
+                value_ranges.append({'range': intervalo, 'values': values})
+        return {'spreadsheetId': self.id, 'valueRanges': value_ranges}
+
+    def refresh_lastUpdateTime(self):
+        self.client.request('get', self.DRIVE_URL)
+        with self._lock:
+            self.lastUpdateTime = self._modified.isoformat(timespec='microseconds') + 'Z'
+
+
+class LocalSheetsSession:
+    """Substitui o SheetsSessionManager usando uma LocalSpreadsheet (SHEETS_BACKEND=local)"""
+
+    def __init__(self, latency_ms=LOCAL_SHEETS_LATENCY_MS, error_429_rate=LOCAL_SHEETS_429_RATE,
+                 rows=None):
+        self.latency_ms = latency_ms
+        self.error_429_rate = error_429_rate
+        self.rows = rows or {}
+        self._lock = threading.Lock()
+        self._spreadsheet = None
+
+    def get_spreadsheet(self):
+        if not SHEETS_CIRCUIT_BREAKER.allow():
+            return None
+        with self._lock:
+            if self._spreadsheet is None:
+                client = LocalSheetsClient(self.latency_ms, self.error_429_rate)
+                self._spreadsheet = LocalSpreadsheet(client=client, rows=self.rows)
+                print(f"Usando planilha local no lugar do Google Sheets "
+                      f"(latência {self.latency_ms:.0f}ms, 429 em {self.error_429_rate:.0%} das chamadas)")
+            return self._spreadsheet
+
+    def get_worksheet(self, title):
+        spreadsheet = self.get_spreadsheet()
+        return spreadsheet.worksheet(title) if spreadsheet is not None else None
+
+    def invalidate(self):
+        pass
+
+    def handle_error(self, error):
+        return False
+
+    def get_metrics(self):
+        metrics = {'backend': 'local', 'latency_ms': self.latency_ms,
+                   'error_429_rate': self.error_429_rate, 'rows': self.rows}
+        if self._spreadsheet is not None:
+            metrics.update(self._spreadsheet.client.metrics)
+        return metrics
+
+
+if SHEETS_BACKEND == 'local':
+    SHEETS_SESSION = LocalSheetsSession(rows=parse_local_rows_config(LOCAL_SHEETS_ROWS))
+else:
+    SHEETS_SESSION = SheetsSessionManager(
+        GOOGLE_CREDENTIALS_PATH, SPREADSHEET_NAME, GOOGLE_SHEETS_SCOPE)
+
+
+def connect_google_sheets():
+    """Retorna a planilha da sessão compartilhada (ou None se não for possível conectar)"""
+    return SHEETS_SESSION.get_spreadsheet()
+
+# Detecção de alterações na planilha
+
+
+class SheetsChangeDetector:
+    """Guarda resultados por versão da planilha para evitar downloads e reprocessamentos desnecessários.
+
+    A versão vem do modifiedTime do Google Drive (uma chamada de metadados
+    barata). Quando ele não está disponível, os chamadores podem usar uma
+    impressão digital do conteúdo baixado como versão.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._stats = {'hits': 0, 'misses': 0,
+                       'probes': 0, 'probe_failures': 0}
+
+    def probe(self, spreadsheet):
+        """Consulta o modifiedTime da planilha no Drive; retorna None se não for possível"""
+        with self._lock:
+            self._stats['probes'] += 1
+        try:
+            spreadsheet.refresh_lastUpdateTime()
+            return spreadsheet.lastUpdateTime
+        except Exception as e:
+            print(f"Aviso: Não foi possível consultar a versão da planilha: {e}")
+            SHEETS_SESSION.handle_error(e)
+            with self._lock:
+                self._stats['probe_failures'] += 1
+            return None
+
+    def lookup(self, name, version):
+        """Retorna o valor guardado para a versão informada ou None"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if version is not None and entry is not None and entry[0] == version:
+                self._stats['hits'] += 1
+                return entry[1]
+            self._stats['misses'] += 1
+            return None
+
+    def remember(self, name, version, value):
+        """Associa um valor à versão da planilha em que ele foi obtido"""
+        if version is None:
+            return
+        with self._lock:
+            self._entries[name] = (version, value)
+
+    def invalidate(self, name=None):
+        """Esquece a versão de um conjunto de dados (ou de todos)"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['versions'] = {name: entry[0]
+                                 for name, entry in self._entries.items()}
+        return stats
+
+
+SHEETS_CHANGE_DETECTOR = SheetsChangeDetector()
+
+
+def content_fingerprint(dataframes):
+    """Calcula uma impressão digital do conteúdo de um ou mais DataFrames"""
+    digest = hashlib.sha1()
+    for df in dataframes:
+        digest.update(repr(df.columns.tolist()).encode('utf-8'))
+        if not df.empty:
+            digest.update(pd.util.hash_pandas_object(
+                df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def current_sheets_version():
+    """Retorna a versão atual da planilha (modifiedTime) ou None se não for possível consultar"""
+    def probe():
+        spreadsheet = connect_google_sheets()
+        if not spreadsheet:
+            return None
+        return SHEETS_CHANGE_DETECTOR.probe(spreadsheet)
+
+    # Consultas simultâneas compartilham a mesma chamada ao Drive
+    return SHEETS_SINGLE_FLIGHT.do('versao', probe)
 
 # Carregar dados da planilha do Google Sheets
 
 
 def load_data_from_sheets():
-    global CACHE_PROJETOS, LAST_CACHE_UPDATE
-
     # Verificar se existe cache válido
-    if CACHE_PROJETOS is not None and LAST_CACHE_UPDATE is not None:
-        elapsed_time = time.time() - LAST_CACHE_UPDATE
-        if elapsed_time < CACHE_DURATION:
-            print(
-                f"Usando dados em cache de Projetos (cache de {elapsed_time:.1f} segundos)")
-            return CACHE_PROJETOS
+    df_projetos = DATASET_CACHE.get('projetos')
+    if df_projetos is not None:
+        print(
+            f"Usando dados em cache de Projetos (cache de {DATASET_CACHE.age('projetos'):.1f} segundos)")
+        return df_projetos
+
+    # Google Sheets fora do ar: servir o cache vencido sem tentar conectar
+    if SHEETS_CIRCUIT_BREAKER.is_open() and DATASET_CACHE.peek('projetos') is not None:
+        return DATASET_CACHE.get_stale('projetos')
+
+    # Cache expirado: se a planilha não mudou, reaproveitar os dados já baixados
+    versao = current_sheets_version()
+    if DATASET_CACHE.is_current('projetos', versao):
+        print("Planilha sem alterações, mantendo dados em cache de Projetos")
+        DATASET_CACHE.touch('projetos')
+        return DATASET_CACHE.peek('projetos')
 
     try:
         print("Carregando dados da aba Projetos...")
@@ -174,36 +1646,45 @@ def load_data_from_sheets():
                 f"Colunas originais na planilha: {df_projetos.columns.tolist()}")
             return df_projetos
 
-        # Usar retry com backoff exponencial
-        df_projetos = retry_with_backoff(fetch_data)
+        # Usar retry com backoff exponencial; chamadas simultâneas compartilham o download
+        df_projetos = SHEETS_SINGLE_FLIGHT.do(
+            'projetos', lambda: retry_with_backoff(fetch_data))
 
         # Atualizar cache
-        CACHE_PROJETOS = df_projetos
-        LAST_CACHE_UPDATE = time.time()
+        DATASET_CACHE.set('projetos', df_projetos, versao)
 
         return df_projetos
 
     except Exception as e:
         print(f"Erro ao carregar dados de Projetos: {e}")
         # Se houver erro mas existir cache, usar dados do cache mesmo se expirado
-        if CACHE_PROJETOS is not None:
+        df_cache = DATASET_CACHE.get_stale('projetos')
+        if df_cache is not None:
             print("Usando dados em cache de Projetos devido a erro na atualização")
-            return CACHE_PROJETOS
+            return df_cache
         return pd.DataFrame()
 
 # Carregar dados dos Codenautas
 
 
 def load_codenautas_from_sheets():
-    global CACHE_CODENAUTAS, LAST_CACHE_UPDATE
-
     # Verificar se existe cache válido
-    if CACHE_CODENAUTAS is not None and LAST_CACHE_UPDATE is not None:
-        elapsed_time = time.time() - LAST_CACHE_UPDATE
-        if elapsed_time < CACHE_DURATION:
-            print(
-                f"Usando dados em cache de Codenautas (cache de {elapsed_time:.1f} segundos)")
-            return CACHE_CODENAUTAS
+    df_codenautas = DATASET_CACHE.get('codenautas')
+    if df_codenautas is not None:
+        print(
+            f"Usando dados em cache de Codenautas (cache de {DATASET_CACHE.age('codenautas'):.1f} segundos)")
+        return df_codenautas
+
+    # Google Sheets fora do ar: servir o cache vencido sem tentar conectar
+    if SHEETS_CIRCUIT_BREAKER.is_open() and DATASET_CACHE.peek('codenautas') is not None:
+        return DATASET_CACHE.get_stale('codenautas')
+
+    # Cache expirado: se a planilha não mudou, reaproveitar os dados já baixados
+    versao = current_sheets_version()
+    if DATASET_CACHE.is_current('codenautas', versao):
+        print("Planilha sem alterações, mantendo dados em cache de Codenautas")
+        DATASET_CACHE.touch('codenautas')
+        return DATASET_CACHE.peek('codenautas')
 
     try:
         print("Carregando dados da aba Codenautas...")
@@ -228,41 +1709,42 @@ def load_codenautas_from_sheets():
                 f"✅ Dados carregados com sucesso: {len(df_codenautas)} codenautas encontrados.")
             return df_codenautas
 
-        # Usar retry com backoff exponencial
-        df_codenautas = retry_with_backoff(fetch_data)
+        # Usar retry com backoff exponencial; chamadas simultâneas compartilham o download
+        df_codenautas = SHEETS_SINGLE_FLIGHT.do(
+            'codenautas', lambda: retry_with_backoff(fetch_data))
 
         # Atualizar cache
-        CACHE_CODENAUTAS = df_codenautas
-        LAST_CACHE_UPDATE = time.time()
+        DATASET_CACHE.set('codenautas', df_codenautas, versao)
 
         return df_codenautas
 
     except Exception as e:
         print(f"Erro ao carregar dados de Codenautas: {e}")
-        if CACHE_CODENAUTAS is not None:
+        df_cache = DATASET_CACHE.get_stale('codenautas')
+        if df_cache is not None:
             print("Usando dados em cache de Codenautas devido a erro na atualização")
-            return CACHE_CODENAUTAS
+            return df_cache
         return pd.DataFrame()
 
 # Carregar dados das Ações
 
 
 def load_acoes_from_sheets():
-    global CACHE_ACOES, LAST_CACHE_UPDATE
-
-    # Forçar atualização a partir do Google Sheets (ignorar cache)
-    force_update = True
-    
-    # Verificar se existe cache válido (só usar se não for forçar atualização)
-    if not force_update and CACHE_ACOES is not None and LAST_CACHE_UPDATE is not None:
-        elapsed_time = time.time() - LAST_CACHE_UPDATE
-        if elapsed_time < CACHE_DURATION:
-            print(
-                f"Usando dados em cache de Ações (cache de {elapsed_time:.1f} segundos)")
-            return CACHE_ACOES
+    # As ações mudam com frequência (cadastros de outros usuários), então em vez
+    # de confiar só no TTL consultamos a versão da planilha a cada chamada
+    if SHEETS_CIRCUIT_BREAKER.is_open() and DATASET_CACHE.peek('acoes') is not None:
+        print("Google Sheets indisponível, usando dados em cache de Ações")
+        return DATASET_CACHE.get_stale('acoes')
+
+    versao = current_sheets_version()
+    if DATASET_CACHE.is_current('acoes', versao):
+        print("Planilha sem alterações, usando dados em cache de Ações")
+        DATASET_CACHE.touch('acoes')
+        return DATASET_CACHE.peek('acoes')
 
     try:
         print("Carregando dados da aba Ações diretamente do Google Sheets...")
+        marca_diario = ACOES_JOURNAL.mark()
 
         def fetch_data():
             spreadsheet = connect_google_sheets()
@@ -271,9 +1753,11 @@ def load_acoes_from_sheets():
                     "Aviso: Não foi possível conectar ao Google Sheets para obter ações.")
                 return pd.DataFrame()
 
-            # Carregar aba Ações
-            sheet = spreadsheet.worksheet('Ações')
-            data = sheet.get_all_records()
+            # Carregar aba Ações (valores brutos guardados para a sincronização incremental)
+            sheet = SHEETS_SESSION.get_worksheet('Ações')
+            values = sheet.get_all_values()
+            set_acoes_sheet_state(values, versao)
+            data = records_from_values(values)
 
             if not data:
                 print("Aviso: Planilha Ações está vazia no Google Sheets.")
@@ -296,8 +1780,9 @@ def load_acoes_from_sheets():
                 f"✅ Dados carregados com sucesso do Google Sheets: {len(df_acoes)} ações encontradas.")
             return df_acoes
 
-        # Usar retry com backoff exponencial
-        df_acoes = retry_with_backoff(fetch_data)
+        # Usar retry com backoff exponencial; chamadas simultâneas compartilham o download
+        df_acoes = SHEETS_SINGLE_FLIGHT.do(
+            'acoes', lambda: retry_with_backoff(fetch_data))
 
         # Se o dataframe ainda estiver vazio após tentar carregar do Google Sheets, 
         # só então tentar carregar do backup local
@@ -310,11 +1795,11 @@ def load_acoes_from_sheets():
 
         # Atualizar cache apenas se tivermos dados
         if not df_acoes.empty:
-            CACHE_ACOES = df_acoes
-            LAST_CACHE_UPDATE = time.time()
+            DATASET_CACHE.set('acoes', df_acoes, versao)
+            register_acoes_ids(df_acoes)
 
             # Salvar cópia local para backup
-            save_data_to_local(df_acoes, "acoes")
+            save_data_to_local(df_acoes, "acoes", journal_mark=marca_diario)
             print(f"Backup local de ações atualizado com {len(df_acoes)} registros.")
 
         return df_acoes
@@ -325,9 +1810,10 @@ def load_acoes_from_sheets():
         traceback.print_exc()
         
         # Tentar usar cache existente
-        if CACHE_ACOES is not None:
+        df_cache = DATASET_CACHE.get_stale('acoes')
+        if df_cache is not None:
             print("Usando dados em cache de Ações devido a erro na atualização")
-            return CACHE_ACOES
+            return df_cache
 
         # Tentar carregar do backup local como última opção
         print("Tentando carregar ações do backup local após erro...")
@@ -337,6 +1823,469 @@ def load_acoes_from_sheets():
 
         return pd.DataFrame()
 
+# Carregamento em lote das três abas
+
+# Abas lidas pelo carregamento em lote (nome interno -> título da aba)
+SHEETS_TABS = {
+    'projetos': 'Projetos',
+    'codenautas': 'Codenautas',
+    'acoes': 'Ações',
+}
+
+
+def records_from_values(values):
+    """Converte os valores brutos de uma aba em registros, com a mesma semântica do get_all_records"""
+    if not values:
+        return []
+    # get_all_values completa as linhas curtas com strings vazias
+    values = gspread.utils.fill_gaps(values)
+    keys = values[0]
+    # Como o get_all_records, recusar cabeçalhos repetidos, inclusive vazios: com
+    # dict(zip(...)) a última coluna repetida sobrescreveria as anteriores sem aviso
+    repetidos = sorted({key for key in keys if keys.count(key) > 1})
+    if repetidos:
+        raise gspread.exceptions.GSpreadException(
+            "Cabeçalho da aba com colunas repetidas: "
+            + ', '.join(repr(key) if key else '(vazio)' for key in repetidos))
+    return [dict(zip(keys, gspread.utils.numericise_all(row))) for row in values[1:]]
+
+
+def fetch_all_tabs_values(spreadsheet):
+    """Lê os valores das três abas em uma única chamada values_batch_get"""
+    ranges = [f"'{titulo}'" for titulo in SHEETS_TABS.values()]
+    response = spreadsheet.values_batch_get(ranges)
+    value_ranges = response.get('valueRanges', [])
+    return {
+        name: (value_ranges[i].get('values', []) if i < len(value_ranges) else [])
+        for i, name in enumerate(SHEETS_TABS)
+    }
+
+
+def load_all_from_sheets_batched(versao=None):
+    """Carrega Projetos, Codenautas e Ações com uma única requisição à API.
+
+    Retorna um dicionário com os DataFrames brutos de cada aba ou None se não
+    for possível fazer a leitura em lote.
+    """
+    print("Carregando Projetos, Codenautas e Ações em lote do Google Sheets...")
+
+    def fetch_data():
+        spreadsheet = connect_google_sheets()
+        if not spreadsheet:
+            print("Aviso: Não foi possível conectar ao Google Sheets para a leitura em lote.")
+            return None
+        return fetch_all_tabs_values(spreadsheet)
+
+    try:
+        inicio = time.perf_counter()
+        valores = SHEETS_SINGLE_FLIGHT.do(
+            'lote', lambda: retry_with_backoff(fetch_data))
+        if valores is None:
+            return None
+
+        set_acoes_sheet_state(valores['acoes'], versao)
+
+        dados = {}
+        for name, values in valores.items():
+            dados[name] = pd.DataFrame(records_from_values(values))
+            if dados[name].empty:
+                print(f"Aviso: Planilha {SHEETS_TABS[name]} está vazia.")
+
+        # Converter colunas de data das ações para datetime
+        df_acoes = dados['acoes']
+        for col in ['Data de Cadastro', 'Data Limite', 'Data de Conclusão']:
+            if col in df_acoes.columns:
+                df_acoes[col] = pd.to_datetime(df_acoes[col], errors='coerce')
+
+        # Atualizar cache apenas com os conjuntos que vieram preenchidos
+        for name, df in dados.items():
+            if not df.empty:
+                DATASET_CACHE.set(name, df, versao)
+        if not dados['acoes'].empty:
+            register_acoes_ids(dados['acoes'])
+
+        print(
+            f"✅ Leitura em lote concluída em {time.perf_counter() - inicio:.2f}s: "
+            f"{len(dados['projetos'])} projetos, {len(dados['codenautas'])} codenautas, "
+            f"{len(dados['acoes'])} ações.")
+        return dados
+
+    except Exception as e:
+        print(f"Erro na leitura em lote do Google Sheets: {e}")
+        return None
+
+
+def load_processed_from_sheets():
+    """Carrega as três abas já processadas (process_data / process_acoes).
+
+    Se a planilha não mudou desde a última carga, devolve os DataFrames já
+    processados sem baixar nem reprocessar nada. Retorna None se a leitura em
+    lote não for possível. Chamadas simultâneas aguardam a mesma carga.
+    """
+    return SHEETS_SINGLE_FLIGHT.do('processados', _load_processed_from_sheets)
+
+
+def _load_processed_from_sheets():
+    versao = current_sheets_version()
+    dados = SHEETS_CHANGE_DETECTOR.lookup('processados', versao)
+    if dados is not None:
+        print(f"Planilha sem alterações desde {versao}, reutilizando dados processados")
+        return dados
+
+    dados_brutos = load_all_from_sheets_batched(versao)
+    if dados_brutos is None:
+        return None
+
+    # Sem modifiedTime do Drive, usar o conteúdo baixado como versão:
+    # ainda baixamos as abas, mas evitamos reprocessá-las
+    if versao is None:
+        versao = 'conteudo:' + content_fingerprint(dados_brutos.values())
+        dados = SHEETS_CHANGE_DETECTOR.lookup('processados', versao)
+        if dados is not None:
+            print("Conteúdo da planilha inalterado, reutilizando dados processados")
+            return dados
+
+    dados = {
+        'projetos': process_data(dados_brutos['projetos'], incremental=True),
+        'codenautas': dados_brutos['codenautas'],
+        'acoes': process_acoes(dados_brutos['acoes'], incremental=True),
+    }
+    SHEETS_CHANGE_DETECTOR.remember('processados', versao, dados)
+    return dados
+
+
+# Carga paralela aba por aba
+
+# Máximo de downloads simultâneos do Google Sheets
+SHEETS_FETCH_WORKERS = 3
+_SHEETS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=SHEETS_FETCH_WORKERS, thread_name_prefix='sheets-fetch')
+
+
+def load_processed_parallel():
+    """Baixa as três abas ao mesmo tempo e processa Projetos enquanto as Ações ainda chegam.
+
+    Usado quando a leitura em lote não está disponível: o tempo total fica
+    próximo ao da aba mais lenta em vez da soma das três.
+    """
+    futuros = {
+        'projetos': _SHEETS_EXECUTOR.submit(load_data_from_sheets),
+        'codenautas': _SHEETS_EXECUTOR.submit(load_codenautas_from_sheets),
+        'acoes': _SHEETS_EXECUTOR.submit(load_acoes_from_sheets),
+    }
+    # process_data roda nesta thread enquanto os outros downloads continuam
+    df_projetos = process_data(futuros['projetos'].result(), incremental=True)
+    df_acoes = process_acoes(futuros['acoes'].result(), incremental=True)
+    return {
+        'projetos': df_projetos,
+        'codenautas': futuros['codenautas'].result(),
+        'acoes': df_acoes,
+    }
+
+
+# Leitura da planilha exportada em XLSX (SHEETS_BACKEND=xlsx)
+
+
+def read_xlsx_sheet_columns(worksheet):
+    """Lê uma aba em modo streaming (values_only) e devolve {coluna: lista de valores}.
+
+    As linhas chegam como tuplas, sem criar objetos de célula, e são
+    transpostas de uma vez em listas por coluna. Células vazias viram "",
+    como no get_all_records do Google Sheets.
+    """
+    linhas = worksheet.iter_rows(values_only=True)
+    cabecalho = next(linhas, None)
+    if not cabecalho:
+        return {}
+    cabecalho = list(cabecalho)
+    while cabecalho and cabecalho[-1] is None:
+        cabecalho.pop()
+    largura = len(cabecalho)
+
+    # Ignorar linhas totalmente vazias (o modo read_only pode incluir sobras de formatação)
+    dados = [linha[:largura] for linha in linhas if any(v is not None for v in linha[:largura])]
+    if not dados:
+        return {str(nome): [] for nome in cabecalho}
+
+    colunas = {}
+    for nome, valores in zip(cabecalho, zip(*dados)):
+        colunas[str(nome) if nome is not None else ''] = [
+            '' if v is None else v for v in valores]
+    return colunas
+
+
+def load_all_from_xlsx(path=EXCEL_FILE_PATH):
+    """Lê Projetos, Codenautas e Ações do arquivo XLSX exportado; retorna DataFrames brutos ou None"""
+    if not os.path.exists(path):
+        print(f"Arquivo {path} não encontrado")
+        return None
+    inicio = time.perf_counter()
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        dados = {}
+        for name, titulo in SHEETS_TABS.items():
+            if titulo in workbook.sheetnames:
+                dados[name] = pd.DataFrame(read_xlsx_sheet_columns(workbook[titulo]))
+            else:
+                print(f"Aviso: aba {titulo} não encontrada em {path}")
+                dados[name] = pd.DataFrame()
+    finally:
+        workbook.close()
+
+    for col in ACOES_DATE_COLUMNS:
+        if col in dados['acoes'].columns:
+            dados['acoes'][col] = pd.to_datetime(dados['acoes'][col], errors='coerce')
+
+    print(
+        f"✅ Arquivo {path} lido em {time.perf_counter() - inicio:.2f}s: "
+        f"{len(dados['projetos'])} projetos, {len(dados['codenautas'])} codenautas, "
+        f"{len(dados['acoes'])} ações.")
+    return dados
+
+
+def load_processed_from_xlsx(path=EXCEL_FILE_PATH):
+    """Lê o arquivo XLSX e processa os dados, reaproveitando o resultado se o arquivo não mudou"""
+    if not os.path.exists(path):
+        print(f"Arquivo {path} não encontrado")
+        return None
+    versao = f"xlsx:{os.path.getmtime(path)}"
+    dados = SHEETS_CHANGE_DETECTOR.lookup('processados', versao)
+    if dados is not None:
+        return dados
+
+    dados_brutos = load_all_from_xlsx(path)
+    if dados_brutos is None:
+        return None
+    dados = {
+        'projetos': process_data(dados_brutos['projetos'], incremental=True),
+        'codenautas': dados_brutos['codenautas'],
+        'acoes': process_acoes(dados_brutos['acoes'], incremental=True),
+    }
+    SHEETS_CHANGE_DETECTOR.remember('processados', versao, dados)
+    return dados
+
+
+# Sincronização incremental da guia Ações
+
+# Colunas calculadas em process_acoes que não são gravadas na planilha
+ACOES_CALCULATED_COLUMNS = ['Dias Restantes', 'Atrasada', 'Tempo de Conclusão', 'Periodo']
+ACOES_DATE_COLUMNS = ['Data de Cadastro', 'Data Limite', 'Data de Conclusão']
+
+# Último conteúdo conhecido da guia Ações:
+# {'header': [...], 'rows': [[...], ...], 'version': versão da planilha lida}
+_ACOES_SHEET_STATE = None
+_ACOES_SHEET_STATE_LOCK = threading.RLock()
+
+
+def set_acoes_sheet_state(values, versao=None):
+    """Registra o conteúdo bruto da guia Ações (como retornado por get_all_values) e a versão em que foi lido"""
+    global _ACOES_SHEET_STATE
+    with _ACOES_SHEET_STATE_LOCK:
+        if not values:
+            _ACOES_SHEET_STATE = {'header': [], 'rows': [], 'version': versao}
+            return
+        values = gspread.utils.fill_gaps(values)
+        _ACOES_SHEET_STATE = {
+            'header': list(values[0]),
+            # Mesma conversão numérica do get_all_records, para comparar com o que será enviado
+            'rows': [gspread.utils.numericise_all(row) for row in values[1:]],
+            'version': versao,
+        }
+
+
+def current_acoes_sheet_state(acoes_sheet, reler=False):
+    """Retorna o estado da guia Ações, relendo-a se a planilha mudou desde a última leitura.
+
+    Sem a versão da planilha (modifiedTime indisponível) a guia é sempre
+    relida. Deve ser chamada com _ACOES_SHEET_STATE_LOCK.
+    """
+    versao = current_sheets_version()
+    if reler or _ACOES_SHEET_STATE is None or versao is None or _ACOES_SHEET_STATE['version'] != versao:
+        set_acoes_sheet_state(retry_with_backoff(acoes_sheet.get_all_values), versao)
+    return _ACOES_SHEET_STATE
+
+
+def acoes_sheet_positions(state):
+    """Posição (índice em state['rows']) de cada 'ID da Ação' da guia"""
+    if 'ID da Ação' not in state['header']:
+        return {}
+    coluna = state['header'].index('ID da Ação')
+    posicoes = {}
+    for pos, row in enumerate(state['rows']):
+        if coluna < len(row) and row[coluna] != "":
+            posicoes.setdefault(_acao_key(row[coluna]), pos)
+    return posicoes
+
+
+def sheet_column_values(serie, is_date=False):
+    """Converte uma coluna para os valores gravados na planilha (datas em YYYY-MM-DD, vazios como "")"""
+    vazios = serie.isna()
+    if is_date:
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            datas = serie
+        else:
+            datas = pd.to_datetime(serie, errors='coerce', format='ISO8601')
+        texto = datas.dt.strftime('%Y-%m-%d')
+        # Valores que não são datas reconhecíveis são mantidos como estão
+        valores = texto.where(datas.notna(), serie.astype(object))
+    elif pd.api.types.is_float_dtype(serie):
+        # Evitar que IDs e contagens sejam gravados como 1.0, 2.0...
+        inteiros = ~vazios & (serie == np.floor(serie))
+        valores = serie.astype(object)
+        valores[inteiros] = serie[inteiros].astype('int64').astype(object)
+    else:
+        valores = serie.astype(object)
+    return valores.where(~vazios, "").tolist()
+
+
+def build_acoes_sheet_rows(df_acoes, header=None):
+    """Converte o DataFrame de ações em cabeçalho e linhas no formato da guia Ações"""
+    df = df_acoes.drop(
+        columns=[col for col in ACOES_CALCULATED_COLUMNS if col in df_acoes.columns])
+    if header:
+        header = list(header) + [col for col in df.columns if col not in header]
+    else:
+        header = df.columns.tolist()
+
+    colunas = [
+        sheet_column_values(df[col], col in ACOES_DATE_COLUMNS) if col in df.columns
+        else [""] * len(df)
+        for col in header
+    ]
+    rows = [list(row) for row in zip(*colunas)] if len(df) else []
+    return header, rows
+
+
+def _pad_row(row, width):
+    return list(row) + [""] * (width - len(row))
+
+
+def plan_acoes_sheet_updates(state, header, rows):
+    """Compara as linhas com a guia pelo 'ID da Ação'.
+
+    Retorna (intervalos de um único batch_update, {posição: linha} das
+    ações existentes que mudaram, linhas de ações que não estão na guia).
+    """
+    width = max(len(header), len(state['header']))
+    last_col = gspread.utils.rowcol_to_a1(1, max(width, 1))[:-1]
+    data = []
+
+    if _pad_row(header, width) != _pad_row(state['header'], width):
+        data.append({'range': f"A1:{last_col}1",
+                     'values': [_pad_row(header, width)]})
+
+    posicoes = acoes_sheet_positions(state)
+    coluna_id = header.index('ID da Ação')
+    alteradas = {}
+    novas = {}
+    for row in rows:
+        if row[coluna_id] == "":
+            print("⚠️ Ação sem 'ID da Ação' ignorada na gravação da guia 'Ações'")
+            continue
+        chave = _acao_key(row[coluna_id])
+        pos = posicoes.get(chave)
+        if pos is None:
+            novas[chave] = row
+        elif _pad_row(state['rows'][pos], width) != _pad_row(row, width):
+            alteradas[pos] = row
+
+    # Agrupar linhas alteradas consecutivas em um mesmo intervalo
+    bloco = []
+    for pos in sorted(alteradas) + [None]:
+        if bloco and (pos is None or pos != bloco[-1] + 1):
+            data.append({
+                'range': f"A{bloco[0] + 2}:{last_col}{bloco[-1] + 2}",
+                'values': [_pad_row(alteradas[p], width) for p in bloco],
+            })
+            bloco = []
+        if pos is not None:
+            bloco.append(pos)
+    return data, alteradas, list(novas.values())
+
+
+def _append_acoes_rows(acoes_sheet, state, linhas):
+    """Acrescenta linhas ao final da guia em um único append_rows e as registra no estado conhecido.
+
+    Um erro na resposta não garante que as linhas ficaram fora da guia: antes
+    de cada nova tentativa a guia é relida e as linhas cujo 'ID da Ação' já
+    está lá não são enviadas de novo.
+    """
+    coluna_id = state['header'].index('ID da Ação') if 'ID da Ação' in state['header'] else None
+    enviar = list(linhas)
+    tentativas = 0
+
+    def acrescentar():
+        nonlocal enviar, tentativas
+        tentativas += 1
+        if tentativas > 1 and coluna_id is not None:
+            presentes = {_acao_key(row[coluna_id]) for row in acoes_sheet.get_all_values()[1:]
+                         if coluna_id < len(row) and row[coluna_id] != ""}
+            enviar = [linha for linha in enviar if _acao_key(linha[coluna_id]) not in presentes]
+        if not enviar:
+            return None
+        return acoes_sheet.append_rows(enviar, insert_data_option='INSERT_ROWS', table_range='A1')
+
+    resposta = retry_with_backoff(acrescentar)
+    # As posições do estado só continuam válidas se as linhas entraram logo
+    # após a última conhecida (outro worker pode ter acrescentado ações antes)
+    # e se nenhuma delas já estava na guia
+    try:
+        inicio = resposta['updates']['updatedRange'].split('!')[-1].split(':')[0]
+        posicoes_validas = (len(enviar) == len(linhas)
+                            and gspread.utils.a1_to_rowcol(inicio)[0] == len(state['rows']) + 2)
+    except (TypeError, KeyError, AttributeError, gspread.exceptions.IncorrectCellLabel):
+        posicoes_validas = False
+    state['rows'].extend(linhas)
+    return posicoes_validas
+
+
+def sync_acoes_to_sheets(df_acoes):
+    """Grava na guia Ações as linhas de df_acoes pelo 'ID da Ação': atualiza as que mudaram e acrescenta as que faltam.
+
+    As atualizações vão em uma única requisição batch_update. Ações da guia
+    que não estão em df_acoes nunca são alteradas nem limpas, então dados
+    desatualizados da tela não apagam ações de outros usuários. A posição de
+    cada ID vem do último conteúdo lido da guia, relido sempre que a versão
+    da planilha mudou.
+    """
+    acoes_sheet = SHEETS_SESSION.get_worksheet('Ações')
+    if acoes_sheet is None:
+        print("❌ Não foi possível conectar ao Google Sheets")
+        return False
+
+    with _ACOES_SHEET_STATE_LOCK:
+        anterior = _ACOES_SHEET_STATE
+        state = current_acoes_sheet_state(acoes_sheet)
+        header, rows = build_acoes_sheet_rows(df_acoes, state['header'] or ACOES_SHEET_COLUMNS)
+        if 'ID da Ação' not in header:
+            raise ValueError("A guia 'Ações' não tem a coluna 'ID da Ação'")
+        data, alteradas, novas = plan_acoes_sheet_updates(state, header, rows)
+        if novas and state is anterior:
+            # IDs que não estavam na última leitura podem ter sido acrescentados
+            # por outro worker: confirmar na guia antes de acrescentá-los
+            state = current_acoes_sheet_state(acoes_sheet, reler=True)
+            header, rows = build_acoes_sheet_rows(df_acoes, state['header'] or ACOES_SHEET_COLUMNS)
+            data, alteradas, novas = plan_acoes_sheet_updates(state, header, rows)
+
+        if not (data or novas):
+            print("Nenhuma alteração a enviar para a guia 'Ações'")
+            return True
+
+        posicoes_validas = True
+        if data:
+            retry_with_backoff(lambda: acoes_sheet.batch_update(data))
+        state['header'] = header
+        for pos, row in alteradas.items():
+            state['rows'][pos] = row
+        if novas:
+            posicoes_validas = _append_acoes_rows(acoes_sheet, state, novas)
+        print(f"Guia 'Ações' sincronizada: {len(alteradas)} ação(ões) atualizada(s) "
+              f"e {len(novas)} acrescentada(s)")
+        # A gravação mudou a versão da planilha; sem posições confiáveis, reler na próxima vez
+        state['version'] = current_sheets_version() if posicoes_validas else None
+    return True
+
+
 # Função para atualizar dados das Ações
 
 
@@ -344,140 +2293,30 @@ def update_acoes_in_sheets(df_acoes):
     try:
         print("\n===== Atualizando ações no Google Sheets =====")
         print(f"Tentando atualizar {len(df_acoes)} registros de ações")
-        
-        spreadsheet = connect_google_sheets()
-        if not spreadsheet:
-            print("❌ Não foi possível conectar ao Google Sheets")
-            return False
 
-        # Preparar dados para upload - SALVAR UMA CÓPIA ANTES DAS TRANSFORMAÇÕES
         df_original = df_acoes.copy()
-        
-        # Converter datas para string no formato YYYY-MM-DD
-        df_to_upload = df_acoes.copy()
-        date_cols = ['Data de Cadastro', 'Data Limite', 'Data de Conclusão']
-        
-        # NOVA ABORDAGEM PARA DATAS: Tratamento mais cuidadoso
-        print("\n=== APLICANDO NOVO TRATAMENTO PARA DATAS ===")
-        for col in date_cols:
-            if col in df_to_upload.columns:
-                print(f"Processando coluna {col}...")
-                
-                # Verificação detalhada para Data Limite
-                if col == 'Data Limite':
-                    print(f"Valores em Data Limite antes da conversão: {df_to_upload[col].head(3).tolist()}")
-                    # Verificar se há valores None que deveriam ser preservados
-                    for idx, valor in enumerate(df_to_upload[col]):
-                        if pd.isna(valor) and col == 'Data Limite':
-                            print(f"ATENÇÃO: Linha {idx} tem Data Limite nula/vazia")
-                
-                # Converter somente valores não-nulos para strings formatadas
-                # Importante: Preservar NaN/None para Data Limite e outros campos
-                df_to_upload[col] = df_to_upload[col].apply(
-                    lambda x: x.strftime('%Y-%m-%d') if pd.notna(x) and hasattr(x, 'strftime') else (
-                        "" if pd.isna(x) else x
-                    )
-                )
-                
-                # Garantir que todos os valores na coluna sejam strings
-                df_to_upload[col] = df_to_upload[col].astype(str)
-                
-                # Substituir valores "nan", "None", "NaT" por string vazia
-                df_to_upload[col] = df_to_upload[col].replace(["nan", "None", "NaT"], "")
-                
-                # Verificar tipos de dados após processamento
-                print(f"Tipo de dados na coluna {col} após conversão: {df_to_upload[col].dtype}")
-                print(f"Valores não vazios: {(df_to_upload[col] != '').sum()} de {len(df_to_upload)}")
-        
-        # Remover colunas calculadas que não devem ser enviadas para o Google Sheets
-        colunas_calculadas = ['Dias Restantes', 'Atrasada', 'Tempo de Conclusão']
-        for col in colunas_calculadas:
-            if col in df_to_upload.columns:
-                df_to_upload = df_to_upload.drop(columns=[col])
-                print(f"Coluna calculada {col} removida antes do upload")
-
-        # Verificação final da Data Limite
-        if 'Data Limite' in df_to_upload.columns:
-            print("\n=== VERIFICAÇÃO FINAL DA DATA LIMITE ===")
-            print(f"Valores em Data Limite antes do upload:")
-            print(f"  - Tipo de dados: {df_to_upload['Data Limite'].dtype}")
-            print(f"  - Valores vazios: {(df_to_upload['Data Limite'] == '').sum()}")
-            print(f"  - Primeiros 5 valores: {df_to_upload['Data Limite'].head(5).tolist()}")
-        
-        # Salvar backup local antes da atualização no Google Sheets
-        save_data_to_local(df_original, "acoes_antes_upload_original")
-        save_data_to_local(df_to_upload, "acoes_antes_upload_processado")
-        
+
         # Verificar se há dados para enviar
-        if df_to_upload.empty:
+        if df_acoes.empty:
             print("⚠️ Não há dados para atualizar na planilha")
             return False
 
-        # Converter DataFrame para lista de listas
-        headers = df_to_upload.columns.tolist()
-        rows = []
-        
-        for _, row in df_to_upload.iterrows():
-            row_values = []
-            for col in headers:
-                value = row[col]
-                # Garantir que não temos valores None, nan ou NaT
-                if pd.isna(value) or value is None:
-                    value = ""
-                # Não fazer substituição automática das datas limite vazias
-                row_values.append(value)
-            rows.append(row_values)
-            
-        values = [headers] + rows
-        
-        print(f"Preparados {len(values)-1} registros para upload")
-        print(f"Colunas para upload: {headers}")
-        
-        # Verificar Data Limite em valores
-        data_limite_idx = headers.index('Data Limite') if 'Data Limite' in headers else -1
-        if data_limite_idx >= 0:
-            print(f"Verificando valores de Data Limite na lista de valores:")
-            for i, row in enumerate(rows[:3]):  # Mostrar 3 primeiros exemplos
-                print(f"  - Registro {i+1}: Data Limite = '{row[data_limite_idx]}'")
-
-        # Atualizar planilha
+        # Enviar apenas as linhas que mudaram
         try:
-            acoes_sheet = spreadsheet.worksheet('Ações')
-            print("✅ Guia 'Ações' encontrada no Google Sheets")
-            
-            # Obter dados existentes antes de limpar
-            existing_data = acoes_sheet.get_all_values()
-            print(f"A guia tem atualmente {len(existing_data)} linhas, incluindo cabeçalho")
-            
-            # Usando abordagem simplificada para atualização da planilha
-            print("Utilizando abordagem de atualização em duas etapas...")
-            
-            # 1. Atualizar apenas o cabeçalho primeiro
-            acoes_sheet.update('A1', [headers])
-            print("Cabeçalho atualizado")
-            
-            # 2. Se houver linhas de dados, atualizar os dados a partir da linha 2
-            if len(rows) > 0:
-                acoes_sheet.update('A2', rows)
-                print(f"Dados atualizados ({len(rows)} linhas)")
-            
-            # Atualizar cache
-            global CACHE_ACOES, LAST_CACHE_UPDATE
-            CACHE_ACOES = df_original  # Usar o DataFrame original para o cache
-            LAST_CACHE_UPDATE = time.time()
-            
-            # Salvar backup local após sucesso
-            save_data_to_local(df_original, "acoes")
-            print("✅ Dados de ações atualizados com sucesso no Google Sheets e no cache")
-            
-            return True
-            
+            if not sync_acoes_to_sheets(df_acoes):
+                return False
         except Exception as sheet_e:
             print(f"❌ Erro ao acessar ou atualizar a guia 'Ações': {sheet_e}")
+            SHEETS_SESSION.handle_error(sheet_e)
             import traceback
             traceback.print_exc()
             return False
 
+        # Atualizar cache (a versão da planilha mudou com a gravação)
+        upsert_acoes_in_cache(df_original)
+        print("✅ Dados de ações atualizados com sucesso no Google Sheets e no cache")
+        return True
+
     except Exception as e:
         print(f"❌ Erro ao atualizar planilha de Ações: {e}")
         import traceback
@@ -485,6 +2324,618 @@ def update_acoes_in_sheets(df_acoes):
         return False
 
 
+# Inclusão de ações sem reescrever a guia inteira
+
+# Ordem padrão das colunas da guia Ações (usada se o cabeçalho não puder ser lido)
+ACOES_SHEET_COLUMNS = ['ID da Ação', 'Data de Cadastro', 'Mês de Referência', 'Projeto',
+                       'Descrição da Ação', 'Responsáveis', 'Data Limite', 'Status',
+                       'Prioridade', 'Data de Conclusão', 'Observações de conclusão']
+
+# Último ID de ação reservado por este processo
+_ACOES_ULTIMO_ID = None
+_ACOES_ID_LOCK = threading.Lock()
+
+# Arquivo SQLite com a sequência de IDs de ações compartilhada pelos workers
+# (defina ACOES_ID_DB="" para reservar IDs apenas na memória de cada processo)
+ACOES_ID_DB = os.getenv('ACOES_ID_DB', 'acoes_ids.sqlite3')
+
+
+class AcoesIdSequence:
+    """Sequência de 'ID da Ação' em um arquivo SQLite, única entre workers e usuários simultâneos.
+
+    Cada reserva é uma transação BEGIN IMMEDIATE, que serializa os workers
+    sem precisar ler a guia Ações. O valor nunca volta atrás: IDs vistos na
+    planilha apenas elevam o piso da sequência.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._stats = {'allocated': 0, 'reconciled': 0, 'errors': 0}
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sequencia (nome TEXT PRIMARY KEY, ultimo INTEGER NOT NULL)')
+
+    def _connect(self):
+        return _sqlite_conn(self._local, self.path)
+
+    def _update(self, calcular):
+        conn = self._connect()
+        try:
+            with _sqlite_tx(conn):
+                row = conn.execute("SELECT ultimo FROM sequencia WHERE nome = 'acoes'").fetchone()
+                atual = row[0] if row else 0
+                novo = calcular(atual)
+                if novo != atual:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO sequencia (nome, ultimo) VALUES ('acoes', ?)", (novo,))
+            return atual, novo
+        except sqlite3.Error:
+            self._stats['errors'] += 1
+            raise
+
+    def reserve(self, minimo=0):
+        """Reserva o próximo ID, acima do último reservado e de `minimo`"""
+        _, novo = self._update(lambda atual: max(atual, minimo) + 1)
+        self._stats['allocated'] += 1
+        return novo
+
+    def reconcile(self, maior_na_planilha):
+        """Eleva a sequência até o maior ID encontrado na planilha (nunca a reduz)"""
+        atual, novo = self._update(lambda atual: max(atual, maior_na_planilha))
+        if novo != atual:
+            self._stats['reconciled'] += 1
+        return novo
+
+    def current(self):
+        row = self._connect().execute("SELECT ultimo FROM sequencia WHERE nome = 'acoes'").fetchone()
+        return row[0] if row else 0
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        stats['path'] = self.path
+        try:
+            stats['last_id'] = self.current()
+        except sqlite3.Error as e:
+            stats['error'] = str(e)
+        return stats
+
+
+def create_acoes_id_sequence():
+    """Abre a sequência de IDs configurada (None se desativada ou indisponível)"""
+    if not ACOES_ID_DB:
+        return None
+    try:
+        return AcoesIdSequence(ACOES_ID_DB)
+    except sqlite3.Error as e:
+        print(f"⚠️ Sequência de IDs compartilhada indisponível, cada worker reservará seus IDs: {e}")
+        return None
+
+
+ACOES_ID_SEQUENCE = create_acoes_id_sequence()
+
+
+# Janela (segundos) em que um mesmo token de gravação é reconhecido como repetido
+SAVE_DEDUP_WINDOW = 10 * 60
+
+
+class SaveDeduplicator:
+    """Reconhece envios repetidos de um formulário pelo token gerado ao abrir o modal.
+
+    O primeiro envio de um token o reserva; cliques duplos e requisições
+    reenviadas com o mesmo token são descartados antes de qualquer leitura
+    ou gravação. Se a gravação falhar, o token é liberado para nova tentativa;
+    se der certo, confirm() o marca como concluído, e só então um envio
+    repetido pode fechar o modal sem aviso. Com um arquivo SQLite (o mesmo da sequência de IDs) a reserva vale para
+    todos os workers; sem ele, apenas para o processo atual.
+    """
+
+    def __init__(self, path=None, window=SAVE_DEDUP_WINDOW):
+        self.path = path
+        self.window = window
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._tokens = {}
+        self._concluidos = set()
+        self._stats = {'accepted': 0, 'duplicates': 0, 'released': 0, 'confirmed': 0, 'errors': 0}
+        if path:
+            conn = self._connect()
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS tokens_gravacao (token TEXT PRIMARY KEY, criado_em REAL NOT NULL, '
+                'concluido INTEGER NOT NULL DEFAULT 0)')
+
+    def _connect(self):
+        return _sqlite_conn(self._local, self.path)
+
+    def _claim_shared(self, token, agora):
+        conn = self._connect()
+        with _sqlite_tx(conn):
+            conn.execute('DELETE FROM tokens_gravacao WHERE criado_em < ?', (agora - self.window,))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO tokens_gravacao (token, criado_em) VALUES (?, ?)', (token, agora))
+        return cursor.rowcount == 1
+
+    def claim(self, token):
+        """Reserva o token; retorna False se ele já foi usado dentro da janela"""
+        if not token:
+            # Sem token (página antiga em cache): não há como deduplicar
+            return True
+        agora = time.time()
+        novo = None
+        if self.path:
+            try:
+                novo = self._claim_shared(token, agora)
+            except sqlite3.Error as e:
+                print(f"⚠️ Erro ao registrar o token de gravação compartilhado, usando a memória: {e}")
+                with self._lock:
+                    self._stats['errors'] += 1
+        with self._lock:
+            if novo is None:
+                for antigo in [t for t, criado in self._tokens.items() if criado < agora - self.window]:
+                    del self._tokens[antigo]
+                    self._concluidos.discard(antigo)
+                novo = token not in self._tokens
+                if novo:
+                    self._tokens[token] = agora
+            self._stats['accepted' if novo else 'duplicates'] += 1
+        return novo
+
+    def release(self, token):
+        """Libera o token após uma gravação que falhou, permitindo reenviar o formulário"""
+        if not token:
+            return
+        if self.path:
+            try:
+                self._connect().execute('DELETE FROM tokens_gravacao WHERE token = ?', (token,))
+            except sqlite3.Error as e:
+                print(f"⚠️ Erro ao liberar o token de gravação: {e}")
+        with self._lock:
+            self._tokens.pop(token, None)
+            self._concluidos.discard(token)
+            self._stats['released'] += 1
+
+    def confirm(self, token):
+        """Marca o token como gravado com sucesso"""
+        if not token:
+            return
+        if self.path:
+            try:
+                self._connect().execute(
+                    'UPDATE tokens_gravacao SET concluido = 1 WHERE token = ?', (token,))
+            except sqlite3.Error as e:
+                print(f"⚠️ Erro ao confirmar o token de gravação: {e}")
+        with self._lock:
+            self._concluidos.add(token)
+            self._stats['confirmed'] += 1
+
+    def is_confirmed(self, token):
+        """Indica se a gravação do token já foi concluída (em qualquer worker, com o arquivo SQLite)"""
+        if self.path:
+            try:
+                row = self._connect().execute(
+                    'SELECT concluido FROM tokens_gravacao WHERE token = ?', (token,)).fetchone()
+                return bool(row and row[0])
+            except sqlite3.Error as e:
+                print(f"⚠️ Erro ao consultar o token de gravação: {e}")
+        with self._lock:
+            return token in self._concluidos
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['window_seconds'] = self.window
+        stats['shared'] = bool(self.path)
+        return stats
+
+
+# Aviso para um envio repetido enquanto o primeiro ainda está gravando
+SAVE_EM_ANDAMENTO_MSG = "Esta alteração ainda está sendo salva. Aguarde alguns segundos."
+
+SAVE_DEDUPLICATOR = SaveDeduplicator(
+    ACOES_ID_SEQUENCE.path if ACOES_ID_SEQUENCE is not None else None)
+
+
+def max_acao_id(acoes):
+    """Retorna o maior 'ID da Ação' numérico de um DataFrame ou lista de registros (0 se não houver)"""
+    if acoes is None:
+        return 0
+    if isinstance(acoes, pd.DataFrame):
+        if acoes.empty or 'ID da Ação' not in acoes.columns:
+            return 0
+        ids = pd.to_numeric(acoes['ID da Ação'], errors='coerce')
+    else:
+        ids = pd.to_numeric(pd.Series([registro.get('ID da Ação') for registro in acoes],
+                                      dtype=object), errors='coerce')
+    maior = ids.max()
+    return 0 if pd.isna(maior) else int(maior)
+
+
+def register_acoes_ids(acoes):
+    """Informa ao alocador os IDs vistos em dados recém-carregados"""
+    global _ACOES_ULTIMO_ID
+    maior = max_acao_id(acoes)
+    with _ACOES_ID_LOCK:
+        if _ACOES_ULTIMO_ID is None or maior > _ACOES_ULTIMO_ID:
+            _ACOES_ULTIMO_ID = maior
+    if ACOES_ID_SEQUENCE is not None:
+        try:
+            ACOES_ID_SEQUENCE.reconcile(maior)
+        except sqlite3.Error as e:
+            print(f"⚠️ Não foi possível atualizar a sequência de IDs compartilhada: {e}")
+
+
+def allocate_acao_id(acoes_conhecidas=None):
+    """Reserva o próximo ID de ação no servidor, sem reler a guia Ações"""
+    global _ACOES_ULTIMO_ID
+    # Os dados da tela podem conter IDs mais recentes que os vistos pelo processo
+    maior_conhecido = max_acao_id(acoes_conhecidas)
+    with _ACOES_ID_LOCK:
+        if _ACOES_ULTIMO_ID is None:
+            _ACOES_ULTIMO_ID = max_acao_id(DATASET_CACHE.peek('acoes'))
+        minimo = max(_ACOES_ULTIMO_ID, maior_conhecido)
+        if ACOES_ID_SEQUENCE is not None:
+            try:
+                # A sequência compartilhada garante IDs únicos entre os workers
+                _ACOES_ULTIMO_ID = ACOES_ID_SEQUENCE.reserve(minimo)
+                return _ACOES_ULTIMO_ID
+            except sqlite3.Error as e:
+                print(f"⚠️ Sequência de IDs compartilhada indisponível, reservando na memória: {e}")
+        _ACOES_ULTIMO_ID = minimo + 1
+        return _ACOES_ULTIMO_ID
+
+
+def get_acoes_sheet_header(acoes_sheet):
+    """Retorna o cabeçalho da guia Ações do estado conhecido, relido quando a versão da planilha muda"""
+    with _ACOES_SHEET_STATE_LOCK:
+        state = current_acoes_sheet_state(acoes_sheet)
+        if not state['header']:
+            # Guia vazia: criar o cabeçalho padrão
+            acoes_sheet.update('A1', [ACOES_SHEET_COLUMNS])
+            state['header'] = list(ACOES_SHEET_COLUMNS)
+        return state['header']
+
+
+def append_acoes_to_sheets(novas_acoes):
+    """Acrescenta ações ao final da guia Ações em uma única requisição (append_rows), sem reescrever a guia"""
+    acoes_sheet = SHEETS_SESSION.get_worksheet('Ações')
+    if acoes_sheet is None:
+        print("❌ Não foi possível conectar ao Google Sheets")
+        return False
+
+    with _ACOES_SHEET_STATE_LOCK:
+        header = get_acoes_sheet_header(acoes_sheet)
+        linhas = []
+        for nova_acao in novas_acoes:
+            linha = []
+            for col in header:
+                value = nova_acao.get(col, "")
+                if value is None or (not isinstance(value, str) and pd.isna(value)):
+                    value = ""
+                elif hasattr(value, 'strftime'):
+                    value = value.strftime('%Y-%m-%d')
+                linha.append(value)
+            linhas.append(linha)
+
+        # Manter o estado conhecido da guia alinhado com as novas linhas
+        state = _ACOES_SHEET_STATE
+        posicoes_validas = _append_acoes_rows(acoes_sheet, state, linhas)
+        state['version'] = current_sheets_version() if posicoes_validas else None
+    ids = ', '.join(str(acao.get('ID da Ação')) for acao in novas_acoes)
+    print(f"✅ Ação(ões) {ids} acrescentada(s) à guia 'Ações'")
+    return True
+
+
+def append_acao_to_sheets(nova_acao):
+    """Acrescenta uma única ação ao final da guia Ações"""
+    try:
+        return append_acoes_to_sheets([nova_acao])
+
+    except Exception as e:
+        print(f"❌ Erro ao acrescentar ação na guia 'Ações': {e}")
+        SHEETS_SESSION.handle_error(e)
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def append_acao_to_cache(nova_acao):
+    """Acrescenta a nova ação ao cache em memória, no mesmo formato do carregamento"""
+    df_nova = pd.DataFrame([nova_acao])
+    for col in ['Data de Cadastro', 'Data Limite', 'Data de Conclusão']:
+        if col in df_nova.columns:
+            df_nova[col] = pd.to_datetime(df_nova[col], errors='coerce')
+
+    def acrescentar(df_atual):
+        if df_atual is None or df_atual.empty:
+            return df_nova
+        return pd.concat([df_atual, df_nova], ignore_index=True)
+
+    DATASET_CACHE.update('acoes', acrescentar)
+
+
+def upsert_acoes_in_cache(df_linhas):
+    """Aplica as ações gravadas sobre o cache em memória pelo 'ID da Ação', no formato do carregamento"""
+    df_linhas = df_linhas.drop(
+        columns=[col for col in ACOES_CALCULATED_COLUMNS if col in df_linhas.columns])
+    for col in ACOES_DATE_COLUMNS:
+        if col in df_linhas.columns:
+            df_linhas[col] = pd.to_datetime(df_linhas[col], errors='coerce')
+    DATASET_CACHE.update('acoes', lambda df_atual: upsert_acoes_rows(df_atual, df_linhas))
+
+
+# Fila de gravação da guia Ações (write-behind)
+
+# Arquivo SQLite com as gravações pendentes (defina ACOES_OUTBOX_DB="" para gravar direto na planilha)
+ACOES_OUTBOX_DB = os.getenv('ACOES_OUTBOX_DB', 'acoes_pendentes.sqlite3')
+# Intervalo (segundos) entre as verificações de gravações pendentes
+ACOES_OUTBOX_FLUSH_INTERVAL = 2
+# Tempo (segundos) que a fila aguarda após uma gravação para juntar as seguintes no mesmo envio
+ACOES_OUTBOX_COALESCE_WINDOW = 0.5
+# Espera máxima (segundos) entre novas tentativas após falhas seguidas
+ACOES_OUTBOX_MAX_BACKOFF = 300
+# Validade da vez de um worker enviar as gravações (evita envios duplicados entre workers)
+ACOES_OUTBOX_LEASE_SECONDS = 60
+# Tentativas de envio de uma gravação antes de movê-la para a tabela de descartadas
+ACOES_OUTBOX_MAX_ATTEMPTS = 10
+# Tempo máximo (segundos) que a recarga dos dados aguarda a fila de gravação esvaziar
+ACOES_OUTBOX_MAX_REFRESH_DELAY = 5 * 60
+
+
+def _json_default(valor):
+    """Converte escalares do numpy/pandas para tipos aceitos pelo json"""
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor)}")
+
+
+def acoes_sheet_payload(df_acoes):
+    """Converte o DataFrame de ações em registros com os valores gravados na planilha"""
+    df = df_acoes.drop(
+        columns=[col for col in ACOES_CALCULATED_COLUMNS if col in df_acoes.columns])
+    colunas = {col: sheet_column_values(df[col], col in ACOES_DATE_COLUMNS) for col in df.columns}
+    return [dict(zip(colunas, valores)) for valores in zip(*colunas.values())]
+
+
+class AcoesWriteQueue:
+    """Diário local das gravações da guia Ações, enviadas ao Google Sheets em segundo plano.
+
+    Cada gravação é registrada em um arquivo SQLite e confirmada para a tela
+    na hora; uma thread envia as pendências em ordem, juntando inclusões
+    seguidas e edições seguidas em um único envio pelo 'ID da Ação' (vale a
+    última versão de cada ação). Inclusões e edições passam por
+    sync_acoes_to_sheets, que só acrescenta IDs ausentes da guia: reenviar uma
+    inclusão que chegou à planilha sem confirmação não a duplica. Em caso de falha a
+    pendência continua no diário e é reenviada com espera crescente,
+    inclusive depois de reiniciar o servidor; após ACOES_OUTBOX_MAX_ATTEMPTS
+    tentativas ela vai para a tabela `descartadas`, para não travar as
+    gravações seguintes.
+    """
+
+    APPEND = 'append'
+    UPSERT = 'upsert'
+
+    def __init__(self, path, flush_interval=ACOES_OUTBOX_FLUSH_INTERVAL,
+                 max_backoff=ACOES_OUTBOX_MAX_BACKOFF, lease_seconds=ACOES_OUTBOX_LEASE_SECONDS,
+                 max_attempts=ACOES_OUTBOX_MAX_ATTEMPTS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._falhas_seguidas = 0
+        self._stats = {'enqueued': 0, 'flushed': 0, 'coalesced': 0, 'batches': 0,
+                       'failures': 0, 'dead_lettered': 0, 'last_error': None,
+                       'last_flush_at': None}
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS pendentes (seq INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'tipo TEXT NOT NULL, payload TEXT NOT NULL, criado_em REAL NOT NULL, '
+            'tentativas INTEGER NOT NULL DEFAULT 0, ultimo_erro TEXT)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS descartadas (seq INTEGER PRIMARY KEY, '
+            'tipo TEXT NOT NULL, payload TEXT NOT NULL, criado_em REAL NOT NULL, '
+            'tentativas INTEGER NOT NULL, ultimo_erro TEXT, descartado_em REAL NOT NULL)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)')
+
+    def _connect(self):
+        return _sqlite_conn(self._local, self.path)
+
+    def enqueue(self, tipo, payload):
+        """Registra uma gravação no diário e acorda a thread de envio; retorna o número de sequência"""
+        conn = self._connect()
+        cursor = conn.execute(
+            'INSERT INTO pendentes (tipo, payload, criado_em) VALUES (?, ?, ?)',
+            (tipo, json.dumps(payload, default=_json_default), time.time()))
+        with self._lock:
+            self._stats['enqueued'] += 1
+        self._wake.set()
+        return cursor.lastrowid
+
+    def enqueue_append(self, nova_acao):
+        return self.enqueue(self.APPEND, nova_acao)
+
+    def enqueue_upsert(self, df_acoes):
+        """Registra a gravação das linhas de df_acoes, a ser aplicada pelo 'ID da Ação'"""
+        return self.enqueue(self.UPSERT, acoes_sheet_payload(df_acoes))
+
+    def pending_count(self):
+        try:
+            return self._connect().execute('SELECT COUNT(*) FROM pendentes').fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def _try_acquire_lease(self):
+        conn = self._connect()
+        agora = time.time()
+        try:
+            with _sqlite_tx(conn):
+                row = conn.execute(
+                    "SELECT holder, expires_at FROM leases WHERE name = 'envio'").fetchone()
+                dono = row is None or row[0] == self.worker_id or row[1] < agora
+                if dono:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES ('envio', ?, ?)",
+                        (self.worker_id, agora + self.lease_seconds))
+            return dono
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao consultar a vez de envio da fila de ações: {e}")
+            return False
+
+    @classmethod
+    def coalesce(cls, pendentes):
+        """Agrupa pendências seguidas do mesmo tipo: [(tipo, [seqs], linhas a enviar)]"""
+        grupos = []
+        for seq, tipo, payload in pendentes:
+            if not (grupos and grupos[-1][0] == tipo):
+                grupos.append([tipo, [], {}])
+            grupos[-1][1].append(seq)
+            # Vale a última versão de cada ação, na posição da primeira
+            for linha in ([payload] if tipo == cls.APPEND else payload):
+                grupos[-1][2][_acao_key(linha.get('ID da Ação'))] = linha
+        return [(tipo, seqs, list(linhas.values())) for tipo, seqs, linhas in grupos]
+
+    def _send(self, linhas):
+        # Inclusões também vão por ID: só são acrescentadas se ainda não estão na guia
+        if not sync_acoes_to_sheets(pd.DataFrame(linhas)):
+            raise SheetsUnavailableError("Não foi possível conectar ao Google Sheets")
+
+    def _dead_letter(self, conn, seqs):
+        """Move para `descartadas` as pendências que atingiram o limite de tentativas"""
+        marcadores = ','.join('?' * len(seqs))
+        with _sqlite_tx(conn):
+            descartadas = conn.execute(
+                f"INSERT INTO descartadas (seq, tipo, payload, criado_em, tentativas, ultimo_erro, descartado_em) "
+                f"SELECT seq, tipo, payload, criado_em, tentativas, ultimo_erro, ? FROM pendentes "
+                f"WHERE seq IN ({marcadores}) AND tentativas >= ?",
+                (time.time(), *seqs, self.max_attempts)).rowcount
+            conn.execute(
+                f"DELETE FROM pendentes WHERE seq IN ({marcadores}) AND tentativas >= ?",
+                (*seqs, self.max_attempts))
+        if descartadas:
+            print(f"❌ {descartadas} gravação(ões) da guia 'Ações' descartada(s) após "
+                  f"{self.max_attempts} tentativas; veja a tabela 'descartadas' em {self.path}")
+            with self._lock:
+                self._stats['dead_lettered'] += descartadas
+
+    def flush(self):
+        """Envia as pendências em ordem; retorna quantas foram gravadas na planilha"""
+        if not self._try_acquire_lease():
+            return 0
+        conn = self._connect()
+        pendentes = [(seq, tipo, json.loads(payload)) for seq, tipo, payload in conn.execute(
+            'SELECT seq, tipo, payload FROM pendentes ORDER BY seq').fetchall()]
+        if not pendentes:
+            return 0
+
+        enviados = 0
+        with SHEETS_RATE_LIMITER.priority(PRIORIDADE_INTERATIVA):
+            for tipo, seqs, payload in self.coalesce(pendentes):
+                try:
+                    self._send(payload)
+                except Exception as e:
+                    # Parar no primeiro erro para preservar a ordem das gravações
+                    print(f"❌ Erro ao enviar {len(seqs)} gravação(ões) pendente(s) da guia 'Ações': {e}")
+                    SHEETS_SESSION.handle_error(e)
+                    conn.execute(
+                        f"UPDATE pendentes SET tentativas = tentativas + 1, ultimo_erro = ? "
+                        f"WHERE seq IN ({','.join('?' * len(seqs))})", (str(e), *seqs))
+                    self._dead_letter(conn, seqs)
+                    with self._lock:
+                        self._stats['failures'] += 1
+                        self._stats['last_error'] = str(e)
+                        self._falhas_seguidas += 1
+                    break
+                conn.execute(
+                    f"DELETE FROM pendentes WHERE seq IN ({','.join('?' * len(seqs))})", seqs)
+                enviados += len(seqs)
+                with self._lock:
+                    self._stats['flushed'] += len(seqs)
+                    self._stats['coalesced'] += len(seqs) - 1
+                    self._stats['batches'] += 1
+                    self._stats['last_error'] = None
+                    self._stats['last_flush_at'] = time.time()
+                    self._falhas_seguidas = 0
+
+        if enviados:
+            print(f"✅ {enviados} gravação(ões) pendente(s) enviadas para a guia 'Ações'")
+            DATASET_CACHE.invalidate('acoes')
+            if self.pending_count() == 0:
+                # Planilha em dia: a recarga pode trazer as alterações de volta
+                SNAPSHOT_REFRESHER.request_refresh()
+        return enviados
+
+    def _run(self):
+        while True:
+            if self._wake.wait(timeout=self.flush_interval):
+                # Edições em sequência chegam juntas no mesmo envio
+                time.sleep(ACOES_OUTBOX_COALESCE_WINDOW)
+            self._wake.clear()
+            if SHEETS_CIRCUIT_BREAKER.is_open():
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Erro na fila de gravação da guia 'Ações': {e}")
+                with self._lock:
+                    self._stats['last_error'] = str(e)
+                    self._falhas_seguidas += 1
+            with self._lock:
+                falhas = self._falhas_seguidas
+            if falhas:
+                # Espera crescente após falhas, mesmo que novas gravações cheguem
+                time.sleep(min(self.max_backoff, self.flush_interval * 2 ** falhas))
+
+    def start(self):
+        """Inicia a thread de envio (apenas uma vez por processo)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="acoes-write-queue", daemon=True)
+            self._thread.start()
+
+    def get_status(self):
+        with self._lock:
+            status = dict(self._stats)
+            status['consecutive_failures'] = self._falhas_seguidas
+        status['path'] = self.path
+        try:
+            row = self._connect().execute(
+                'SELECT COUNT(*), MIN(criado_em), MAX(tentativas) FROM pendentes').fetchone()
+            status['pending'] = row[0]
+            status['oldest_pending_seconds'] = round(time.time() - row[1], 1) if row[1] else None
+            status['max_attempts'] = row[2] or 0
+            status['dead_letter'] = self._connect().execute(
+                'SELECT COUNT(*) FROM descartadas').fetchone()[0]
+        except sqlite3.Error as e:
+            status['error'] = str(e)
+        return status
+
+
+def create_acoes_write_queue():
+    """Abre a fila de gravação configurada (None se desativada ou indisponível)"""
+    if not ACOES_OUTBOX_DB:
+        return None
+    try:
+        return AcoesWriteQueue(ACOES_OUTBOX_DB)
+    except sqlite3.Error as e:
+        print(f"⚠️ Fila de gravação indisponível, as ações serão gravadas direto na planilha: {e}")
+        return None
+
+
+ACOES_WRITE_QUEUE = create_acoes_write_queue()
+
+
 # Configuração global do tema dos gráficos Plotly
 
 # Definir o tema padrão para todos os gráficos
@@ -639,14 +3090,364 @@ custom_style = {
     }
 }
 
+# Interpretação de meses em português (coluna 'Mês' dos projetos)
+
+# Abreviações usadas na exibição (ex.: Abr/2025)
+MESES_PT_ABREV = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+                  'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+# Nomes e abreviações aceitos na leitura, sem acentos e em minúsculas
+_MESES_PT_NUMERO = {
+    'jan': 1, 'janeiro': 1, 'fev': 2, 'fevereiro': 2, 'mar': 3, 'marco': 3,
+    'abr': 4, 'abril': 4, 'mai': 5, 'maio': 5, 'jun': 6, 'junho': 6,
+    'jul': 7, 'julho': 7, 'ago': 8, 'agosto': 8, 'set': 9, 'setembro': 9,
+    'out': 10, 'outubro': 10, 'nov': 11, 'novembro': 11, 'dez': 12, 'dezembro': 12,
+}
+# "2025-04", "2025/04", "2025-04-01", "2025-04-01 00:00:00"
+_MES_ISO_RE = re.compile(r'^(\d{4})[-/.](\d{1,2})(?:[-/.]\d{1,2})?(?:[ T].*)?$')
+# "04/2025", "4-25", "01/04/2025"
+_MES_NUMERICO_RE = re.compile(r'^(?:\d{1,2}[-/.])?(\d{1,2})[-/.](\d{4}|\d{2})$')
+# "abr.-25", "Abr/2025", "abril de 2025", "Abril"
+_MES_NOME_RE = re.compile(r'^([a-zç]+)\.?\s*(?:[-/.]|\s|de)?\s*(\d{4}|\d{2})?$')
+
+
+def parse_pt_br_month(valor, ano_padrao=None):
+    """Converte um mês escrito em português para o primeiro dia do mês (Timestamp) ou NaT.
+
+    Aceita 'abr.-25', 'Abr/2025', '2025-04', '04/2025', 'abril de 2025',
+    datas completas e objetos de data. Sem ano (ex.: 'Abril') usa `ano_padrao`;
+    sem ele, retorna NaT: o ano atual faria a mesma linha mudar de período na
+    virada do ano, e cabe a quem chama escolher o ano (ex.: o do cadastro).
+    """
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return pd.NaT
+    if hasattr(valor, 'month') and hasattr(valor, 'year'):
+        return pd.Timestamp(valor.year, valor.month, 1)
+
+    texto = str(valor).strip().lower()
+    for acentuada, simples in (('ç', 'c'), ('ã', 'a'), ('á', 'a'), ('â', 'a')):
+        texto = texto.replace(acentuada, simples)
+
+    ano = mes = None
+    if (m := _MES_ISO_RE.match(texto)):
+        ano, mes = int(m.group(1)), int(m.group(2))
+    elif (m := _MES_NUMERICO_RE.match(texto)):
+        mes, ano = int(m.group(1)), int(m.group(2))
+    elif (m := _MES_NOME_RE.match(texto)) and m.group(1) in _MESES_PT_NUMERO:
+        mes = _MESES_PT_NUMERO[m.group(1)]
+        ano = int(m.group(2)) if m.group(2) else ano_padrao
+    if mes is None or ano is None or not 1 <= mes <= 12:
+        return pd.NaT
+    if ano < 100:
+        ano += 2000
+    return pd.Timestamp(ano, mes, 1)
+
+
+def parse_pt_br_month_column(serie, ano_padrao=None):
+    """Interpreta uma coluna de meses uma vez por valor distinto e replica o resultado em todas as linhas.
+
+    `ano_padrao` (número ou Series alinhada à coluna) completa os meses sem
+    ano; sem ele, esses meses ficam sem período. Retorna um DataFrame com 'Periodo' (inteiro yyyymm), 'Mês_datetime'
+    (primeiro dia do mês), 'MesAnoFormatado' (ex.: Abr/2025; o texto
+    original se não reconhecido) e 'Ano_Mes' (ex.: 2025-04), com o mesmo
+    índice da coluna.
+    """
+    codigos, unicos = pd.factorize(serie)
+    if isinstance(ano_padrao, pd.Series):
+        # Um mês sem ano pode cair em anos diferentes conforme a linha:
+        # interpretar uma vez cada par (valor, ano padrão) distinto; o ano 0
+        # marca as linhas sem ano padrão
+        anos = ano_padrao.fillna(0).astype('int64').to_numpy()
+        codigos, pares = pd.factorize(codigos.astype('int64') * 10000 + anos)
+        entradas = [(unicos[par // 10000] if par >= 0 else None, int(par % 10000) or None)
+                    for par in pares]
+    else:
+        entradas = [(valor, ano_padrao) for valor in unicos]
+
+    datas = [parse_pt_br_month(valor, ano) for valor, ano in entradas]
+    periodos = [data.year * 100 + data.month if pd.notna(data) else pd.NA for data in datas]
+    rotulos = [periodo_label(periodo) if pd.notna(periodo)
+               else ('' if valor is None or (not isinstance(valor, str) and pd.isna(valor)) else str(valor))
+               for (valor, _), periodo in zip(entradas, periodos)]
+    ano_mes = [data.strftime('%Y-%m') if pd.notna(data) else None for data in datas]
+
+    # O código -1 (valor ausente) aponta para o último elemento, acrescentado como vazio
+    datas = np.append(pd.to_datetime(pd.Series(datas, dtype=object)).to_numpy(dtype='datetime64[ns]'),
+                      np.datetime64('NaT'))
+    periodos = pd.array(periodos + [pd.NA], dtype='Int64')
+    rotulos = np.array(rotulos + [''], dtype=object)
+    ano_mes = np.array(ano_mes + [None], dtype=object)
+    return pd.DataFrame({
+        'Periodo': periodos[codigos],
+        'Mês_datetime': datas[codigos],
+        'MesAnoFormatado': rotulos[codigos],
+        'Ano_Mes': ano_mes[codigos],
+    }, index=serie.index)
+
+
+# Período mensal comum a Projetos e Ações: inteiro yyyymm (ex.: 202504)
+
+
+def periodo_from_datetime(datas):
+    """Converte datas em períodos yyyymm (Int64, <NA> para datas ausentes)"""
+    datas = pd.to_datetime(datas, errors='coerce')
+    return (datas.dt.year * 100 + datas.dt.month).astype('Int64')
+
+
+def periodo_label(periodo):
+    """Rótulo de exibição de um período yyyymm (ex.: 202504 -> Abr/2025)"""
+    if periodo is None or pd.isna(periodo):
+        return ''
+    periodo = int(periodo)
+    return f"{MESES_PT_ABREV[periodo % 100 - 1]}/{periodo // 100}"
+
+
+def periodo_labels(periodos):
+    """Rótulos de uma coleção de períodos, gerados uma vez por período distinto"""
+    periodos = pd.Series(periodos)
+    rotulos = {periodo: periodo_label(periodo) for periodo in periodos.dropna().unique()}
+    return periodos.map(rotulos).fillna('').tolist()
+
+
+def periodo_sheet_value(periodo):
+    """Mês no formato em que a planilha o guarda (ex.: 202504 -> abr.-25)"""
+    if periodo is None or pd.isna(periodo):
+        return ''
+    periodo = int(periodo)
+    return f"{MESES_PT_ABREV[periodo % 100 - 1].lower()}.-{periodo // 100 % 100:02d}"
+
+
+def mes_referencia_options(periodos):
+    """Opções de 'Mês de Referência' das ações: exibidas como Abr/2025, gravadas como abr.-25"""
+    return [{"label": periodo_label(periodo), "value": periodo_sheet_value(periodo)}
+            for periodo in periodos if periodo is not None and pd.notna(periodo)]
+
+
+def acoes_periodo(df_acoes):
+    """Período do 'Mês de Referência' das ações; meses sem ano (ex.: 'Abril') usam o ano de cadastro"""
+    if 'Mês de Referência' not in df_acoes.columns:
+        return pd.Series(pd.NA, index=df_acoes.index, dtype='Int64')
+    ano_cadastro = None
+    if 'Data de Cadastro' in df_acoes.columns:
+        ano_cadastro = pd.to_datetime(df_acoes['Data de Cadastro'], errors='coerce').dt.year
+    return parse_pt_br_month_column(df_acoes['Mês de Referência'], ano_cadastro)['Periodo']
+
+
+def count_by_period(df, mask, coluna):
+    """Conta as linhas que atendem `mask` em cada período, em ordem cronológica, com o rótulo do mês"""
+    contagem = mask.groupby(pd.to_numeric(df['Periodo'], errors='coerce')).sum().sort_index()
+    return pd.DataFrame({
+        'Periodo': contagem.index.astype('int64'),
+        'MesAnoFormatado': periodo_labels(contagem.index),
+        coluna: contagem.to_numpy(dtype='int64'),
+    })
+
+
+# Processamento incremental por linha
+
+
+class IncrementalFrameProcessor:
+    """Reaproveita linhas já processadas, identificadas pelo hash do conteúdo bruto de cada linha.
+
+    `row_step` só pode depender de cada linha isoladamente e roda apenas nas
+    linhas novas ou alteradas; `frame_step` roda sempre sobre o resultado
+    completo (etapas que olham o conjunto inteiro, como a mediana). O cache
+    guarda somente as linhas da última chamada e é descartado quando as
+    colunas de entrada mudam.
+    """
+
+    def __init__(self, nome, row_step, frame_step):
+        self.nome = nome
+        self.row_step = row_step
+        self.frame_step = frame_step
+        self._lock = threading.Lock()
+        self._colunas = None
+        self._linhas = None
+        self._stats = {'runs': 0, 'rows_total': 0, 'rows_reused': 0, 'rows_processed': 0,
+                       'resets': 0, 'unhashable': 0, 'row_seconds': 0.0, 'frame_seconds': 0.0}
+
+    def process(self, df):
+        try:
+            hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        except TypeError:
+            # Células com listas/dicionários não têm hash: processa tudo
+            with self._lock:
+                self._stats['unhashable'] += 1
+            return self.frame_step(self.row_step(df.copy()))
+
+        with self._lock:
+            colunas = tuple(df.columns)
+            if colunas != self._colunas:
+                if self._colunas is not None:
+                    self._stats['resets'] += 1
+                self._colunas = colunas
+                self._linhas = None
+
+            if self._linhas is not None:
+                conhecidas = pd.Index(hashes).isin(self._linhas.index)
+            else:
+                conhecidas = np.zeros(len(df), dtype=bool)
+            # Linhas repetidas são processadas uma única vez
+            novas = ~conhecidas & ~pd.Index(hashes).duplicated()
+
+            inicio = time.perf_counter()
+            partes = []
+            if self._linhas is not None:
+                partes.append(self._linhas[self._linhas.index.isin(hashes)])
+            if novas.any():
+                processadas = self.row_step(df[novas].copy())
+                processadas.index = pd.Index(hashes[novas])
+                partes.append(processadas)
+            self._linhas = pd.concat(partes) if len(partes) > 1 else partes[0]
+            self._stats['row_seconds'] += time.perf_counter() - inicio
+
+            resultado = self._linhas.loc[hashes]
+            resultado.index = df.index
+            self._stats['runs'] += 1
+            self._stats['rows_total'] += len(df)
+            self._stats['rows_reused'] += int(conhecidas.sum())
+            self._stats['rows_processed'] += int(novas.sum())
+
+        inicio = time.perf_counter()
+        resultado = self.frame_step(resultado)
+        with self._lock:
+            self._stats['frame_seconds'] += time.perf_counter() - inicio
+        return resultado
+
+    def reset(self):
+        with self._lock:
+            self._colunas = None
+            self._linhas = None
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_rows'] = len(self._linhas) if self._linhas is not None else 0
+        stats['row_seconds'] = round(stats['row_seconds'], 4)
+        stats['frame_seconds'] = round(stats['frame_seconds'], 4)
+        return stats
+
+
+# Memorização do processamento dos projetos
+
+# Quantidade de versões de dados processados mantidas em memória
+PROCESS_DATA_CACHE_SIZE = 8
+
+
+class ProcessedDataMemo:
+    """Guarda resultados de process_data pela impressão digital do conteúdo recebido.
+
+    Os callbacks (busca na tabela, ícone de ação) recebem sempre os mesmos
+    registros até a próxima versão dos dados, então o processamento é feito
+    uma vez por versão. As entradas menos usadas saem quando o limite é atingido.
+    """
+
+    def __init__(self, max_entries=PROCESS_DATA_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0,
+                       'unhashable': 0, 'fingerprint_seconds': 0.0, 'compute_seconds': 0.0}
+
+    def get_or_compute(self, df, calcular):
+        inicio = time.perf_counter()
+        try:
+            chave = content_fingerprint([df])
+        except TypeError:
+            # Células com listas/dicionários não têm hash: processa sem memorizar
+            with self._lock:
+                self._stats['unhashable'] += 1
+            return calcular(df)
+        with self._lock:
+            self._stats['fingerprint_seconds'] += time.perf_counter() - inicio
+            resultado = self._entries.get(chave)
+            if resultado is not None:
+                self._entries.move_to_end(chave)
+                self._stats['hits'] += 1
+                # Cópia: os callbacks acrescentam colunas ao DataFrame recebido
+                return resultado.copy()
+            self._stats['misses'] += 1
+
+        inicio = time.perf_counter()
+        resultado = calcular(df)
+        duracao = time.perf_counter() - inicio
+
+        with self._lock:
+            self._stats['compute_seconds'] += duracao
+            self._entries[chave] = resultado.copy()
+            self._entries.move_to_end(chave)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return resultado
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / total, 3) if total else None
+        stats['fingerprint_seconds'] = round(stats['fingerprint_seconds'], 4)
+        stats['compute_seconds'] = round(stats['compute_seconds'], 4)
+        return stats
+
+
+PROCESSED_DATA_MEMO = ProcessedDataMemo()
+
+
+def process_data(df_projetos, incremental=False):
+    """Processa os dados dos projetos, reaproveitando o resultado de conteúdos já processados.
+
+    incremental=True (carga da planilha) reprocessa só as linhas novas ou
+    alteradas desde a carga anterior; os callbacks recebem outras colunas e
+    usam o processamento completo, sem descartar esse cache.
+    """
+    if df_projetos.empty:
+        print("AVISO: DataFrame vazio recebido em process_data")
+        return df_projetos  # Retorna DataFrame vazio se não houver dados
+    calcular = PROJETOS_INCREMENTAL.process if incremental else _process_data
+    return PROCESSED_DATA_MEMO.get_or_compute(df_projetos, calcular)
+
+# Colunas acrescentadas por process_data que não existem na aba Projetos
+PROJETOS_DERIVED_COLUMNS = ['Periodo', 'Mês_datetime', 'MesAnoFormatado', 'Ano_Mes',
+                            'Prioridade', 'NPS_Combinado', 'Cliente']
+
+
+def projetos_sheet_frame(df_projetos):
+    """Desfaz as colunas de process_data, devolvendo só as colunas da aba Projetos com os nomes da planilha"""
+    if not any(col in df_projetos.columns for col in PROJETOS_DERIVED_COLUMNS):
+        return df_projetos
+    df = df_projetos.drop(
+        columns=[col for col in PROJETOS_DERIVED_COLUMNS if col in df_projetos.columns])
+    renomear = {'Observacoes': 'Observações'}
+    if 'Previsão' in df.columns:
+        # process_data renomeia 'Horas Previstas (Contrato)' para 'Previsão' (a
+        # 'Previsão' original vira 'Previsão_temp') e recria a primeira com zeros
+        df = df.drop(columns=['Horas Previstas (Contrato)'], errors='ignore')
+        renomear.update({'Previsão': 'Horas Previstas (Contrato)', 'Previsão_temp': 'Previsão'})
+    return df.rename(columns=renomear)
+
 # Função para processar dados
 
+# Colunas numéricas dos projetos (convertidas por linha, corrigidas pela mediana do conjunto)
+PROJETOS_NUMERIC_COLUMNS = ['Atraso em dias ', 'Previsão', 'Real',
+                            'Saldo Acumulado', 'Horas Previstas (Contrato)', 'Horas Mês']
+
 
-def process_data(df_projetos):
+def _process_data(df_projetos):
+    """Processamento completo (sem reaproveitar linhas) dos dados dos projetos"""
     if df_projetos.empty:
         print("AVISO: DataFrame vazio recebido em process_data")
         return df_projetos  # Retorna DataFrame vazio se não houver dados
+    return _finalize_projetos(_process_projetos_rows(df_projetos))
 
+
+def _process_projetos_rows(df_projetos):
+    """Etapas que dependem apenas de cada linha: nomes de colunas, mês, filtros, NPS, cliente"""
     # Imprimir informações para debug
     print(
         f"Processando dados da planilha: {len(df_projetos)} linhas, {len(df_projetos.columns)} colunas")
@@ -730,24 +3531,19 @@ def process_data(df_projetos):
                     'GP Responsável', 'Status', 'Segmento', 'Tipo', 'Coordenação', 'Financeiro'] else 0
 
     # 1. Formatar coluna 'Mês' para exibição e filtro (ex: Abr/2025)
+    # (valores como 'abr.-25' são interpretados uma vez por mês distinto;
+    # os não reconhecidos são mantidos como texto)
     try:
-        df_renamed['Mês_datetime'] = pd.to_datetime(
-            df_renamed['Mês'], errors='coerce')
-        # CORREÇÃO: O ponto (.) antes de 'Out' foi substituído por dois pontos (:)
-        month_map_pt = {1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun',
-                        7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'}
-        df_renamed['MesAnoFormatado'] = df_renamed['Mês_datetime'].apply(
-            lambda x: f"{month_map_pt[x.month]}/{x.year}" if pd.notnull(x) and hasattr(x, 'month') and hasattr(x, 'year') else str(
-                df_renamed.loc[x.name if hasattr(x, 'name') else -1, 'Mês'] if hasattr(x, 'name') else 'Data Inválida')
-        )
-        # Fallback for any original strings that couldn't be parsed but should be kept
-        df_renamed['MesAnoFormatado'] = np.where(df_renamed['Mês_datetime'].isna(
-        ), df_renamed['Mês'].astype(str), df_renamed['MesAnoFormatado'])
-
-        # Adicionar coluna de ano-mês para agrupamento nos gráficos de evolução
-        df_renamed['Ano_Mes'] = df_renamed['Mês_datetime'].dt.strftime('%Y-%m')
+        meses = parse_pt_br_month_column(df_renamed['Mês'])
+        # Período yyyymm usado em filtros, ordenações e agrupamentos
+        df_renamed['Periodo'] = meses['Periodo']
+        df_renamed['Mês_datetime'] = meses['Mês_datetime']
+        df_renamed['MesAnoFormatado'] = meses['MesAnoFormatado']
+        # Coluna de ano-mês para agrupamento nos gráficos de evolução
+        df_renamed['Ano_Mes'] = meses['Ano_Mes']
     except Exception as e:
         print(f"Erro ao formatar coluna 'Mês': {e}. Usando como string.")
+        df_renamed['Periodo'] = pd.Series(pd.NA, index=df_renamed.index, dtype='Int64')
         df_renamed['MesAnoFormatado'] = df_renamed['Mês'].astype(str)
         df_renamed['Ano_Mes'] = df_renamed['Mês'].astype(str)
 
@@ -783,22 +3579,69 @@ def process_data(df_projetos):
             # Retorna o valor original se for diferente dos esperados
             return str(nps_value)
 
-    if 'NPS ' in df_renamed.columns:
-        df_renamed['NPS_Combinado'] = df_renamed['NPS '].apply(nps_com_emoji)
-    else:
-        # Se a coluna não existir, criar vazia
-        df_renamed['NPS_Combinado'] = ""
+    if 'NPS ' in df_renamed.columns:
+        df_renamed['NPS_Combinado'] = df_renamed['NPS '].apply(nps_com_emoji)
+    else:
+        # Se a coluna não existir, criar vazia
+        df_renamed['NPS_Combinado'] = ""
+
+    # 5. Garantir que colunas para cálculo sejam numéricas
+    # (a correção de valores altos e o preenchimento de NaNs ficam em _finalize_projetos)
+    for col in PROJETOS_NUMERIC_COLUMNS:
+        try:
+            if col in df_renamed.columns:
+                # Converter para numérico, tratando erros como NaN
+                df_renamed[col] = pd.to_numeric(
+                    df_renamed[col], errors='coerce')
+            else:
+                print(
+                    f"AVISO: Coluna '{col}' não encontrada, criando com zeros.")
+                df_renamed[col] = 0
+        except Exception as e:
+            print(f"ERRO ao processar coluna '{col}': {e}")
+            # Tentar recuperar a coluna em caso de erro
+            df_renamed[col] = 0
+
+    # 6. Garantir que a coluna Observacoes exista e tratar NaNs
+    if 'Observacoes' not in df_renamed.columns:
+        if 'Observações' in df_renamed.columns:
+            print(f"INFO: Renomeando coluna 'Observações' para 'Observacoes'")
+            df_renamed = df_renamed.rename(
+                columns={'Observações': 'Observacoes'})
+        else:
+            print(
+                f"AVISO: Coluna 'Observações' não encontrada, criando 'Observacoes' vazia")
+            df_renamed['Observacoes'] = ""
+    else:
+        print(f"INFO: Coluna 'Observacoes' já existe no DataFrame")
+
+    if 'Observacoes' in df_renamed.columns:
+        df_renamed['Observacoes'] = df_renamed['Observacoes'].fillna(
+            "")  # Preencher NaNs com string vazia
+
+    # 7. Extrair nome do cliente do nome do projeto
+    if 'Projeto' in df_renamed.columns:
+        # Função para extrair o nome do cliente do nome do projeto
+        def extract_client_name(project_name):
+            if pd.isna(project_name) or project_name == "":
+                return "Não informado"
+
+            # Padrão: Nome do cliente antes do primeiro "|" ou o nome completo se não houver "|"
+            parts = str(project_name).split('|')
+            client_name = parts[0].strip()
+            return client_name
+
+        df_renamed['Cliente'] = df_renamed['Projeto'].apply(
+            extract_client_name)
+
+    return df_renamed
+
 
-    # 5. Garantir que colunas para cálculo sejam numéricas e preencher NaNs
-    cols_to_convert_to_numeric = ['Atraso em dias ', 'Previsão', 'Real',
-                                  'Saldo Acumulado', 'Horas Previstas (Contrato)', 'Horas Mês']
-    for col in cols_to_convert_to_numeric:
+def _finalize_projetos(df_renamed):
+    """Etapas que dependem do conjunto inteiro: correção de valores altos pela mediana"""
+    for col in PROJETOS_NUMERIC_COLUMNS:
         try:
             if col in df_renamed.columns:
-                # Converter para numérico, tratando erros como NaN
-                df_renamed[col] = pd.to_numeric(
-                    df_renamed[col], errors='coerce')
-
                 # Corrigir valores com formatação incorreta
                 if col in ['Previsão', 'Real', 'Saldo Acumulado', 'Horas Previstas (Contrato)', 'Horas Mês']:
                     # Verificar se há valores extremamente altos
@@ -842,51 +3685,16 @@ def process_data(df_projetos):
 
                 # Preencher valores nulos com zero
                 df_renamed[col] = df_renamed[col].fillna(0)
-            else:
-                print(
-                    f"AVISO: Coluna '{col}' não encontrada, criando com zeros.")
-                df_renamed[col] = 0
         except Exception as e:
             print(f"ERRO ao processar coluna '{col}': {e}")
             # Tentar recuperar a coluna em caso de erro
             df_renamed[col] = 0
 
-    # 6. Garantir que a coluna Observacoes exista e tratar NaNs
-    if 'Observacoes' not in df_renamed.columns:
-        if 'Observações' in df_renamed.columns:
-            print(f"INFO: Renomeando coluna 'Observações' para 'Observacoes'")
-            df_renamed = df_renamed.rename(
-                columns={'Observações': 'Observacoes'})
-        else:
-            print(
-                f"AVISO: Coluna 'Observações' não encontrada, criando 'Observacoes' vazia")
-            df_renamed['Observacoes'] = ""
-    else:
-        print(f"INFO: Coluna 'Observacoes' já existe no DataFrame")
-
-    # Debug: Verificar valores da coluna Observacoes
     if 'Observacoes' in df_renamed.columns:
-        df_renamed['Observacoes'] = df_renamed['Observacoes'].fillna(
-            "")  # Preencher NaNs com string vazia
         non_empty = (df_renamed['Observacoes'] != '').sum()
         print(
             f"INFO: A coluna 'Observacoes' tem {non_empty} valores não vazios de {len(df_renamed)} registros")
 
-    # 7. Extrair nome do cliente do nome do projeto
-    if 'Projeto' in df_renamed.columns:
-        # Função para extrair o nome do cliente do nome do projeto
-        def extract_client_name(project_name):
-            if pd.isna(project_name) or project_name == "":
-                return "Não informado"
-
-            # Padrão: Nome do cliente antes do primeiro "|" ou o nome completo se não houver "|"
-            parts = str(project_name).split('|')
-            client_name = parts[0].strip()
-            return client_name
-
-        df_renamed['Cliente'] = df_renamed['Projeto'].apply(
-            extract_client_name)
-
     # Print para debug
     print(
         f"Colunas disponíveis após processamento: {df_renamed.columns.tolist()}")
@@ -907,10 +3715,24 @@ def process_data(df_projetos):
 # Função para processar dados das ações
 
 
-def process_acoes(df_acoes):
+def process_acoes(df_acoes, incremental=False):
+    """Processa as ações; com incremental=True (carga da planilha) reprocessa só as linhas novas ou alteradas"""
+    if df_acoes.empty:
+        return df_acoes
+    if not incremental:
+        return _process_acoes(df_acoes)
+    return ACOES_INCREMENTAL.process(df_acoes)
+
+
+def _process_acoes(df_acoes):
+    """Processamento completo (sem reaproveitar linhas) das ações"""
     if df_acoes.empty:
         return df_acoes
+    return _finalize_acoes(_process_acoes_rows(df_acoes.copy()))
+
 
+def _process_acoes_rows(df_acoes):
+    """Etapas que dependem apenas de cada linha: valores padrão, datas e período"""
     # Debug: Mostra as colunas na entrada
     print(f"Processando ações com colunas: {df_acoes.columns.tolist()}")
 
@@ -925,81 +3747,16 @@ def process_acoes(df_acoes):
             print(f"Convertendo coluna {col} para datetime")
             df_acoes[col] = pd.to_datetime(df_acoes[col], errors='coerce')
 
-    # Calcular dias até a data limite (para ações pendentes)
-    hoje = pd.Timestamp.now().normalize()
-
-    # Verificar se há valores NaT/None e tratá-los antes da operação
-    df_acoes['Dias Restantes'] = pd.NA
-    mask_data_limite_valida = ~df_acoes['Data Limite'].isna()
-
-    # Aplicar o cálculo apenas onde há datas válidas
-    if mask_data_limite_valida.any():
-        # Garantir que a data limite seja um objeto datetime antes do cálculo
-        # Converter qualquer string para datetime se necessário
-        if df_acoes.loc[mask_data_limite_valida, 'Data Limite'].dtype == 'object':
-            df_acoes.loc[mask_data_limite_valida, 'Data Limite'] = pd.to_datetime(
-                df_acoes.loc[mask_data_limite_valida, 'Data Limite'],
-                errors='coerce'
-            )
-            # Atualizar a máscara para considerar apenas valores válidos após a conversão
-            mask_data_limite_valida = ~df_acoes['Data Limite'].isna()
-
-        # Calcular dias restantes para cada linha individualmente para evitar operações com arrays
-        for idx in df_acoes[mask_data_limite_valida].index:
-            try:
-                data_limite = pd.to_datetime(df_acoes.at[idx, 'Data Limite'])
-                if pd.notna(data_limite):
-                    df_acoes.at[idx, 'Dias Restantes'] = (
-                        data_limite - hoje).days
-            except Exception as e:
-                print(
-                    f"Erro ao calcular dias restantes para índice {idx}: {e}")
-                df_acoes.at[idx, 'Dias Restantes'] = pd.NA
-
-    # Marcar ações atrasadas (com status pendente e data limite passada)
-    df_acoes['Atrasada'] = (
-        (df_acoes['Dias Restantes'].notna()) &
-        (df_acoes['Dias Restantes'] < 0) &
-        (df_acoes['Status'] != 'Concluída')
-    ).astype(int)
-
-    # Calcular tempo de conclusão para ações concluídas
-    df_acoes['Tempo de Conclusão'] = pd.NA
-    mask_concluida = (df_acoes['Status'] == 'Concluída') & ~df_acoes['Data de Conclusão'].isna(
-    ) & ~df_acoes['Data de Cadastro'].isna()
-
-    if mask_concluida.any():
-        # Garantir que ambas as datas sejam objetos datetime
-        if df_acoes.loc[mask_concluida, 'Data de Conclusão'].dtype == 'object':
-            df_acoes.loc[mask_concluida, 'Data de Conclusão'] = pd.to_datetime(
-                df_acoes.loc[mask_concluida, 'Data de Conclusão'],
-                errors='coerce'
-            )
+    # Período yyyymm do mês de referência, comum com os projetos
+    df_acoes['Periodo'] = acoes_periodo(df_acoes)
 
-        if df_acoes.loc[mask_concluida, 'Data de Cadastro'].dtype == 'object':
-            df_acoes.loc[mask_concluida, 'Data de Cadastro'] = pd.to_datetime(
-                df_acoes.loc[mask_concluida, 'Data de Cadastro'],
-                errors='coerce'
-            )
+    return df_acoes
 
-        # Atualizar máscara após conversões
-        mask_concluida = (df_acoes['Status'] == 'Concluída') & ~df_acoes['Data de Conclusão'].isna(
-        ) & ~df_acoes['Data de Cadastro'].isna()
 
-        # Calcular tempo de conclusão linha por linha
-        for idx in df_acoes[mask_concluida].index:
-            try:
-                data_conclusao = pd.to_datetime(
-                    df_acoes.at[idx, 'Data de Conclusão'])
-                data_cadastro = pd.to_datetime(
-                    df_acoes.at[idx, 'Data de Cadastro'])
-                if pd.notna(data_conclusao) and pd.notna(data_cadastro):
-                    df_acoes.at[idx, 'Tempo de Conclusão'] = (
-                        data_conclusao - data_cadastro).days
-            except Exception as e:
-                print(
-                    f"Erro ao calcular tempo de conclusão para índice {idx}: {e}")
-                df_acoes.at[idx, 'Tempo de Conclusão'] = pd.NA
+def _finalize_acoes(df_acoes):
+    """Etapas recalculadas sobre todas as linhas: os dias dependem da data de hoje"""
+    # Dias Restantes, Atrasada e Tempo de Conclusão
+    df_acoes = acoes_derived_columns(df_acoes)
 
     # Debug: Mostra as colunas na saída
     print(f"Ações processadas com colunas: {df_acoes.columns.tolist()}")
@@ -1008,6 +3765,48 @@ def process_acoes(df_acoes):
     return df_acoes
 
 
+PROJETOS_INCREMENTAL = IncrementalFrameProcessor(
+    'projetos', _process_projetos_rows, _finalize_projetos)
+ACOES_INCREMENTAL = IncrementalFrameProcessor(
+    'acoes', _process_acoes_rows, _finalize_acoes)
+
+
+# Colunas calculadas das ações
+
+
+def acoes_derived_columns(df_acoes, hoje=None):
+    """Calcula Dias Restantes, Atrasada e Tempo de Conclusão com operações sobre as colunas inteiras.
+
+    As datas já devem estar convertidas para datetime64 (ver process_acoes);
+    valores ausentes resultam em <NA> nas colunas de dias.
+    """
+    if hoje is None:
+        hoje = pd.Timestamp.now().normalize()
+
+    # Dias até a data limite (negativos quando vencida)
+    data_limite = pd.to_datetime(df_acoes['Data Limite'], errors='coerce')
+    df_acoes['Dias Restantes'] = (data_limite - hoje).dt.days.astype('Int64')
+
+    # Ações atrasadas: data limite passada e ainda não concluídas
+    df_acoes['Atrasada'] = (
+        (df_acoes['Dias Restantes'] < 0).fillna(False) &
+        (df_acoes['Status'] != 'Concluída')
+    ).astype(int)
+
+    # Dias entre o cadastro e a conclusão, apenas para ações concluídas
+    conclusao = pd.to_datetime(df_acoes['Data de Conclusão'], errors='coerce')
+    cadastro = pd.to_datetime(df_acoes['Data de Cadastro'], errors='coerce')
+    tempo = (conclusao - cadastro).dt.days.astype('Int64')
+    df_acoes['Tempo de Conclusão'] = tempo.where(df_acoes['Status'] == 'Concluída')
+    return df_acoes
+
+
+def acoes_status_detalhado(df_acoes):
+    """Status exibido na tabela de ações: 'Atrasada' para pendências vencidas, senão o próprio status"""
+    status = df_acoes['Status']
+    return status.where((status == 'Concluída') | (df_acoes['Atrasada'] != 1), 'Atrasada')
+
+
 # Inicializar o aplicativo Dash com tema Bootstrap e definir o título da página
 app = dash.Dash(
     __name__,
@@ -1018,38 +3817,540 @@ app = dash.Dash(
 )
 server = app.server
 
+# Endpoint com as métricas de acesso ao Google Sheets
+
+
+@server.route('/metrics')
+def metrics_endpoint():
+    return jsonify({
+        'sheets_session': SHEETS_SESSION.get_metrics(),
+        'sheets_changes': SHEETS_CHANGE_DETECTOR.get_stats(),
+        'datasets': DATASET_CACHE.get_stats(),
+        'refresher': SNAPSHOT_REFRESHER.get_status(),
+        'single_flight': SHEETS_SINGLE_FLIGHT.get_stats(),
+        'rate_limiter': SHEETS_RATE_LIMITER.get_stats(),
+        'circuit_breaker': SHEETS_CIRCUIT_BREAKER.get_status(),
+        'acoes_write_queue': ACOES_WRITE_QUEUE.get_status() if ACOES_WRITE_QUEUE is not None else None,
+        'acoes_journal': ACOES_JOURNAL.get_stats(),
+        'acoes_ids': ACOES_ID_SEQUENCE.get_stats() if ACOES_ID_SEQUENCE is not None else None,
+        'save_dedup': SAVE_DEDUPLICATOR.get_stats(),
+        'process_data_cache': PROCESSED_DATA_MEMO.get_stats(),
+        'incremental_processing': {
+            'projetos': PROJETOS_INCREMENTAL.get_stats(),
+            'acoes': ACOES_INCREMENTAL.get_stats(),
+        },
+        'startup': {'mode': STARTUP_LOAD_MODE, 'phases_seconds': STARTUP_TIMINGS},
+    })
+
+
+# Atualização dos dados em segundo plano
+
+# Intervalo (segundos) entre as verificações do atualizador em segundo plano
+REFRESH_CHECK_INTERVAL = 30
+# Fração do CACHE_DURATION a partir da qual os dados são recarregados
+REFRESH_AHEAD_RATIO = 0.8
+# Intervalo (ms) com que cada navegador verifica se há dados mais novos
+SNAPSHOT_POLL_INTERVAL_MS = 10 * 1000
+
+
+def build_data_snapshot():
+    """Carrega e processa Projetos, Codenautas e Ações, usando os backups locais para o que vier vazio"""
+    # Alterações do diário registradas durante a carga ainda podem faltar nos dados lidos
+    marca_diario = ACOES_JOURNAL.mark()
+    if SHEETS_BACKEND == 'xlsx':
+        # Revisão offline a partir da planilha exportada: sem o arquivo, falhar
+        # em vez de consultar o Google Sheets sem que ninguém perceba
+        dados = load_processed_from_xlsx()
+        if dados is None:
+            raise FileNotFoundError(
+                f"SHEETS_BACKEND=xlsx, mas o arquivo {EXCEL_FILE_PATH} não foi encontrado")
+    else:
+        # Recarregar as três abas do Google Sheets em uma única requisição,
+        # reaproveitando o resultado processado se a planilha não mudou
+        dados = load_processed_from_sheets()
+    if dados is None:
+        # Leitura em lote indisponível: carregar as abas em paralelo e processar
+        dados = load_processed_parallel()
+
+    df_projetos = dados['projetos']
+    if not df_projetos.empty:
+        save_data_to_local(df_projetos, "projetos", processado=True)
+    else:
+        # Tentar carregar do backup local apenas se não conseguir dados do Google Sheets
+        print("Alerta: Não foi possível obter dados de projetos do Google Sheets")
+        df_local = load_processed_from_local("projetos", process_data)
+        if df_local is not None:
+            df_projetos = df_local
+            print(f"Usando backup local com {len(df_projetos)} projetos")
+
+    df_codenautas = dados['codenautas']
+    if not df_codenautas.empty:
+        save_data_to_local(df_codenautas, "codenautas")
+    else:
+        print("Alerta: Não foi possível obter dados de codenautas do Google Sheets")
+        df_local = load_data_from_local("codenautas")
+        if df_local is not None:
+            df_codenautas = df_local
+            print(f"Usando backup local com {len(df_codenautas)} codenautas")
+
+    # Dados das ações (já processados)
+    df_acoes = dados['acoes']
+    if not df_acoes.empty:
+        DATASET_CACHE.update('acoes', lambda _: df_acoes)
+        save_data_to_local(df_acoes, "acoes", processado=True, journal_mark=marca_diario)
+    else:
+        df_local = load_processed_from_local("acoes", process_acoes)
+        if df_local is not None and not df_local.empty:
+            df_acoes = df_local
+            print(f"Usando backup local com {len(df_acoes)} ações")
+
+    return {'projetos': df_projetos, 'codenautas': df_codenautas, 'acoes': df_acoes}
+
+
+def build_local_snapshot():
+    """Monta o snapshot a partir dos backups locais, sem acessar o Google Sheets"""
+    snapshot = {
+        'projetos': load_processed_from_local("projetos", process_data),
+        'codenautas': load_data_from_local("codenautas"),
+        'acoes': load_processed_from_local("acoes", process_acoes),
+    }
+    return {name: df if df is not None else pd.DataFrame() for name, df in snapshot.items()}
+
+
+def load_processed_from_local(name, process):
+    """Carrega o backup local já processado, processando-o apenas se o snapshot guardar dados brutos"""
+    df, processado = load_data_from_local(name, with_flag=True)
+    if df is not None and not processado:
+        df = process(df)
+    return df
+
+
+# Snapshot compartilhado entre workers do gunicorn
+
+# Arquivo SQLite com o snapshot compartilhado (defina SHARED_SNAPSHOT_DB="" para desativar)
+SHARED_SNAPSHOT_DB = os.getenv('SHARED_SNAPSHOT_DB', 'snapshot_compartilhado.sqlite3')
+# Validade da liderança: se o worker líder parar de renová-la, outro assume
+SHARED_SNAPSHOT_LEASE_SECONDS = 120
+# Intervalo (segundos) com que os workers consultam o snapshot compartilhado
+SHARED_SNAPSHOT_POLL_SECONDS = 5
+# Tempo máximo que um worker aguarda o snapshot do líder ao iniciar
+SHARED_SNAPSHOT_STARTUP_WAIT = 60
+
+
+def next_snapshot_version(anterior):
+    """Próxima versão de snapshot: o horário em milissegundos, sempre acima da anterior.
+
+    Baseada no relógio, a versão continua crescendo mesmo depois de reiniciar
+    o servidor ou recriar o arquivo compartilhado, então os navegadores com
+    uma versão antiga em memória aceitam os dados novos.
+    """
+    return max(anterior + 1, int(time.time() * 1000))
+
+
+class SharedSnapshotStore:
+    """Guarda o snapshot processado em um arquivo SQLite lido por todos os workers.
+
+    Apenas o worker que detém a liderança (um lease com prazo de validade)
+    consulta o Google Sheets; os demais carregam o snapshot publicado por ele
+    sempre que a versão gravada no arquivo aumenta. Cada DataFrame é gravado
+    como um stream Arrow IPC e a lista de conjuntos como JSON: ler o arquivo
+    nunca executa código e o formato não depende da versão do pandas.
+    """
+
+    def __init__(self, path, lease_seconds=SHARED_SNAPSHOT_LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._local = threading.local()
+        self._stats = {'leader': False, 'lease_errors': 0,
+                       'snapshots_saved': 0, 'snapshots_loaded': 0}
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS snapshot (id INTEGER PRIMARY KEY CHECK (id = 1), '
+            'version INTEGER NOT NULL, updated_at REAL NOT NULL, worker TEXT, metadata TEXT NOT NULL)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS snapshot_frames (name TEXT PRIMARY KEY, payload BLOB NOT NULL)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS refresh_requests (id INTEGER PRIMARY KEY CHECK (id = 1), '
+            'requested_at REAL NOT NULL, force INTEGER NOT NULL)')
+
+    def _connect(self):
+        return _sqlite_conn(self._local, self.path)
+
+    def try_acquire_lease(self, name='refresher'):
+        """Obtém ou renova a liderança; retorna True se este worker for o líder"""
+        conn = self._connect()
+        agora = time.time()
+        try:
+            with _sqlite_tx(conn):
+                row = conn.execute(
+                    'SELECT holder, expires_at FROM leases WHERE name = ?', (name,)).fetchone()
+                lider = row is None or row[0] == self.worker_id or row[1] < agora
+                if lider:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES (?, ?, ?)',
+                        (name, self.worker_id, agora + self.lease_seconds))
+        except sqlite3.Error as e:
+            print(f"⚠️ Erro ao consultar a liderança no snapshot compartilhado, atuando sem coordenação: {e}")
+            self._stats['lease_errors'] += 1
+            lider = True
+        self._stats['leader'] = lider
+        return lider
+
+    def save_snapshot(self, snapshot):
+        """Grava um novo snapshot e retorna a versão atribuída a ele"""
+        frames = [(name, dataframe_to_arrow_bytes(df)) for name, df in snapshot.items()]
+        metadata = json.dumps({'datasets': list(snapshot)})
+        conn = self._connect()
+        with _sqlite_tx(conn):
+            row = conn.execute('SELECT version FROM snapshot WHERE id = 1').fetchone()
+            versao = next_snapshot_version(row[0] if row else 0)
+            conn.execute('DELETE FROM snapshot_frames')
+            conn.executemany('INSERT INTO snapshot_frames (name, payload) VALUES (?, ?)', frames)
+            conn.execute(
+                'INSERT OR REPLACE INTO snapshot (id, version, updated_at, worker, metadata) VALUES (1, ?, ?, ?, ?)',
+                (versao, time.time(), self.worker_id, metadata))
+        self._stats['snapshots_saved'] += 1
+        return versao
+
+    def latest_version(self):
+        """Retorna (versão, horário) do snapshot gravado ou (0, None)"""
+        row = self._connect().execute(
+            'SELECT version, updated_at FROM snapshot WHERE id = 1').fetchone()
+        return (row[0], row[1]) if row else (0, None)
+
+    def load_snapshot(self):
+        """Retorna (versão, horário, snapshot) do arquivo ou None"""
+        conn = self._connect()
+        # Versão e DataFrames lidos na mesma transação, para não misturar dois snapshots
+        with _sqlite_tx(conn, 'BEGIN'):
+            row = conn.execute(
+                'SELECT version, updated_at, metadata FROM snapshot WHERE id = 1').fetchone()
+            frames = dict(conn.execute('SELECT name, payload FROM snapshot_frames').fetchall())
+        if row is None:
+            return None
+        snapshot = {name: dataframe_from_arrow_bytes(frames[name])
+                    for name in json.loads(row[2])['datasets']}
+        self._stats['snapshots_loaded'] += 1
+        return row[0], row[1], snapshot
+
+    def request_refresh(self, force=False):
+        """Registra um pedido de recarga para o worker líder"""
+        conn = self._connect()
+        with _sqlite_tx(conn):
+            row = conn.execute('SELECT force FROM refresh_requests WHERE id = 1').fetchone()
+            conn.execute(
+                'INSERT OR REPLACE INTO refresh_requests (id, requested_at, force) VALUES (1, ?, ?)',
+                (time.time(), int(force or (row is not None and row[0]))))
+
+    def pop_refresh_request(self):
+        """Consome o pedido de recarga pendente; retorna None ou se a recarga deve ser forçada"""
+        conn = self._connect()
+        with _sqlite_tx(conn):
+            row = conn.execute('SELECT force FROM refresh_requests WHERE id = 1').fetchone()
+            if row is not None:
+                conn.execute('DELETE FROM refresh_requests WHERE id = 1')
+        return None if row is None else bool(row[0])
+
+    def get_status(self):
+        status = dict(self._stats)
+        status['worker'] = self.worker_id
+        status['path'] = self.path
+        try:
+            status['version'] = self.latest_version()[0]
+        except sqlite3.Error as e:
+            status['error'] = str(e)
+        return status
+
+
+def create_shared_snapshot_store():
+    """Abre o snapshot compartilhado configurado (None se desativado ou indisponível)"""
+    if not SHARED_SNAPSHOT_DB:
+        return None
+    try:
+        return SharedSnapshotStore(SHARED_SNAPSHOT_DB)
+    except sqlite3.Error as e:
+        print(f"⚠️ Snapshot compartilhado indisponível, cada worker carregará seus dados: {e}")
+        return None
+
+
+class SnapshotRefresher:
+    """Mantém a última versão boa dos dados e a recarrega em uma thread de segundo plano.
+
+    Os callbacks leem sempre o snapshot atual, sem esperar pela API do Google;
+    a thread recarrega os dados antes do CACHE_DURATION vencer ou quando uma
+    atualização é solicitada (botão "Atualizar Dados", gravações).
+
+    Com um SharedSnapshotStore, só o worker líder recarrega os dados; os
+    outros acompanham as versões publicadas por ele no arquivo compartilhado.
+    """
+
+    def __init__(self, build, ttl=CACHE_DURATION, check_interval=REFRESH_CHECK_INTERVAL,
+                 ahead_ratio=REFRESH_AHEAD_RATIO, store=None):
+        self._build = build
+        self.store = store
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.ahead_ratio = ahead_ratio
+        self._cond = threading.Condition()
+        self._snapshot = None
+        self._version = 0
+        self._updated_at = None
+        self._refreshing = False
+        self._warming = False
+        self._warm_started = None
+        self._requested = False
+        self._force = False
+        self._thread = None
+        self._stats = {'refreshes': 0, 'failures': 0, 'last_error': None,
+                       'last_refresh_seconds': None, 'last_attempt_at': None}
+
+    def publish(self, snapshot, version=None, updated_at=None, warming=False):
+        """Publica um novo snapshot (por padrão com a próxima versão, ver next_snapshot_version)"""
+        with self._cond:
+            if self._warming and not warming and self._warm_started is not None:
+                record_startup_phase('aquecimento_sheets', self._warm_started)
+            self._snapshot = snapshot
+            self._version = next_snapshot_version(self._version) if version is None else version
+            self._updated_at = time.time() if updated_at is None else updated_at
+            self._warming = warming
+            return self._version
+
+    def warm_start(self, build_local):
+        """Publica os dados locais como versão 0 ("aquecendo") e deixa o Google Sheets para a thread"""
+        with self._cond:
+            self._warm_started = time.perf_counter()
+            if self._snapshot is not None:
+                # Snapshot compartilhado vencido: servi-lo enquanto o líder recarrega
+                self._warming = True
+                return
+        snapshot = build_local()
+        arquivos = [caminho for caminho in (local_snapshot_path('projetos'), 'projetos_backup.csv')
+                    if os.path.exists(caminho)]
+        updated_at = max(map(os.path.getmtime, arquivos)) if arquivos else time.time()
+        self.publish(snapshot, version=0, updated_at=updated_at, warming=True)
+
+    def get_snapshot(self):
+        """Retorna (versão, snapshot) sem bloquear"""
+        with self._cond:
+            return self._version, self._snapshot
+
+    def request_refresh(self, force=False):
+        """Pede à thread de segundo plano uma recarga assim que possível"""
+        if self.store is not None:
+            # O pedido fica no arquivo compartilhado para que o líder o atenda
+            try:
+                self.store.request_refresh(force)
+            except sqlite3.Error as e:
+                print(f"⚠️ Não foi possível registrar o pedido de recarga compartilhado: {e}")
+        with self._cond:
+            self._requested = True
+            self._force = self._force or force
+            self._cond.notify_all()
+
+    def refresh_now(self, force=False):
+        """Recarrega os dados na thread atual; chamadas simultâneas aguardam a mesma recarga"""
+        return SHEETS_SINGLE_FLIGHT.do('snapshot', lambda: self._refresh(force), force=force)
+
+    def _refresh(self, force):
+        # Em caso de erro mantém o snapshot anterior
+        with self._cond:
+            self._refreshing = True
+            self._stats['last_attempt_at'] = time.time()
+        inicio = time.perf_counter()
+        try:
+            if force:
+                # Descartar os dados em cache para baixar tudo de novo
+                for name in SHEETS_TABS:
+                    DATASET_CACHE.invalidate(name)
+            snapshot = self._build()
+            versao = None
+            if self.store is not None:
+                try:
+                    versao = self.store.save_snapshot(snapshot)
+                except Exception as e:
+                    print(f"⚠️ Não foi possível gravar o snapshot compartilhado: {e}")
+            self.publish(snapshot, versao)
+            with self._cond:
+                self._stats['refreshes'] += 1
+                self._stats['last_error'] = None
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao atualizar os dados em segundo plano: {e}")
+            with self._cond:
+                self._stats['failures'] += 1
+                self._stats['last_error'] = str(e)
+            return False
+        finally:
+            with self._cond:
+                self._refreshing = False
+                self._stats['last_refresh_seconds'] = round(
+                    time.perf_counter() - inicio, 3)
+
+    def _due(self):
+        if self._updated_at is None or self._warming:
+            return True
+        return time.time() - self._updated_at >= self.ttl * self.ahead_ratio
+
+    def sync_from_store(self):
+        """Carrega o snapshot compartilhado se ele for mais novo que o local"""
+        try:
+            versao, _ = self.store.latest_version()
+            if versao <= self._version:
+                return False
+            carregado = self.store.load_snapshot()
+        except Exception as e:
+            print(f"⚠️ Erro ao ler o snapshot compartilhado: {e}")
+            return False
+        if carregado is None:
+            return False
+        versao, updated_at, snapshot = carregado
+        self.publish(snapshot, versao, updated_at)
+        print(f"Snapshot compartilhado versão {versao} carregado")
+        return True
+
+    def initial_load(self, bloqueante=True):
+        """Carrega os dados ao iniciar o processo, reaproveitando o snapshot compartilhado.
+
+        Com bloqueante=False serve os backups locais e deixa a carga do Google
+        Sheets para a thread de segundo plano.
+        """
+        if self.store is not None:
+            self.sync_from_store()
+            if self._snapshot is not None and not self._due():
+                return True
+        if not bloqueante:
+            self.warm_start(build_local_snapshot)
+            return True
+        if self.store is None:
+            return self.refresh_now()
+        if self.store.try_acquire_lease():
+            return self.refresh_now()
+
+        # Outro worker está carregando: aguardar o snapshot publicado por ele
+        print("Aguardando o snapshot do worker responsável pelas recargas...")
+        limite = time.time() + SHARED_SNAPSHOT_STARTUP_WAIT
+        while time.time() < limite:
+            if self.sync_from_store() and not self._due():
+                return True
+            time.sleep(1)
+        if self._snapshot is not None:
+            return True
+        return self.refresh_now()
+
+    def _run(self):
+        espera = self.check_interval
+        if self.store is not None:
+            espera = min(espera, SHARED_SNAPSHOT_POLL_SECONDS)
+        # Pedido de recarga adiado enquanto a fila de gravação tem pendências
+        adiado = (False, False)
+        adiado_desde = None
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._requested or (self.store is None and self._due()),
+                    timeout=espera)
+                requested = self._requested or adiado[0]
+                force = self._force or adiado[1]
+                self._requested = False
+                self._force = False
+
+            if self.store is not None:
+                if not self.store.try_acquire_lease():
+                    # Outro worker é o líder: apenas acompanhar as versões publicadas
+                    self.sync_from_store()
+                    continue
+                # Líder: atender pedidos feitos em qualquer worker
+                self.sync_from_store()
+                try:
+                    pedido = self.store.pop_refresh_request()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Erro ao ler pedidos de recarga compartilhados: {e}")
+                    pedido = None
+                if pedido is not None:
+                    requested = True
+                    force = force or pedido
+
+            if not (requested or self._due()):
+                continue
+            if SHEETS_CIRCUIT_BREAKER.is_open():
+                # Google Sheets fora do ar: continuar servindo o snapshot atual
+                # em vez de substituí-lo pelos backups locais
+                continue
+            if ACOES_WRITE_QUEUE is not None and ACOES_WRITE_QUEUE.pending_count():
+                # A planilha ainda não tem as últimas gravações de ações: recarregar
+                # agora apagaria essas alterações da tela. A fila pede a recarga
+                # quando terminar de enviá-las; se ela não esvaziar a tempo,
+                # recarregar assim mesmo para não servir dados velhos indefinidamente.
+                if adiado_desde is None:
+                    adiado_desde = time.time()
+                if time.time() - adiado_desde < ACOES_OUTBOX_MAX_REFRESH_DELAY:
+                    adiado = (requested, force)
+                    continue
+                print("⚠️ Fila de gravação da guia 'Ações' ainda com pendências; "
+                      "recarregando os dados mesmo assim")
+            adiado_desde = None
+            adiado = (False, False)
+            self.refresh_now(force)
+            if self._stats['last_error'] is not None:
+                # Evitar martelar a API enquanto ela estiver falhando
+                time.sleep(self.check_interval)
+
+    def start(self):
+        """Inicia a thread de atualização (apenas uma vez por processo)"""
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="sheets-refresher", daemon=True)
+            self._thread.start()
+
+    def get_status(self):
+        with self._cond:
+            status = dict(self._stats)
+            status.update({
+                'shared_store': self.store.get_status() if self.store is not None else None,
+                'version': self._version,
+                'refreshing': self._refreshing,
+                'warming': self._warming,
+                'pending_request': self._requested,
+                'age_seconds': round(time.time() - self._updated_at, 1) if self._updated_at else None,
+                'updated_at': datetime.fromtimestamp(self._updated_at).isoformat(timespec='seconds') if self._updated_at else None,
+            })
+        return status
+
+
+SNAPSHOT_REFRESHER = SnapshotRefresher(
+    build_data_snapshot, store=create_shared_snapshot_store())
+
 # Carregar e processar dados iniciais
-print("Iniciando carregamento de dados...")
-df_projetos_initial = load_data_from_sheets()
-if df_projetos_initial.empty:
-    # Tentar carregar do backup local
-    print("Tentando carregar dados de projetos do backup local...")
-    df_local = load_data_from_local("projetos")
-    if df_local is not None:
-        df_projetos_initial = df_local
-
-print("Processando dados...")
-df_projetos_initial = process_data(df_projetos_initial)
-print("Carregando dados de codenautas...")
-df_codenautas_initial = load_codenautas_from_sheets()
-if df_codenautas_initial.empty:
-    # Tentar carregar do backup local
-    print("Tentando carregar dados de codenautas do backup local...")
-    df_local = load_data_from_local("codenautas")
-    if df_local is not None:
-        df_codenautas_initial = df_local
-
-print("Carregando dados de ações...")
-df_acoes_initial = load_acoes_from_sheets()
-if df_acoes_initial.empty:
-    # Tentar carregar do backup local
-    print("Tentando carregar dados de ações do backup local...")
-    df_local = load_data_from_local("acoes")
-    if df_local is not None:
-        df_acoes_initial = df_local
-
-print("Processando dados de ações...")
-df_acoes_initial = process_acoes(df_acoes_initial)
+record_startup_phase('configuracao', _STARTUP_INICIO)
+print(f"Iniciando carregamento de dados (modo {STARTUP_LOAD_MODE})...")
+_inicio_fase = time.perf_counter()
+# Alterações de ações que ficaram só no diário (ex.: queda do servidor) voltam ao snapshot local
+ACOES_JOURNAL.recover()
+SNAPSHOT_REFRESHER.initial_load(bloqueante=STARTUP_LOAD_MODE == 'blocking')
+record_startup_phase('carga_inicial', _inicio_fase)
+_inicio_fase = time.perf_counter()
+versao_inicial, dados_iniciais = SNAPSHOT_REFRESHER.get_snapshot()
+if dados_iniciais is None:
+    dados_iniciais = {'projetos': pd.DataFrame(), 'codenautas': pd.DataFrame(),
+                      'acoes': pd.DataFrame()}
+df_projetos_initial = dados_iniciais['projetos']
+df_codenautas_initial = dados_iniciais['codenautas']
+df_acoes_initial = dados_iniciais['acoes']
+# Alinhar a sequência de IDs com o maior ID conhecido (planilha ou backup local)
+register_acoes_ids(df_acoes_initial)
+
+# A partir daqui os dados são recarregados em segundo plano
+SNAPSHOT_REFRESHER.start()
+if ACOES_WRITE_QUEUE is not None:
+    # Envia também as gravações que ficaram pendentes da execução anterior
+    ACOES_WRITE_QUEUE.start()
+
 print("Dados carregados com sucesso!")
 print("Dados carregados com sucesso!")
 
@@ -1060,7 +4361,8 @@ def get_filter_options(df):
     if df.empty:
         # Adicionado um [] extra para o status financeiro
         return [], [], [], [], [], [], []
-    meses_anos = sorted(df['MesAnoFormatado'].unique())
+    # Períodos yyyymm em ordem cronológica (os rótulos são gerados nos dropdowns)
+    meses_anos = sorted(int(periodo) for periodo in df['Periodo'].dropna().unique()) if 'Periodo' in df.columns else []
     gestoras = sorted(df['GP Responsável'].unique())
     status_list = sorted(df['Status'].unique())
     segmentos = sorted(df['Segmento'].unique())
@@ -1094,6 +4396,10 @@ app.layout = html.Div(style=custom_style['body'], children=[
                     'backgroundColor': codeart_colors['blue_sky'], 'borderColor': codeart_colors['blue_sky']}
             ),
             html.Span(id="last-update-time",
+                      style=custom_style['last_update_style']),
+            html.Span(id="sheets-status-badge",
+                      style=custom_style['last_update_style']),
+            html.Span(id="acoes-pending-badge",
                       style=custom_style['last_update_style'])
         ], style={'display': 'flex', 'align-items': 'center'})
     ]),
@@ -1125,8 +4431,8 @@ app.layout = html.Div(style=custom_style['body'], children=[
                                 html.Label("Mês/Ano"),
                                 dcc.Dropdown(
                                     id="mes-ano-filter",
-                                    options=[{"label": mes, "value": mes}
-                                             for mes in meses_anos_initial],
+                                    options=[{"label": periodo_label(periodo), "value": periodo}
+                                             for periodo in meses_anos_initial],
                                     multi=True,
                                     placeholder="Selecione o mês/ano"
                                 )
@@ -1418,8 +4724,8 @@ app.layout = html.Div(style=custom_style['body'], children=[
                                 html.Label("Mês/Ano"),
                                 dcc.Dropdown(
                                     id="mes-ano-filter-acoes",
-                                    options=[{"label": mes, "value": mes}
-                                             for mes in meses_anos_initial],
+                                    options=[{"label": periodo_label(periodo), "value": periodo}
+                                             for periodo in meses_anos_initial],
                                     multi=True,
                                     placeholder="Selecione o mês/ano"
                                 )
@@ -1864,6 +5170,13 @@ app.layout = html.Div(style=custom_style['body'], children=[
         dcc.Store(id="codenautas-store",
                   data=df_codenautas_initial.to_dict('records')),
         dcc.Store(id="acoes-store", data=df_acoes_initial.to_dict('records')),
+        # Versão do snapshot de dados presente no navegador
+        dcc.Store(id="snapshot-version-store", data=versao_inicial),
+        # Tokens de gravação gerados ao abrir os modais de ação (evitam gravações repetidas)
+        dcc.Store(id="modal-save-token"),
+        dcc.Store(id="modal-edit-save-token"),
+        dcc.Interval(id="snapshot-poll-interval",
+                     interval=SNAPSHOT_POLL_INTERVAL_MS),
         dcc.Store(id="filter-options-store", data={
             "meses_anos": meses_anos_initial,
             "gestoras": gestoras_initial,
@@ -1890,14 +5203,77 @@ app.layout = html.Div(style=custom_style['body'], children=[
 
 @app.callback(
     Output("last-update-time", "children"),
-    Input("refresh-data-button", "n_clicks"),
-    prevent_initial_call=True
+    [
+        Input("refresh-data-button", "n_clicks"),
+        Input("snapshot-poll-interval", "n_intervals")
+    ]
 )
-def update_time(n_clicks):
-    if n_clicks:
-        now = datetime.now()
-        return f"Última atualização: {now.strftime('%d/%m/%Y %H:%M:%S')}"
-    return ""
+def update_time(n_clicks, n_intervals):
+    status = SNAPSHOT_REFRESHER.get_status()
+    if status['updated_at'] is None:
+        return "Carregando dados..."
+    texto = f"Última atualização: {datetime.fromisoformat(status['updated_at']).strftime('%d/%m/%Y %H:%M:%S')}"
+    if status['warming']:
+        texto += " (dados locais, carregando do Google Sheets...)"
+    elif status['refreshing'] or status['pending_request']:
+        texto += " (atualizando...)"
+    elif status['last_error']:
+        texto += " (falha na última atualização)"
+    return texto
+
+# Callback para mostrar a situação da conexão com o Google Sheets
+
+
+@app.callback(
+    [
+        Output("sheets-status-badge", "children"),
+        Output("sheets-status-badge", "style")
+    ],
+    Input("snapshot-poll-interval", "n_intervals")
+)
+def update_sheets_status(n_intervals):
+    status = SHEETS_CIRCUIT_BREAKER.get_status()
+    style = dict(custom_style['last_update_style'])
+    if status['state'] == SheetsCircuitBreaker.ABERTO:
+        style['color'] = codeart_colors['danger']
+        texto = "Google Sheets indisponível: exibindo dados em cache"
+        if status['retry_in_seconds']:
+            texto += f" (nova tentativa em {status['retry_in_seconds']:.0f}s)"
+        return [html.I(className="fas fa-exclamation-triangle me-1"), texto], style
+    if status['state'] == SheetsCircuitBreaker.MEIO_ABERTO:
+        style['color'] = '#fd7e14'
+        return [html.I(className="fas fa-plug me-1"), "Testando conexão com o Google Sheets..."], style
+    style['color'] = codeart_colors['success']
+    return [html.I(className="fas fa-check-circle me-1"), "Google Sheets conectado"], style
+
+# Callback para mostrar quantas gravações de ações aguardam envio ao Google Sheets
+
+
+@app.callback(
+    [
+        Output("acoes-pending-badge", "children"),
+        Output("acoes-pending-badge", "style")
+    ],
+    [
+        Input("snapshot-poll-interval", "n_intervals"),
+        Input("acoes-store", "data")
+    ]
+)
+def update_acoes_pending_badge(n_intervals, acoes_data):
+    style = dict(custom_style['last_update_style'])
+    if ACOES_WRITE_QUEUE is None:
+        style['display'] = 'none'
+        return "", style
+    status = ACOES_WRITE_QUEUE.get_status()
+    pendentes = status.get('pending', 0)
+    if not pendentes:
+        style['display'] = 'none'
+        return "", style
+    style['color'] = '#fd7e14'
+    texto = f"{pendentes} alteração(ões) aguardando sincronização"
+    if status['consecutive_failures']:
+        texto += f" ({status['consecutive_failures']} tentativa(s) com erro)"
+    return [html.I(className="fas fa-cloud-upload-alt me-1"), texto], style
 
 # Callback para atualizar os dados quando o botão de atualização é clicado
 
@@ -1906,108 +5282,30 @@ def update_time(n_clicks):
     [
         Output("raw-data-store", "data"),
         Output("codenautas-store", "data"),
-        Output("acoes-store", "data")
+        Output("acoes-store", "data"),
+        Output("snapshot-version-store", "data")
+    ],
+    [
+        Input("refresh-data-button", "n_clicks"),
+        Input("snapshot-poll-interval", "n_intervals")
     ],
-    Input("refresh-data-button", "n_clicks"),
+    State("snapshot-version-store", "data"),
     prevent_initial_call=True
 )
-def refresh_data(n_clicks):
-    global CACHE_PROJETOS, CACHE_CODENAUTAS, CACHE_ACOES, LAST_CACHE_UPDATE
-
-    if n_clicks:
-        print("\n===== Atualizando todos os dados do Google Sheets =====")
-        # Forçar atualização invalidando completamente o cache
-        LAST_CACHE_UPDATE = 0
-        CACHE_PROJETOS = None
-        CACHE_CODENAUTAS = None
-        CACHE_ACOES = None  # Garantir que o cache de ações seja limpo
-
-        # Recarregar dados do Google Sheets
-        df_projetos_refreshed = load_data_from_sheets()
-        df_projetos_refreshed = process_data(df_projetos_refreshed)
-
-        # Salvar cópia local
-        if not df_projetos_refreshed.empty:
-            save_data_to_local(df_projetos_refreshed, "projetos")
-        else:
-            # Tentar carregar do backup local apenas se não conseguir dados do Google Sheets
-            print("Alerta: Não foi possível obter dados de projetos do Google Sheets")
-            df_local = load_data_from_local("projetos")
-            if df_local is not None:
-                df_projetos_refreshed = process_data(df_local)
-                print(f"Usando backup local com {len(df_projetos_refreshed)} projetos")
-
-        # Recarregar dados dos codenautas
-        df_codenautas_refreshed = load_codenautas_from_sheets()
-
-        # Salvar cópia local
-        if not df_codenautas_refreshed.empty:
-            save_data_to_local(df_codenautas_refreshed, "codenautas")
-        else:
-            # Tentar carregar do backup local apenas se não conseguir dados do Google Sheets
-            print("Alerta: Não foi possível obter dados de codenautas do Google Sheets")
-            df_local = load_data_from_local("codenautas")
-            if df_local is not None:
-                df_codenautas_refreshed = df_local
-                print(f"Usando backup local com {len(df_codenautas_refreshed)} codenautas")
-
-        # Recarregar dados das ações diretamente do Google Sheets
-        print("Carregando dados de ações diretamente do Google Sheets...")
-        try:
-            spreadsheet = connect_google_sheets()
-            if spreadsheet:
-                sheet = spreadsheet.worksheet('Ações')
-                data = sheet.get_all_records()
-                
-                if data:
-                    df_acoes_refreshed = pd.DataFrame(data)
-                    print(f"✅ Carregados {len(df_acoes_refreshed)} registros da guia Ações do Google Sheets")
-                    print(f"Colunas encontradas: {df_acoes_refreshed.columns.tolist()}")
-                    
-                    # Converter colunas de data para datetime
-                    date_cols = ['Data de Cadastro', 'Data Limite', 'Data de Conclusão']
-                    for col in date_cols:
-                        if col in df_acoes_refreshed.columns:
-                            df_acoes_refreshed[col] = pd.to_datetime(df_acoes_refreshed[col], errors='coerce')
-                            print(f"Coluna {col} convertida para datetime")
-                    
-                    # Processar dados
-                    df_acoes_refreshed = process_acoes(df_acoes_refreshed)
-                    
-                    # Atualizar cache e salvar backup
-                    CACHE_ACOES = df_acoes_refreshed
-                    LAST_CACHE_UPDATE = time.time()
-                    save_data_to_local(df_acoes_refreshed, "acoes")
-                    print(f"Cache e backup de ações atualizados com {len(df_acoes_refreshed)} registros")
-                else:
-                    print("A guia Ações está vazia no Google Sheets")
-                    df_acoes_refreshed = pd.DataFrame()
-            else:
-                print("Não foi possível conectar ao Google Sheets para obter ações")
-                df_acoes_refreshed = pd.DataFrame()
-        except Exception as e:
-            print(f"Erro ao carregar ações diretamente: {e}")
-            import traceback
-            traceback.print_exc()
-            df_acoes_refreshed = pd.DataFrame()
-            
-        # Se não conseguiu dados do Google Sheets, tentar o backup local
-        if df_acoes_refreshed.empty:
-            df_local = load_data_from_local("acoes")
-            if df_local is not None and not df_local.empty:
-                df_acoes_refreshed = process_acoes(df_local)
-                print(f"Usando backup local com {len(df_acoes_refreshed)} ações")
-            else:
-                # Último recurso: chamar a função original
-                print("Tentando método alternativo para carregar ações...")
-                df_acoes_refreshed = load_acoes_from_sheets()
-                df_acoes_refreshed = process_acoes(df_acoes_refreshed)
-
-        print("===== Atualização de dados concluída =====\n")
-        return df_projetos_refreshed.to_dict('records'), df_codenautas_refreshed.to_dict('records'), df_acoes_refreshed.to_dict('records')
+def refresh_data(n_clicks, n_intervals, versao_cliente):
+    # O botão apenas pede a recarga: o download acontece em segundo plano e os
+    # dados novos chegam ao navegador na próxima verificação do intervalo
+    if dash.callback_context.triggered_id == "refresh-data-button":
+        print("\n===== Atualização de todos os dados solicitada =====")
+        SNAPSHOT_REFRESHER.request_refresh(force=True)
+
+    # As versões são crescentes e compartilhadas entre os workers: um worker
+    # ainda atrasado não deve devolver dados mais antigos que os do navegador
+    versao, dados = SNAPSHOT_REFRESHER.get_snapshot()
+    if dados is None or (versao_cliente is not None and versao <= versao_cliente):
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
-    # Se não houver clique, retornar os dados atuais
-    return dash.no_update, dash.no_update, dash.no_update
+    return dados['projetos'].to_dict('records'), dados['codenautas'].to_dict('records'), dados['acoes'].to_dict('records'), versao
 
 # Callback para atualizar métricas e gráficos
 
@@ -2062,10 +5360,10 @@ def update_dashboard(data):
     # Consideramos um projeto como único combinando o nome do projeto e cliente
     if 'Projeto' in df.columns and 'Cliente' in df.columns:
         df['projeto_cliente'] = df['Projeto'] + ' - ' + df['Cliente']
-        # Pegamos a versão mais recente de cada projeto (assumindo que MesAnoFormatado está presente)
-        if 'MesAnoFormatado' in df.columns:
-            # Ordenar por data (o mais recente primeiro)
-            df = df.sort_values('MesAnoFormatado', ascending=False)
+        # Pegamos a versão mais recente de cada projeto (assumindo que Periodo está presente)
+        if 'Periodo' in df.columns:
+            # Ordenar por período (o mais recente primeiro)
+            df = df.sort_values('Periodo', ascending=False)
             # Remove registros duplicados, mantendo apenas o primeiro (mais recente) de cada projeto
             df_unique = df.drop_duplicates(subset=['projeto_cliente'])
         else:
@@ -2289,29 +5587,10 @@ def update_dashboard(data):
 
     # Gráfico de Evolução de Projetos Quitados
     evolucao_quitados_fig = go.Figure()
-    if 'Financeiro' in df_unique.columns and 'MesAnoFormatado' in df_unique.columns:
-        # Contar projetos quitados por mês
-        quitados_por_mes = df_unique.groupby('MesAnoFormatado').apply(
-            lambda x: len(x[x['Financeiro'] == 'Quitado'])
-        ).reset_index()
-        quitados_por_mes.columns = ['MesAnoFormatado', 'Projetos Quitados']
-        
-        # Extrair mês e ano para ordenação cronológica
-        def extrair_mes_ano(mes_ano_str):
-            # Formato esperado: 'Mmm/AAAA' (ex: Jan/2023)
-            meses = {'Jan': 1, 'Fev': 2, 'Mar': 3, 'Abr': 4, 'Mai': 5, 'Jun': 6,
-                     'Jul': 7, 'Ago': 8, 'Set': 9, 'Out': 10, 'Nov': 11, 'Dez': 12}
-            try:
-                mes_abrev = mes_ano_str.split('/')[0]
-                ano = int(mes_ano_str.split('/')[1])
-                mes_num = meses.get(mes_abrev, 0)
-                return ano * 100 + mes_num  # Exemplo: Jan/2023 = 202301
-            except:
-                return 0
-        
-        # Adicionar coluna de ordenação e ordenar os dados
-        quitados_por_mes['ordem'] = quitados_por_mes['MesAnoFormatado'].apply(extrair_mes_ano)
-        quitados_por_mes = quitados_por_mes.sort_values('ordem')
+    if 'Financeiro' in df_unique.columns and 'Periodo' in df_unique.columns:
+        # Contar projetos quitados por período (yyyymm, já em ordem cronológica)
+        quitados_por_mes = count_by_period(
+            df_unique, df_unique['Financeiro'] == 'Quitado', 'Projetos Quitados')
         
         if not quitados_por_mes.empty:
             # Criar gráfico com ordem fixa dos meses
@@ -2339,16 +5618,10 @@ def update_dashboard(data):
 
     # Gráfico de Evolução de Projetos Atrasados
     evolucao_atrasados_fig = go.Figure()
-    if 'Status' in df_unique.columns and 'MesAnoFormatado' in df_unique.columns:
-        # Contar projetos atrasados por mês
-        atrasados_por_mes = df_unique.groupby('MesAnoFormatado').apply(
-            lambda x: len(x[x['Status'] == 'Atrasado'])
-        ).reset_index()
-        atrasados_por_mes.columns = ['MesAnoFormatado', 'Projetos Atrasados']
-        
-        # Extrair mês e ano para ordenação cronológica - reutilizando a função definida acima
-        atrasados_por_mes['ordem'] = atrasados_por_mes['MesAnoFormatado'].apply(extrair_mes_ano)
-        atrasados_por_mes = atrasados_por_mes.sort_values('ordem')
+    if 'Status' in df_unique.columns and 'Periodo' in df_unique.columns:
+        # Contar projetos atrasados por período (yyyymm, já em ordem cronológica)
+        atrasados_por_mes = count_by_period(
+            df_unique, df_unique['Status'] == 'Atrasado', 'Projetos Atrasados')
 
         if not atrasados_por_mes.empty:
             # Criar gráfico com ordem fixa dos meses
@@ -2477,8 +5750,10 @@ def update_dropdown_options(filter_options_data):
 
     coordenacoes = [{"label": coord, "value": coord}
                     for coord in filter_options_data.get("coordenacoes", [])]
-    meses_anos = [{"label": mes, "value": mes}
-                  for mes in filter_options_data.get("meses_anos", [])]
+    meses_anos = [{"label": periodo_label(periodo), "value": periodo}
+                  for periodo in filter_options_data.get("meses_anos", [])]
+    # No cadastro de ações o mês de referência é gravado no formato da planilha (ex.: abr.-25)
+    meses_referencia = mes_referencia_options(filter_options_data.get("meses_anos", []))
     gestoras = [{"label": gp, "value": gp}
                 for gp in filter_options_data.get("gestoras", [])]
     status_list = [{"label": status, "value": status}
@@ -2490,7 +5765,7 @@ def update_dropdown_options(filter_options_data):
     tipos = [{"label": tipo, "value": tipo}
              for tipo in filter_options_data.get("tipos", [])]
 
-    return coordenacoes, meses_anos, gestoras, status_list, financeiro_list, segmentos, tipos, meses_anos
+    return coordenacoes, meses_anos, gestoras, status_list, financeiro_list, segmentos, tipos, meses_referencia
 
 # Callback para limpar filtros de projetos
 
@@ -2611,31 +5886,12 @@ def update_acao_mes_referencia_options(filter_options_data):
         {"label": "Dezembro", "value": "Dezembro"}
     ]
     
-    # Dicionário para converter abreviações para nomes completos
-    meses_map = {
-        "Jan/2023": "Janeiro",
-        "Fev/2023": "Fevereiro",
-        "Mar/2023": "Março",
-        "Abr/2023": "Abril",
-        "Mai/2023": "Maio",
-        "Jun/2023": "Junho",
-        "Jul/2023": "Julho",
-        "Ago/2023": "Agosto",
-        "Set/2023": "Setembro",
-        "Out/2023": "Outubro",
-        "Nov/2023": "Novembro",
-        "Dez/2023": "Dezembro"
-    }
-    
-    # Adicionar também as opções existentes nos dados
+    # Adicionar também os meses existentes nos dados (exibidos como Abr/2025, gravados como abr.-25)
     if 'meses_anos' in filter_options_data:
-        for mes in filter_options_data.get("meses_anos", []):
-            # Verificar se é uma abreviação que podemos converter
-            nome_completo = meses_map.get(mes, mes)
-            
+        for opcao in mes_referencia_options(filter_options_data.get("meses_anos", [])):
             # Verificar se o mês já não está nas opções
-            if not any(op["value"] == nome_completo for op in meses_opcoes):
-                meses_opcoes.append({"label": nome_completo, "value": nome_completo})
+            if not any(op["value"] == opcao["value"] for op in meses_opcoes):
+                meses_opcoes.append(opcao)
     
     return meses_opcoes
 
@@ -2695,12 +5951,14 @@ def update_acoes_dashboard(n_clicks_apply, n_clicks_reset, active_tab, acoes_dat
         if button_id == "apply-acoes-filters" and (mes_ano or responsavel or status or prioridade):
             filtered_df = df_acoes.copy()
 
-            # Filtrar por mês/ano
+            # Filtrar por mês/ano (período yyyymm do mês de referência)
             if mes_ano:
                 if not isinstance(mes_ano, list):
                     mes_ano = [mes_ano]
-                filtered_df = filtered_df[filtered_df['Mês de Referência'].isin(
-                    mes_ano)]
+                if 'Periodo' not in filtered_df.columns or filtered_df['Periodo'].isna().any():
+                    # Ações recém-incluídas na tela ainda não têm o período calculado
+                    filtered_df['Periodo'] = acoes_periodo(filtered_df)
+                filtered_df = filtered_df[filtered_df['Periodo'].isin(mes_ano)]
 
             # Filtrar por responsável
             if responsavel:
@@ -2792,16 +6050,11 @@ def update_acoes_dashboard(n_clicks_apply, n_clicks_reset, active_tab, acoes_dat
         filtered_df['Data de Cadastro'] = pd.to_datetime(
             filtered_df['Data de Cadastro'], errors='coerce')
 
-        # Criar coluna de mês/ano para agrupamento
-        filtered_df['Mês Cadastro'] = filtered_df['Data de Cadastro'].dt.strftime(
-            '%Y-%m')
-
-        # Agrupar por mês e contar
-        evolucao = filtered_df.groupby('Mês Cadastro').size().reset_index()
-        evolucao.columns = ['Mês', 'Quantidade']
-
-        # Ordenar cronologicamente
-        evolucao = evolucao.sort_values('Mês')
+        # Agrupar pelo período (yyyymm) de cadastro, em ordem cronológica
+        evolucao = count_by_period(
+            pd.DataFrame({'Periodo': periodo_from_datetime(filtered_df['Data de Cadastro'])}),
+            pd.Series(True, index=filtered_df.index), 'Quantidade')
+        evolucao = evolucao.rename(columns={'MesAnoFormatado': 'Mês'})
 
         evolucao_fig = px.line(
             evolucao, x='Mês', y='Quantidade',
@@ -2832,16 +6085,7 @@ def update_acoes_dashboard(n_clicks_apply, n_clicks_reset, active_tab, acoes_dat
         # Adicionar indicadores de status
         if 'Status' in table_df.columns and 'Atrasada' in table_df.columns:
             # Permitir filtro por status e atrasos
-            def get_status_detalhado(row):
-                status = row['Status']
-                if status == 'Concluída':
-                    return 'Concluída'
-                elif row['Atrasada'] == 1:
-                    return 'Atrasada'
-                else:
-                    return status
-            
-            table_df['Status Detalhado'] = table_df.apply(get_status_detalhado, axis=1)
+            table_df['Status Detalhado'] = acoes_status_detalhado(table_df)
         
         # Preparar dados amigáveis para a tabela
         table_data = table_df.to_dict('records')
@@ -2934,8 +6178,7 @@ def update_dashboard_with_filters(n_clicks_apply, n_clicks_reset, mes_ano, gesto
         if mes_ano:
             if not isinstance(mes_ano, list):
                 mes_ano = [mes_ano]
-            filtered_df = filtered_df[filtered_df['MesAnoFormatado'].isin(
-                mes_ano)]
+            filtered_df = filtered_df[filtered_df['Periodo'].isin(mes_ano)]
 
         # Filtrar por gestora
         if gestora:
@@ -2985,10 +6228,10 @@ def update_dashboard_with_filters(n_clicks_apply, n_clicks_reset, mes_ano, gesto
     # Consideramos um projeto como único combinando o nome do projeto e cliente
     if 'Projeto' in filtered_df.columns and 'Cliente' in filtered_df.columns:
         filtered_df['projeto_cliente'] = filtered_df['Projeto'] + ' - ' + filtered_df['Cliente']
-        # Pegamos a versão mais recente de cada projeto (assumindo que MesAnoFormatado está presente)
-        if 'MesAnoFormatado' in filtered_df.columns:
-            # Ordenar por data (o mais recente primeiro)
-            filtered_df = filtered_df.sort_values('MesAnoFormatado', ascending=False)
+        # Pegamos a versão mais recente de cada projeto (assumindo que Periodo está presente)
+        if 'Periodo' in filtered_df.columns:
+            # Ordenar por período (o mais recente primeiro)
+            filtered_df = filtered_df.sort_values('Periodo', ascending=False)
             # Remove registros duplicados, mantendo apenas o primeiro (mais recente) de cada projeto
             df_unique = filtered_df.drop_duplicates(subset=['projeto_cliente'])
         else:
@@ -3202,29 +6445,10 @@ def update_dashboard_with_filters(n_clicks_apply, n_clicks_reset, mes_ano, gesto
 
     # Gráfico de Evolução de Projetos Quitados
     evolucao_quitados_fig = go.Figure()
-    if 'Financeiro' in df_unique.columns and 'MesAnoFormatado' in df_unique.columns:
-        # Contar projetos quitados por mês
-        quitados_por_mes = df_unique.groupby('MesAnoFormatado').apply(
-            lambda x: len(x[x['Financeiro'] == 'Quitado'])
-        ).reset_index()
-        quitados_por_mes.columns = ['MesAnoFormatado', 'Projetos Quitados']
-        
-        # Extrair mês e ano para ordenação cronológica
-        def extrair_mes_ano(mes_ano_str):
-            # Formato esperado: 'Mmm/AAAA' (ex: Jan/2023)
-            meses = {'Jan': 1, 'Fev': 2, 'Mar': 3, 'Abr': 4, 'Mai': 5, 'Jun': 6,
-                     'Jul': 7, 'Ago': 8, 'Set': 9, 'Out': 10, 'Nov': 11, 'Dez': 12}
-            try:
-                mes_abrev = mes_ano_str.split('/')[0]
-                ano = int(mes_ano_str.split('/')[1])
-                mes_num = meses.get(mes_abrev, 0)
-                return ano * 100 + mes_num  # Exemplo: Jan/2023 = 202301
-            except:
-                return 0
-        
-        # Adicionar coluna de ordenação e ordenar os dados
-        quitados_por_mes['ordem'] = quitados_por_mes['MesAnoFormatado'].apply(extrair_mes_ano)
-        quitados_por_mes = quitados_por_mes.sort_values('ordem')
+    if 'Financeiro' in df_unique.columns and 'Periodo' in df_unique.columns:
+        # Contar projetos quitados por período (yyyymm, já em ordem cronológica)
+        quitados_por_mes = count_by_period(
+            df_unique, df_unique['Financeiro'] == 'Quitado', 'Projetos Quitados')
         
         if not quitados_por_mes.empty:
             # Criar gráfico com ordem fixa dos meses
@@ -3252,16 +6476,10 @@ def update_dashboard_with_filters(n_clicks_apply, n_clicks_reset, mes_ano, gesto
 
     # Gráfico de Evolução de Projetos Atrasados
     evolucao_atrasados_fig = go.Figure()
-    if 'Status' in df_unique.columns and 'MesAnoFormatado' in df_unique.columns:
-        # Contar projetos atrasados por mês
-        atrasados_por_mes = df_unique.groupby('MesAnoFormatado').apply(
-            lambda x: len(x[x['Status'] == 'Atrasado'])
-        ).reset_index()
-        atrasados_por_mes.columns = ['MesAnoFormatado', 'Projetos Atrasados']
-        
-        # Extrair mês e ano para ordenação cronológica - reutilizando a função definida acima
-        atrasados_por_mes['ordem'] = atrasados_por_mes['MesAnoFormatado'].apply(extrair_mes_ano)
-        atrasados_por_mes = atrasados_por_mes.sort_values('ordem')
+    if 'Status' in df_unique.columns and 'Periodo' in df_unique.columns:
+        # Contar projetos atrasados por período (yyyymm, já em ordem cronológica)
+        atrasados_por_mes = count_by_period(
+            df_unique, df_unique['Status'] == 'Atrasado', 'Projetos Atrasados')
 
         if not atrasados_por_mes.empty:
             # Criar gráfico com ordem fixa dos meses
@@ -3351,12 +6569,16 @@ def handle_action_icon_click(selected_cells, table_data, mes_ano_atual):
         projeto = table_data[row_idx]['Projeto']
         
         # Obter o mês/ano do projeto para preencher automaticamente
+        # (no formato da planilha, ex.: abr.-25)
         mes_referencia = None
-        if 'MesAnoFormatado' in table_data[row_idx]:
+        if table_data[row_idx].get('Periodo') is not None:
+            mes_referencia = periodo_sheet_value(table_data[row_idx]['Periodo'])
+        elif 'MesAnoFormatado' in table_data[row_idx]:
+            # Mês não reconhecido: mantido como está na planilha
             mes_referencia = table_data[row_idx]['MesAnoFormatado']
         elif mes_ano_atual and not isinstance(mes_ano_atual, list):
             # Usar o mês/ano selecionado no filtro se não houver no projeto
-            mes_referencia = mes_ano_atual
+            mes_referencia = periodo_sheet_value(mes_ano_atual)
         
         print(f"Adicionando ação para o projeto: {projeto}, mês: {mes_referencia}")
         return projeto, True, projeto, mes_referencia
@@ -3380,6 +6602,26 @@ def close_modal(n_clicks):
         return False, False, ""
     return dash.no_update, dash.no_update, dash.no_update
 
+# Gerar um novo token de gravação sempre que um modal de ação é aberto
+
+
+@app.callback(
+    Output("modal-save-token", "data"),
+    Input("modal-cadastro-acao", "is_open"),
+    prevent_initial_call=True
+)
+def new_save_token(is_open):
+    return uuid.uuid4().hex if is_open else dash.no_update
+
+
+@app.callback(
+    Output("modal-edit-save-token", "data"),
+    Input("modal-edicao-acao", "is_open"),
+    prevent_initial_call=True
+)
+def new_edit_save_token(is_open):
+    return uuid.uuid4().hex if is_open else dash.no_update
+
 # Callback para salvar uma nova ação
 
 
@@ -3400,11 +6642,12 @@ def close_modal(n_clicks):
         State("modal-data-limite", "date"),
         State("modal-status", "value"),
         State("modal-data-conclusao", "date"),
-        State("acoes-store", "data")
+        State("acoes-store", "data"),
+        State("modal-save-token", "data")
     ],
     prevent_initial_call=True
 )
-def save_action(n_clicks, projeto, mes_referencia, prioridade, descricao, responsaveis, data_limite, status, data_conclusao, acoes_data):
+def save_action(n_clicks, projeto, mes_referencia, prioridade, descricao, responsaveis, data_limite, status, data_conclusao, acoes_data, save_token):
     if not n_clicks:
         return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
@@ -3445,6 +6688,13 @@ def save_action(n_clicks, projeto, mes_referencia, prioridade, descricao, respon
         print(f"❌ Campos vazios no cadastro da ação: {', '.join(campos_vazios)}")
         return dash.no_update, True, mensagem_erro, dash.no_update
 
+    # Clique duplo ou requisição reenviada: a primeira já está gravando esta ação
+    if not SAVE_DEDUPLICATOR.claim(save_token):
+        print(f"Envio repetido do cadastro ignorado (token {save_token})")
+        if SAVE_DEDUPLICATOR.is_confirmed(save_token):
+            return False, False, "", dash.no_update
+        return dash.no_update, True, SAVE_EM_ANDAMENTO_MSG, dash.no_update
+
     try:
         # Converter responsáveis para string
         if isinstance(responsaveis, list):
@@ -3457,82 +6707,22 @@ def save_action(n_clicks, projeto, mes_referencia, prioridade, descricao, respon
         print(f"Responsáveis: {responsaveis_str}")
         print(f"Status: {status}")
 
-        # Carregar ações novamente direto da planilha para garantir que estamos trabalhando com os dados mais atuais
-        try:
-            print("Tentando recarregar ações diretamente do Google Sheets antes de adicionar nova ação...")
-            spreadsheet = connect_google_sheets()
-            if spreadsheet:
-                sheet = spreadsheet.worksheet('Ações')
-                sheet_data = sheet.get_all_records()
-                
-                if sheet_data:
-                    df_atual = pd.DataFrame(sheet_data)
-                    print(f"✅ Carregadas {len(df_atual)} ações do Google Sheets")
-                    
-                    # Verificar se já existe o ID no dataframe atual
-                    max_id = 0
-                    if 'ID da Ação' in df_atual.columns:
-                        ids_acao = pd.to_numeric(df_atual['ID da Ação'], errors='coerce')
-                        max_id = ids_acao.max() if not pd.isna(ids_acao.max()) else 0
-                        
-                    next_id = int(max_id) + 1
-                    print(f"Próximo ID baseado nos dados atuais da planilha: {next_id}")
-                    
-                    # Atualizar acoes_data com os dados da planilha
-                    acoes_data = df_atual.to_dict('records')
-                else:
-                    print("Nenhum dado encontrado na guia Ações do Google Sheets")
-                    # Gerar ID baseado nos dados do cache
-                    next_id = 1
-                    if acoes_data and len(acoes_data) > 0:
-                        df_acoes = pd.DataFrame(acoes_data)
-                        if 'ID da Ação' in df_acoes.columns:
-                            ids_numericos = pd.to_numeric(df_acoes['ID da Ação'], errors='coerce')
-                            next_id = int(ids_numericos.max()) + 1 if not pd.isna(ids_numericos.max()) else 1
-            else:
-                print("Não foi possível conectar ao Google Sheets para recarregar ações")
-                # Inicializar acoes_data como lista vazia se for None
-                if acoes_data is None:
-                    acoes_data = []
-                    print("Nenhuma ação encontrada no cache, iniciando lista vazia")
-                elif not isinstance(acoes_data, list):
-                    # Tentar converter para lista se não for
-                    try:
-                        acoes_data = list(acoes_data)
-                        print(f"Convertido acoes_data para lista com {len(acoes_data)} itens")
-                    except Exception as conv_e:
-                        print(f"Erro ao converter acoes_data: {conv_e}")
-                        acoes_data = []
-                
-                # Determinar próximo ID usando os dados em cache
-                next_id = 1
-                if acoes_data and len(acoes_data) > 0:
-                    df_acoes = pd.DataFrame(acoes_data)
-                    if 'ID da Ação' in df_acoes.columns:
-                        ids_numericos = pd.to_numeric(df_acoes['ID da Ação'], errors='coerce')
-                        next_id = int(ids_numericos.max()) + 1 if not pd.isna(ids_numericos.max()) else 1
-        except Exception as reload_e:
-            print(f"Erro ao recarregar ações: {reload_e}")
-            # Inicializar acoes_data como lista vazia se for None
-            if acoes_data is None:
+        # Inicializar acoes_data como lista vazia se for None
+        if acoes_data is None:
+            acoes_data = []
+            print("Nenhuma ação encontrada no cache, iniciando lista vazia")
+        elif not isinstance(acoes_data, list):
+            # Tentar converter para lista se não for
+            try:
+                acoes_data = list(acoes_data)
+                print(f"Convertido acoes_data para lista com {len(acoes_data)} itens")
+            except Exception as conv_e:
+                print(f"Erro ao converter acoes_data: {conv_e}")
                 acoes_data = []
-                print("Nenhuma ação encontrada no cache, iniciando lista vazia")
-            elif not isinstance(acoes_data, list):
-                # Tentar converter para lista se não for
-                try:
-                    acoes_data = list(acoes_data)
-                    print(f"Convertido acoes_data para lista com {len(acoes_data)} itens")
-                except Exception as conv_e:
-                    print(f"Erro ao converter acoes_data: {conv_e}")
-                    acoes_data = []
-            
-            # Determinar próximo ID usando os dados em cache
-            next_id = 1
-            if acoes_data and len(acoes_data) > 0:
-                df_acoes = pd.DataFrame(acoes_data)
-                if 'ID da Ação' in df_acoes.columns:
-                    ids_numericos = pd.to_numeric(df_acoes['ID da Ação'], errors='coerce')
-                    next_id = int(ids_numericos.max()) + 1 if not pd.isna(ids_numericos.max()) else 1
+
+        # Reservar o próximo ID no servidor, sem reler a guia Ações inteira
+        next_id = allocate_acao_id(acoes_data)
+        print(f"Próximo ID reservado: {next_id}")
 
         # Preparar nova linha
         # Formatar corretamente as datas para salvar no formato correto (YYYY-MM-DD)
@@ -3599,29 +6789,31 @@ def save_action(n_clicks, projeto, mes_referencia, prioridade, descricao, respon
             'Observações de conclusão': ""
         }
 
-        # Adicionar nova ação aos dados existentes
+        if ACOES_WRITE_QUEUE is not None:
+            # Registrar no diário local; a linha é enviada à planilha em segundo plano
+            ACOES_WRITE_QUEUE.enqueue_append(nova_acao)
+            print(f"✅ Ação cadastrada: ID {next_id} (envio ao Google Sheets em segundo plano)")
+        else:
+            # Acrescentar somente a nova linha na planilha do Google Sheets
+            with SHEETS_RATE_LIMITER.priority(PRIORIDADE_INTERATIVA):
+                success = append_acao_to_sheets(nova_acao)
+            if success:
+                print(f"✅ Ação cadastrada com sucesso: ID {next_id}")
+            else:
+                print(f"⚠️ Falha ao salvar ação na planilha do Google Sheets, mas foi salva localmente")
+
+        # Acrescentar a nova ação aos dados da tela, ao cache e ao backup local
         acoes_data.append(nova_acao)
+        append_acao_to_cache(nova_acao)
+        ACOES_JOURNAL.record(nova_acao)
         print(f"Nova ação adicionada ao cache (ID: {next_id})")
 
-        # Atualizar dados na planilha do Google Sheets
-        df_acoes = pd.DataFrame(acoes_data)
-        
-        # Salvar localmente antes de enviar ao Google Sheets (backup)
-        save_data_to_local(df_acoes, "acoes_pre_upload")
-        
-        # Tentar atualizar no Google Sheets
-        success = update_acoes_in_sheets(df_acoes)
-        if success:
-            print(f"✅ Ação cadastrada com sucesso: ID {next_id}")
-            
-            # Garantir que o cache está atualizado
-            global CACHE_ACOES, LAST_CACHE_UPDATE
-            CACHE_ACOES = df_acoes
-            LAST_CACHE_UPDATE = time.time()
-        else:
-            print(f"⚠️ Falha ao salvar ação na planilha do Google Sheets, mas foi salva localmente")
-            save_data_to_local(df_acoes, "acoes")
+        if ACOES_WRITE_QUEUE is None:
+            # Recarregar os dados em segundo plano para incluir a nova ação
+            # (com a fila, a recarga é pedida depois do envio)
+            SNAPSHOT_REFRESHER.request_refresh()
 
+        SAVE_DEDUPLICATOR.confirm(save_token)
         print("===== Nova ação salva (modal principal) =====\n")
         return False, False, "", acoes_data
 
@@ -3629,6 +6821,7 @@ def save_action(n_clicks, projeto, mes_referencia, prioridade, descricao, respon
         print(f"❌ Erro ao salvar ação: {e}")
         import traceback
         traceback.print_exc()
+        SAVE_DEDUPLICATOR.release(save_token)
         return dash.no_update, True, f"Erro ao salvar ação: {str(e)}", dash.no_update
 
 # Exportar a tabela de projetos
@@ -3650,6 +6843,34 @@ def export_table(n_clicks, table_data):
         df = df.drop(columns=['action_icon'])
     return dcc.send_data_frame(df.to_csv, "projetos_codeart.csv", index=False)
 
+# Gravação das ações editadas: pela fila, se disponível, ou direto na planilha
+
+
+def save_acoes_changes(df_acoes, acao_alterada=None):
+    """Grava a ação alterada na guia Ações; com a fila, confirma assim que a alteração é registrada localmente.
+
+    Na planilha e no backup local vai apenas a ação alterada (pelo 'ID da
+    Ação'); as demais linhas da tela podem estar desatualizadas.
+    """
+    if acao_alterada is not None:
+        ACOES_JOURNAL.record(acao_alterada)
+    df_alteradas = pd.DataFrame([acao_alterada]) if acao_alterada is not None else df_acoes
+    if ACOES_WRITE_QUEUE is None:
+        with SHEETS_RATE_LIMITER.priority(PRIORIDADE_INTERATIVA):
+            success = update_acoes_in_sheets(df_alteradas)
+        if success:
+            SNAPSHOT_REFRESHER.request_refresh()
+        return success
+
+    try:
+        ACOES_WRITE_QUEUE.enqueue_upsert(df_alteradas)
+    except Exception as e:
+        print(f"❌ Erro ao registrar a alteração na fila de gravação: {e}")
+        return False
+    upsert_acoes_in_cache(df_alteradas)
+    print("✅ Alteração registrada; envio ao Google Sheets em segundo plano")
+    return True
+
 # Callback para edição de ação
 # Se esse callback existe no código, adicione estas correções:
 
@@ -3672,11 +6893,12 @@ def export_table(n_clicks, table_data):
         State("modal-edit-status", "value"),
         State("modal-edit-data-conclusao", "date"),
         State("modal-edit-observacoes", "value"),
-        State("acoes-store", "data")
+        State("acoes-store", "data"),
+        State("modal-edit-save-token", "data")
     ],
     prevent_initial_call=True
 )
-def save_action_edit(n_clicks, acao_id, projeto, mes_referencia, prioridade, descricao, responsaveis, status, data_conclusao, observacoes, acoes_data):
+def save_action_edit(n_clicks, acao_id, projeto, mes_referencia, prioridade, descricao, responsaveis, status, data_conclusao, observacoes, acoes_data, save_token):
     if not n_clicks:
         return dash.no_update, dash.no_update, dash.no_update, dash.no_update
 
@@ -3705,108 +6927,135 @@ def save_action_edit(n_clicks, acao_id, projeto, mes_referencia, prioridade, des
         mensagem = f"Preencha os seguintes campos obrigatórios: {', '.join(campos_vazios)}"
         return False, True, mensagem, dash.no_update
 
-    # Encontrar o índice da ação existente no DataFrame
-    if acoes_data:
-        df_acoes = pd.DataFrame(acoes_data)
-        acao_id_str = str(acao_id)  # Converter o ID para string para garantir correspondência
+    # Clique duplo ou requisição reenviada: a primeira já está gravando esta edição
+    if not SAVE_DEDUPLICATOR.claim(save_token):
+        print(f"Envio repetido da edição ignorado (token {save_token})")
+        if SAVE_DEDUPLICATOR.is_confirmed(save_token):
+            return False, False, "", dash.no_update
+        return True, True, SAVE_EM_ANDAMENTO_MSG, dash.no_update
+
+    try:
+        # Encontrar o índice da ação existente no DataFrame
+        if acoes_data:
+            acao_alterada = None
+            df_acoes = pd.DataFrame(acoes_data)
+            acao_id_str = str(acao_id)  # Converter o ID para string para garantir correspondência
         
-        # Verificar se a ação existe
-        acoes_filtradas = df_acoes.loc[df_acoes['ID da Ação'].astype(str) == acao_id_str]
+            # Verificar se a ação existe
+            acoes_filtradas = df_acoes.loc[df_acoes['ID da Ação'].astype(str) == acao_id_str]
         
-        if len(acoes_filtradas) > 0:
-            idx = acoes_filtradas.index[0]
+            if len(acoes_filtradas) > 0:
+                idx = acoes_filtradas.index[0]
             
-            # Guardar uma cópia dos valores originais para diagnóstico
-            data_limite_original = df_acoes.at[idx, 'Data Limite'] if 'Data Limite' in df_acoes.columns else None
-            print(f"Data limite original: {data_limite_original} (tipo: {type(data_limite_original)})")
+                # Guardar uma cópia dos valores originais para diagnóstico
+                data_limite_original = df_acoes.at[idx, 'Data Limite'] if 'Data Limite' in df_acoes.columns else None
+                print(f"Data limite original: {data_limite_original} (tipo: {type(data_limite_original)})")
             
-            # Atualizar os dados da ação
-            df_acoes.at[idx, 'Projeto'] = projeto
-            df_acoes.at[idx, 'Mês de Referência'] = mes_referencia
-            df_acoes.at[idx, 'Prioridade'] = prioridade
-            df_acoes.at[idx, 'Descrição da Ação'] = descricao
-            df_acoes.at[idx, 'Responsáveis'] = ', '.join(responsaveis) if isinstance(responsaveis, list) else responsaveis
+                # Atualizar os dados da ação
+                df_acoes.at[idx, 'Projeto'] = projeto
+                df_acoes.at[idx, 'Mês de Referência'] = mes_referencia
+                df_acoes.at[idx, 'Prioridade'] = prioridade
+                df_acoes.at[idx, 'Descrição da Ação'] = descricao
+                df_acoes.at[idx, 'Responsáveis'] = ', '.join(responsaveis) if isinstance(responsaveis, list) else responsaveis
             
-            # Data Limite original é mantida - não foi removida do layout
-            print(f"Mantendo a data limite original: {data_limite_original}")
+                # Data Limite original é mantida - não foi removida do layout
+                print(f"Mantendo a data limite original: {data_limite_original}")
             
-            if status:
-                df_acoes.at[idx, 'Status'] = status
+                if status:
+                    df_acoes.at[idx, 'Status'] = status
                 
-                # Se status for "Concluída" e não houver data de conclusão, definir como data atual
-                if status == "Concluída" and not data_conclusao:
-                    data_conclusao = datetime.now().strftime('%Y-%m-%d')
-                    print("Status 'Concluída' selecionado, definindo data de conclusão para hoje")
+                    # Se status for "Concluída" e não houver data de conclusão, definir como data atual
+                    if status == "Concluída" and not data_conclusao:
+                        data_conclusao = datetime.now().strftime('%Y-%m-%d')
+                        print("Status 'Concluída' selecionado, definindo data de conclusão para hoje")
             
-            # Voltando ao tratamento original da Data de Conclusão
-            # Se houver data de conclusão, usar o valor fornecido
-            if data_conclusao:
-                df_acoes.at[idx, 'Data de Conclusão'] = data_conclusao
-                print(f"Data de Conclusão atualizada para: {data_conclusao}")
-            elif status != "Concluída":
-                # Se a ação não está concluída, limpar a data de conclusão
-                df_acoes.at[idx, 'Data de Conclusão'] = None
-                print("Limpando Data de Conclusão pois o status não é Concluída")
+                # Voltando ao tratamento original da Data de Conclusão
+                # Se houver data de conclusão, usar o valor fornecido
+                if data_conclusao:
+                    df_acoes.at[idx, 'Data de Conclusão'] = data_conclusao
+                    print(f"Data de Conclusão atualizada para: {data_conclusao}")
+                elif status != "Concluída":
+                    # Se a ação não está concluída, limpar a data de conclusão
+                    df_acoes.at[idx, 'Data de Conclusão'] = None
+                    print("Limpando Data de Conclusão pois o status não é Concluída")
             
-            # Atualizar observações apenas se fornecidas
-            if observacoes:
-                df_acoes.at[idx, 'Observações de conclusão'] = observacoes
+                # Atualizar observações apenas se fornecidas
+                if observacoes:
+                    df_acoes.at[idx, 'Observações de conclusão'] = observacoes
             
-            # DIAGNÓSTICO: Ver todos os valores da linha atualizada
-            print("\n=== VALORES FINAIS DA AÇÃO ATUALIZADA ===")
-            for coluna in df_acoes.columns:
-                valor = df_acoes.at[idx, coluna]
-                print(f"{coluna}: {valor} (tipo: {type(valor)})")
+                # DIAGNÓSTICO: Ver todos os valores da linha atualizada
+                print("\n=== VALORES FINAIS DA AÇÃO ATUALIZADA ===")
+                for coluna in df_acoes.columns:
+                    valor = df_acoes.at[idx, coluna]
+                    print(f"{coluna}: {valor} (tipo: {type(valor)})")
             
-            # VERIFICAÇÃO ADICIONAL: Verificar se a Data Limite está correta
-            if 'Data Limite' in df_acoes.columns:
-                print(f"Valor final da Data Limite: {df_acoes.at[idx, 'Data Limite']} (tipo: {type(df_acoes.at[idx, 'Data Limite'])})")
+                # VERIFICAÇÃO ADICIONAL: Verificar se a Data Limite está correta
+                if 'Data Limite' in df_acoes.columns:
+                    print(f"Valor final da Data Limite: {df_acoes.at[idx, 'Data Limite']} (tipo: {type(df_acoes.at[idx, 'Data Limite'])})")
                 
-                        # Verificação final dos campos críticos após processamento
-            campos_criticos = ['Projeto', 'Descrição da Ação', 'Responsáveis', 'Data Limite', 'Status']
-            for campo in campos_criticos:
-                if campo in df_acoes.columns:
-                    valor = df_acoes.at[idx, campo]
-                    print(f"VERIFICAÇÃO FINAL - {campo}: {valor} (tipo: {type(valor)})")
+                            # Verificação final dos campos críticos após processamento
+                campos_criticos = ['Projeto', 'Descrição da Ação', 'Responsáveis', 'Data Limite', 'Status']
+                for campo in campos_criticos:
+                    if campo in df_acoes.columns:
+                        valor = df_acoes.at[idx, campo]
+                        print(f"VERIFICAÇÃO FINAL - {campo}: {valor} (tipo: {type(valor)})")
             
-            # Recalcular campos derivados
-            if 'Status' in df_acoes.columns and 'Data Limite' in df_acoes.columns:
-                # Calcular dias restantes
-                df_acoes = process_acoes(df_acoes)
+                acao_alterada = df_acoes.loc[idx].to_dict()
+
+                # Recalcular campos derivados
+                if 'Status' in df_acoes.columns and 'Data Limite' in df_acoes.columns:
+                    # Calcular dias restantes
+                    df_acoes = process_acoes(df_acoes)
         
-        # Atualizar o Google Sheets
-        success = update_acoes_in_sheets(df_acoes)
+            if acao_alterada is None:
+                # Sem a ação na tela não há o que gravar (e regravar as demais
+                # linhas poderia desfazer alterações de outros usuários)
+                SAVE_DEDUPLICATOR.release(save_token)
+                return True, True, f"Ação {acao_id} não encontrada. Atualize os dados e tente novamente.", dash.no_update
+
+            # Atualizar o Google Sheets
+            success = save_acoes_changes(df_acoes, acao_alterada)
         
-        if success:
-            return False, False, "", df_acoes.to_dict('records')
+            if success:
+                SAVE_DEDUPLICATOR.confirm(save_token)
+                return False, False, "", df_acoes.to_dict('records')
+            else:
+                SAVE_DEDUPLICATOR.release(save_token)
+                return True, True, "Erro ao atualizar a planilha. Tente novamente.", dash.no_update
         else:
-            return True, True, "Erro ao atualizar a planilha. Tente novamente.", dash.no_update
-    else:
-        # Criar DataFrame do zero com apenas essa ação
-        nova_acao = {
-            'ID da Ação': 1,
-            'Data de Cadastro': datetime.now().strftime('%Y-%m-%d'),
-            'Mês de Referência': mes_referencia,
-            'Projeto': projeto,
-            'Descrição da Ação': descricao,
-            'Responsáveis': ', '.join(responsaveis) if isinstance(responsaveis, list) else responsaveis,
-            'Data Limite': data_limite,  # Pode ser None ou vazio
-            'Status': status,
-            'Prioridade': prioridade,
-            'Data de Conclusão': data_conclusao,
-            'Observações de conclusão': ""
-        }
+            # Criar DataFrame do zero com apenas essa ação
+            nova_acao = {
+                'ID da Ação': 1,
+                'Data de Cadastro': datetime.now().strftime('%Y-%m-%d'),
+                'Mês de Referência': mes_referencia,
+                'Projeto': projeto,
+                'Descrição da Ação': descricao,
+                'Responsáveis': ', '.join(responsaveis) if isinstance(responsaveis, list) else responsaveis,
+                'Data Limite': None,  # O modal de edição não altera a data limite
+                'Status': status,
+                'Prioridade': prioridade,
+                'Data de Conclusão': data_conclusao,
+                'Observações de conclusão': ""
+            }
         
-        df_nova_acao = pd.DataFrame([nova_acao])
-        df_nova_acao = process_acoes(df_nova_acao)
+            df_nova_acao = pd.DataFrame([nova_acao])
+            df_nova_acao = process_acoes(df_nova_acao)
         
-        # Atualizar o Google Sheets
-        success = update_acoes_in_sheets(df_nova_acao)
+            # Atualizar o Google Sheets
+            success = save_acoes_changes(df_nova_acao, nova_acao)
         
-        if success:
-            return False, False, "", df_nova_acao.to_dict('records')
-        else:
-            return True, True, "Erro ao atualizar a planilha. Tente novamente.", dash.no_update
+            if success:
+                SAVE_DEDUPLICATOR.confirm(save_token)
+                return False, False, "", df_nova_acao.to_dict('records')
+            else:
+                SAVE_DEDUPLICATOR.release(save_token)
+                return True, True, "Erro ao atualizar a planilha. Tente novamente.", dash.no_update
+    except Exception as e:
+        print(f"❌ Erro ao salvar a edição da ação: {e}")
+        import traceback
+        traceback.print_exc()
+        SAVE_DEDUPLICATOR.release(save_token)
+        return True, True, f"Erro ao atualizar a ação: {str(e)}", dash.no_update
 
 # Callback adicional para garantir que a coluna Observacoes esteja presente nos dados da tabela
 
@@ -4127,31 +7376,12 @@ def update_edit_mes_referencia_options(is_open, atual_value, filter_options_data
         {"label": "Dezembro", "value": "Dezembro"}
     ]
     
-    # Dicionário para converter abreviações para nomes completos
-    meses_map = {
-        "Jan/2023": "Janeiro",
-        "Fev/2023": "Fevereiro",
-        "Mar/2023": "Março",
-        "Abr/2023": "Abril",
-        "Mai/2023": "Maio",
-        "Jun/2023": "Junho",
-        "Jul/2023": "Julho",
-        "Ago/2023": "Agosto",
-        "Set/2023": "Setembro",
-        "Out/2023": "Outubro",
-        "Nov/2023": "Novembro",
-        "Dez/2023": "Dezembro"
-    }
-    
-    # Adicionar também as opções existentes nos dados
+    # Adicionar também os meses existentes nos dados (exibidos como Abr/2025, gravados como abr.-25)
     if 'meses_anos' in filter_options_data:
-        for mes in filter_options_data['meses_anos']:
-            # Verificar se é uma abreviação que podemos converter
-            nome_completo = meses_map.get(mes, mes)
-            
+        for opcao in mes_referencia_options(filter_options_data['meses_anos']):
             # Verificar se o mês já não está nas opções
-            if not any(op["value"] == nome_completo for op in meses_opcoes):
-                meses_opcoes.append({"label": nome_completo, "value": nome_completo})
+            if not any(op["value"] == opcao["value"] for op in meses_opcoes):
+                meses_opcoes.append(opcao)
     
     # Se o callback foi disparado pela abertura do modal
     if trigger == "modal-edicao-acao" and acao_id and acoes_data:
@@ -4163,8 +7393,8 @@ def update_edit_mes_referencia_options(is_open, atual_value, filter_options_data
             mes_referencia = acao['Mês de Referência'].iloc[0]
             print(f"Mês de referência encontrado para ação ID {acao_id}: '{mes_referencia}'")
             
-            # Converter para nome completo se necessário
-            nome_completo = meses_map.get(mes_referencia, mes_referencia)
+            # O mês de referência é mantido como foi gravado na planilha
+            nome_completo = mes_referencia
             
             # Verificar se o mês existe nas opções
             if any(op["value"] == nome_completo for op in meses_opcoes):
@@ -4176,7 +7406,7 @@ def update_edit_mes_referencia_options(is_open, atual_value, filter_options_data
     
     # Também converter o valor atual para nome completo se necessário
     if atual_value:
-        atual_value_nome_completo = meses_map.get(atual_value, atual_value)
+        atual_value_nome_completo = atual_value
         # Retornar apenas as opções e manter o valor atual
         return meses_opcoes, atual_value_nome_completo
     
@@ -4184,6 +7414,11 @@ def update_edit_mes_referencia_options(is_open, atual_value, filter_options_data
     return meses_opcoes, dash.no_update
 
 # Bloco principal para executar o aplicativo
+# Layout e callbacks registrados: o servidor pode começar a responder
+record_startup_phase('layout_e_callbacks', _inicio_fase)
+record_startup_phase('total', _STARTUP_INICIO)
+print(f"Inicialização concluída em {STARTUP_TIMINGS['total']:.2f}s: {STARTUP_TIMINGS}")
+
 if __name__ == '__main__':
     try:
         print("\n===== Iniciando aplicativo Status Mensal Codeart =====")
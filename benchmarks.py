@@ -0,0 +1,398 @@
+"""Benchmarks do painel de status mensal.
+
+Executados fora do servidor Dash, a partir de um shell Python ou da linha
+de comando (importar este módulo importa o app e carrega os dados):
+
+    python benchmarks.py benchmark_sheets_loading
+    python -c "import benchmarks; benchmarks.benchmark_local_snapshot(linhas=50000)"
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from app import (
+    ACOES_CALCULATED_COLUMNS, ACOES_INCREMENTAL, DATASET_CACHE, PROCESSED_DATA_MEMO,
+    PROJETOS_INCREMENTAL, SHEETS_BACKEND, SHEETS_CHANGE_DETECTOR, SHEETS_RATE_LIMITER,
+    SHEETS_TABS, SNAPSHOT_REFRESHER, IncrementalFrameProcessor, _finalize_projetos,
+    _process_data, _process_projetos_rows, acoes_derived_columns, acoes_status_detalhado,
+    build_local_snapshot, connect_google_sheets, fetch_all_tabs_values, load_acoes_from_sheets,
+    load_all_from_xlsx, load_codenautas_from_sheets, load_data_from_local,
+    load_data_from_sheets, load_local_snapshot, load_processed_parallel, local_snapshot_path,
+    process_acoes, process_data, records_from_values, save_local_snapshot,
+)
+
+
+def _quota_context():
+    """Com a planilha local, os benchmarks rodam sem o limitador de quota (só a latência simulada conta)"""
+    if SHEETS_BACKEND == 'local':
+        return SHEETS_RATE_LIMITER.suspended()
+    return contextlib.nullcontext()
+
+
+def benchmark_sheets_loading(repeticoes=3):
+    """Compara a leitura aba por aba (get_all_records) com a leitura em lote.
+
+    Conta as requisições HTTP feitas em cada modo e imprime um relatório de
+    tempo antes/depois. Retorna o relatório como dicionário.
+    """
+    spreadsheet = connect_google_sheets()
+    if not spreadsheet:
+        print("❌ Benchmark cancelado: sem conexão com o Google Sheets")
+        return None
+
+    client = spreadsheet.client
+    request_original = client.request
+    contador = {'requisicoes': 0}
+
+    def request_contado(*args, **kwargs):
+        contador['requisicoes'] += 1
+        return request_original(*args, **kwargs)
+
+    def modo_sequencial():
+        for titulo in SHEETS_TABS.values():
+            spreadsheet.worksheet(titulo).get_all_records()
+
+    def modo_lote():
+        for values in fetch_all_tabs_values(spreadsheet).values():
+            records_from_values(values)
+
+    relatorio = {}
+    client.request = request_contado
+    try:
+        with _quota_context():
+            for nome, funcao in [('sequencial', modo_sequencial), ('lote', modo_lote)]:
+                tempos = []
+                contador['requisicoes'] = 0
+                for _ in range(repeticoes):
+                    inicio = time.perf_counter()
+                    funcao()
+                    tempos.append(time.perf_counter() - inicio)
+                relatorio[nome] = {
+                    'tempo_medio_s': sum(tempos) / len(tempos),
+                    'tempo_min_s': min(tempos),
+                    'requisicoes_por_carga': contador['requisicoes'] / repeticoes,
+                }
+    finally:
+        client.request = request_original
+
+    print("\n===== Benchmark de leitura do Google Sheets =====")
+    for nome, dados in relatorio.items():
+        print(
+            f"{nome:>10}: {dados['tempo_medio_s']:.3f}s em média "
+            f"(mín {dados['tempo_min_s']:.3f}s), {dados['requisicoes_por_carga']:.0f} requisições por carga")
+    if relatorio['lote']['tempo_medio_s'] > 0:
+        print(
+            f"Ganho: {relatorio['sequencial']['tempo_medio_s'] / relatorio['lote']['tempo_medio_s']:.1f}x")
+    return relatorio
+
+
+def benchmark_parallel_loading(repeticoes=3):
+    """Compara a carga aba por aba sequencial com a carga paralela (download + processamento).
+
+    O cache é descartado antes de cada carga para forçar o download. Com a
+    planilha local (SHEETS_BACKEND=local) a latência simulada torna a
+    comparação reproduzível.
+    """
+    def limpar_cache():
+        DATASET_CACHE.invalidate()
+        SHEETS_CHANGE_DETECTOR.invalidate()
+        PROCESSED_DATA_MEMO.clear()
+        PROJETOS_INCREMENTAL.reset()
+        ACOES_INCREMENTAL.reset()
+
+    tempos_abas = {}
+
+    def modo_sequencial():
+        for nome, carregar in [('projetos', load_data_from_sheets),
+                               ('codenautas', load_codenautas_from_sheets),
+                               ('acoes', load_acoes_from_sheets)]:
+            inicio = time.perf_counter()
+            df = carregar()
+            tempos_abas[nome] = min(tempos_abas.get(nome, float('inf')),
+                                    time.perf_counter() - inicio)
+            if nome == 'projetos':
+                process_data(df, incremental=True)
+            elif nome == 'acoes':
+                process_acoes(df, incremental=True)
+
+    relatorio = {}
+    with contextlib.redirect_stdout(io.StringIO()), _quota_context():
+        for nome, funcao in [('sequencial', modo_sequencial), ('paralelo', load_processed_parallel)]:
+            tempos = []
+            for _ in range(repeticoes):
+                limpar_cache()
+                inicio = time.perf_counter()
+                funcao()
+                tempos.append(time.perf_counter() - inicio)
+            relatorio[nome] = {'tempo_medio_s': sum(tempos) / len(tempos),
+                               'tempo_min_s': min(tempos)}
+    relatorio['aba_mais_lenta_s'] = max(tempos_abas.values())
+
+    print("\n===== Benchmark de carga aba por aba =====")
+    for nome in ('sequencial', 'paralelo'):
+        print(
+            f"{nome:>10}: {relatorio[nome]['tempo_medio_s']:.3f}s em média (mín {relatorio[nome]['tempo_min_s']:.3f}s)")
+    print(f"Download da aba mais lenta: {relatorio['aba_mais_lenta_s']:.3f}s")
+    if relatorio['paralelo']['tempo_medio_s'] > 0:
+        print(
+            f"Ganho: {relatorio['sequencial']['tempo_medio_s'] / relatorio['paralelo']['tempo_medio_s']:.1f}x")
+    return relatorio
+
+
+def benchmark_xlsx_ingestion(linhas=100000):
+    """Mede a leitura de um XLSX com `linhas` projetos e ações: streaming em colunas x pandas.read_excel"""
+    _, dados = SNAPSHOT_REFRESHER.get_snapshot()
+    if dados is None:
+        dados = build_local_snapshot()
+
+    def repetir(df, quantidade):
+        df = df.loc[:, ~df.columns.duplicated()]
+        if df.empty:
+            return df
+        return pd.concat([df] * (quantidade // len(df) + 1), ignore_index=True).iloc[:quantidade]
+
+    abas = {
+        'Projetos': repetir(dados['projetos'], linhas),
+        'Codenautas': dados['codenautas'],
+        'Ações': repetir(dados['acoes'].drop(
+            columns=[c for c in ACOES_CALCULATED_COLUMNS if c in dados['acoes'].columns]), linhas),
+    }
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'benchmark.xlsx')
+        inicio = time.perf_counter()
+        workbook = openpyxl.Workbook(write_only=True)
+        for titulo, df in abas.items():
+            ws = workbook.create_sheet(titulo)
+            ws.append([str(c) for c in df.columns])
+            for linha in df.itertuples(index=False):
+                ws.append([None if pd.isna(v) else v for v in linha])
+        workbook.save(caminho)
+        tempo_geracao = time.perf_counter() - inicio
+        total_linhas = sum(len(df) for df in abas.values())
+
+        relatorio = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            load_all_from_xlsx(caminho)
+            relatorio['streaming'] = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            pd.read_excel(caminho, sheet_name=list(abas), engine='openpyxl')
+            relatorio['read_excel'] = time.perf_counter() - inicio
+
+    print(f"\n===== Benchmark de leitura XLSX ({total_linhas} linhas, gerado em {tempo_geracao:.1f}s) =====")
+    for nome, segundos in relatorio.items():
+        print(f"{nome:>10}: {segundos:.2f}s ({total_linhas / segundos:,.0f} linhas/s)")
+    print(f"Ganho: {relatorio['read_excel'] / relatorio['streaming']:.1f}x")
+    relatorio['linhas'] = total_linhas
+    return relatorio
+
+
+def benchmark_incremental_processing(linhas=20000, alteradas=20, repeticoes=3):
+    """Compara o processamento completo com o incremental após alterar poucas linhas.
+
+    Replica os projetos do backup local até `linhas`, processa uma vez para
+    preencher o cache de linhas e, a cada repetição, altera `alteradas` linhas
+    (incluindo um valor muito alto, que dispara a correção pela mediana).
+    Confere que os dois caminhos produzem o mesmo resultado.
+    """
+    df_base = load_data_from_local('projetos')
+    if df_base is None or df_base.empty:
+        print("Backup local de projetos não encontrado para o benchmark")
+        return None
+    df_base = pd.concat([df_base] * (linhas // len(df_base) + 1),
+                        ignore_index=True).iloc[:linhas]
+    df_base['Projeto'] = df_base['Projeto'].astype(str) + ' #' + df_base.index.astype(str)
+
+    processador = IncrementalFrameProcessor(
+        'benchmark', _process_projetos_rows, _finalize_projetos)
+    rng = np.random.default_rng(0)
+    tempos_completo, tempos_incremental = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        processador.process(df_base)
+        df = df_base
+        for _ in range(repeticoes):
+            df = df.copy()
+            linhas_alteradas = rng.choice(len(df), alteradas, replace=False)
+            df.loc[linhas_alteradas, 'Real'] = rng.integers(0, 500, alteradas)
+            df.loc[linhas_alteradas[0], 'Real'] = 5000000
+
+            inicio = time.perf_counter()
+            completo = _process_data(df)
+            tempos_completo.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            incremental = processador.process(df)
+            tempos_incremental.append(time.perf_counter() - inicio)
+
+            pd.testing.assert_frame_equal(completo, incremental, check_dtype=False)
+
+    relatorio = {
+        'linhas': linhas,
+        'alteradas': alteradas,
+        'completo': sum(tempos_completo) / repeticoes,
+        'incremental': sum(tempos_incremental) / repeticoes,
+        'estatisticas': processador.get_stats(),
+    }
+    print(f"Processamento completo: {relatorio['completo']:.3f}s | "
+          f"incremental ({alteradas} de {linhas} linhas alteradas): {relatorio['incremental']:.3f}s")
+    return relatorio
+
+
+def _acoes_derived_columns_loop(df_acoes, hoje):
+    """Cálculo anterior, linha a linha; mantido apenas para comparação em benchmark_process_acoes"""
+    df_acoes['Dias Restantes'] = pd.NA
+    mask_data_limite_valida = ~df_acoes['Data Limite'].isna()
+    for idx in df_acoes[mask_data_limite_valida].index:
+        data_limite = pd.to_datetime(df_acoes.at[idx, 'Data Limite'])
+        if pd.notna(data_limite):
+            df_acoes.at[idx, 'Dias Restantes'] = (data_limite - hoje).days
+
+    df_acoes['Atrasada'] = (
+        (df_acoes['Dias Restantes'].notna()) &
+        (df_acoes['Dias Restantes'] < 0) &
+        (df_acoes['Status'] != 'Concluída')
+    ).astype(int)
+
+    df_acoes['Tempo de Conclusão'] = pd.NA
+    mask_concluida = (df_acoes['Status'] == 'Concluída') & ~df_acoes['Data de Conclusão'].isna(
+    ) & ~df_acoes['Data de Cadastro'].isna()
+    for idx in df_acoes[mask_concluida].index:
+        data_conclusao = pd.to_datetime(df_acoes.at[idx, 'Data de Conclusão'])
+        data_cadastro = pd.to_datetime(df_acoes.at[idx, 'Data de Cadastro'])
+        if pd.notna(data_conclusao) and pd.notna(data_cadastro):
+            df_acoes.at[idx, 'Tempo de Conclusão'] = (data_conclusao - data_cadastro).days
+
+    df_acoes['Status Detalhado'] = df_acoes.apply(
+        lambda row: 'Concluída' if row['Status'] == 'Concluída'
+        else ('Atrasada' if row['Atrasada'] == 1 else row['Status']), axis=1)
+    return df_acoes
+
+
+def benchmark_process_acoes(linhas=100000, repeticoes=3):
+    """Compara o cálculo das colunas das ações linha a linha com o cálculo vetorizado.
+
+    Gera `linhas` ações sintéticas (datas ausentes, pendentes vencidas e
+    concluídas), confere que as duas versões produzem os mesmos valores e
+    mostra os tempos médios.
+    """
+    rng = np.random.default_rng(0)
+    hoje = pd.Timestamp.now().normalize()
+    cadastro = hoje - pd.to_timedelta(rng.integers(0, 720, linhas), unit='D')
+    limite = pd.Series(cadastro + pd.to_timedelta(rng.integers(-30, 180, linhas), unit='D'))
+    limite[rng.random(linhas) < 0.1] = pd.NaT
+    status = pd.Series(rng.choice(['Pendente', 'Em andamento', 'Concluída'], linhas))
+    conclusao = pd.Series(cadastro + pd.to_timedelta(rng.integers(0, 120, linhas), unit='D'))
+    conclusao[status != 'Concluída'] = pd.NaT
+    df_base = pd.DataFrame({
+        'ID da Ação': np.arange(1, linhas + 1),
+        'Data de Cadastro': cadastro,
+        'Data Limite': limite,
+        'Status': status,
+        'Data de Conclusão': conclusao,
+    })
+
+    def medir(calcular):
+        tempos = []
+        for _ in range(repeticoes):
+            df = df_base.copy()
+            inicio = time.perf_counter()
+            resultado = calcular(df)
+            tempos.append(time.perf_counter() - inicio)
+        return sum(tempos) / len(tempos), resultado
+
+    def vetorizado(df):
+        df = acoes_derived_columns(df, hoje)
+        df['Status Detalhado'] = acoes_status_detalhado(df)
+        return df
+
+    tempo_loop, df_loop = medir(lambda df: _acoes_derived_columns_loop(df, hoje))
+    tempo_vetor, df_vetor = medir(vetorizado)
+
+    # Mesmos valores (a versão vetorizada usa Int64 em vez de object)
+    colunas = ['Dias Restantes', 'Atrasada', 'Tempo de Conclusão', 'Status Detalhado']
+    iguais = all(
+        df_loop[col].astype(object).where(df_loop[col].notna(), None).tolist() ==
+        df_vetor[col].astype(object).where(df_vetor[col].notna(), None).tolist()
+        for col in colunas)
+
+    print(f"\n===== Benchmark das colunas calculadas das ações ({linhas} linhas) =====")
+    print(f"Linha a linha: {tempo_loop:.3f}s")
+    print(f"Vetorizado:    {tempo_vetor:.4f}s")
+    print(f"Ganho: {tempo_loop / tempo_vetor:.0f}x | resultados idênticos: {'sim' if iguais else 'NÃO'}")
+    return {'linhas': linhas, 'loop': tempo_loop, 'vetorizado': tempo_vetor, 'iguais': iguais}
+
+
+def benchmark_local_snapshot(linhas=50000, repeticoes=3):
+    """Compara o fallback local em CSV (ler + process_data) com o snapshot Arrow tipado.
+
+    Usa os projetos processados do snapshot atual replicados até `linhas`
+    registros, gravados em um diretório temporário.
+    """
+    _, dados = SNAPSHOT_REFRESHER.get_snapshot()
+    df_base = dados['projetos'] if dados is not None else pd.DataFrame()
+    if df_base.empty:
+        print("Sem dados de projetos para o benchmark")
+        return None
+    df_base = df_base.loc[:, ~df_base.columns.duplicated()]
+    df = pd.concat([df_base] * (linhas // len(df_base) + 1),
+                   ignore_index=True).iloc[:linhas]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        nome = os.path.join(pasta, 'projetos')
+        csv_path = f"{nome}_backup.csv"
+
+        def carregar_csv():
+            # Caminho antigo: CSV relido e reprocessado
+            with contextlib.redirect_stdout(io.StringIO()):
+                return _process_data(pd.read_csv(csv_path))
+
+        modos = [
+            ('csv', lambda: df.to_csv(csv_path, index=False), carregar_csv, csv_path),
+            ('arrow', lambda: save_local_snapshot(df, nome, processado=True),
+             lambda: load_local_snapshot(nome)[0], local_snapshot_path(nome)),
+        ]
+        relatorio = {}
+        for modo, gravar, carregar, caminho in modos:
+            tempos_gravacao, tempos_leitura = [], []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                gravar()
+                tempos_gravacao.append(time.perf_counter() - inicio)
+                inicio = time.perf_counter()
+                carregado = carregar()
+                tempos_leitura.append(time.perf_counter() - inicio)
+            relatorio[modo] = {
+                'gravacao_min_s': min(tempos_gravacao),
+                'leitura_min_s': min(tempos_leitura),
+                'tamanho_mb': os.path.getsize(caminho) / 1024 ** 2,
+                'colunas_data': int(sum(pd.api.types.is_datetime64_any_dtype(t)
+                                        for t in carregado.dtypes)),
+            }
+
+    print(f"\n===== Benchmark do backup local ({linhas} projetos) =====")
+    for modo, dados_modo in relatorio.items():
+        print(
+            f"{modo:>6}: gravação {dados_modo['gravacao_min_s'] * 1000:.1f}ms, "
+            f"leitura {dados_modo['leitura_min_s'] * 1000:.1f}ms, "
+            f"{dados_modo['tamanho_mb']:.1f} MB, {dados_modo['colunas_data']} colunas de data")
+    if relatorio['arrow']['leitura_min_s'] > 0:
+        print(
+            f"Ganho na leitura: {relatorio['csv']['leitura_min_s'] / relatorio['arrow']['leitura_min_s']:.1f}x")
+    return relatorio
+
+
+if __name__ == '__main__':
+    # Sem argumentos, executa todos os benchmarks com os parâmetros padrão
+    nomes = sys.argv[1:] or [nome for nome in list(globals())
+                             if nome.startswith('benchmark_')]
+    for nome in nomes:
+        globals()[nome]()